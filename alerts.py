@@ -0,0 +1,255 @@
+# ================================================================================================
+# ALERT RULES: THRESHOLD CHECKS OVER ALL KOMMUNER AT ONCE
+# ================================================================================================
+#
+# A rules file holds one rule per line ('#' starts a comment):
+#
+#   gust > 20 m/s within 12h
+#   precip sum(6h) > 15 mm
+#   Kuldevarsel: temperature mean(3h) < -15 within 24h
+#
+#   [name:] variable [sum|mean|max|min(Nh)] (> | >= | < | <= | ==) number [unit] [within Nh]
+#
+# Rules are compiled once into NumPy checks and evaluated over a (kommune, hour, variable)
+# array - typically the national forecast cube - for every kommune in one pass. Between runs
+# the state file remembers which rows were evaluated (by their update time) and which alerts
+# are active, so only changed kommuner are re-evaluated and each alert is reported once, when it
+# starts ('alert'), and once when it is gone ('cleared'). Time passing counts as a change too: a
+# kommune whose active alert has an onset hour in the past is re-evaluated, and so is every
+# kommune when a new hour has moved the horizon of rules with 'within Nh'.
+#
+# ================================================================================================
+import json
+import operator
+import os
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Short names accepted in rules, besides the Forecast field names themselves
+ALIASES = {
+    'temp': 'temperature', 'precip': 'precipitation', 'rain': 'precipitation',
+    'wind': 'windspeed', 'gust': 'windgust',
+}
+OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le, '==': operator.eq}
+UNITS = ('m/s', 'mm', '°c', 'c', '%', 'hpa')
+
+_RULE_PATTERN = re.compile(
+    r"""^\s*(?:(?P<name>[^:]+?)\s*:\s*)?
+        (?P<variable>[a-z_]+)\s*
+        (?:(?P<aggregate>sum|mean|max|min)\(\s*(?P<window>\d+)\s*h\s*\)\s*)?
+        (?P<operator>>=|<=|==|>|<)\s*
+        (?P<threshold>[-+]?\d+(?:[.,]\d+)?)\s*
+        (?P<unit>m/s|mm|°c|c|%|hpa)?\s*
+        (?:within\s+(?P<within>\d+)\s*h)?\s*$""",
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
+class Rule:
+    """One compiled threshold rule."""
+
+    def __init__(self, text, variable, operator_symbol, threshold, aggregate=None, window=1,
+                 within=None, name=None):
+        self.text = text
+        self.name = name or text
+        self.variable = variable
+        self.operator_symbol = operator_symbol
+        self.compare = OPERATORS[operator_symbol]
+        self.threshold = threshold
+        self.aggregate = aggregate
+        self.window = window
+        self.within = within
+        # Peak = the most extreme aggregated value on the alerting side of the threshold
+        self.peak = np.nanmin if operator_symbol in ('<', '<=') else np.nanmax
+
+    def __repr__(self):
+        return f"Rule({self.text!r})"
+
+    def aggregated(self, values):
+        """
+        (kommune, start hour) values of the rule's aggregate over its window, e.g. the 6-hour
+        precipitation sum starting at each hour. NaN anywhere in a window gives NaN.
+        """
+        if self.aggregate is None or self.window == 1:
+            return values
+        if values.shape[1] < self.window:
+            return values[:, :0]
+        windows = sliding_window_view(values, self.window, axis=1)
+        return getattr(np, self.aggregate)(windows, axis=-1)
+
+
+def parse_rules(text, variables):
+    """
+    Compile rules text into Rule objects.
+
+    Args:
+        text: Rules, one per line
+        variables: Variable names available in the data (e.g. the cube's)
+
+    Raises:
+        ValueError: A line does not parse, or names an unknown variable
+    """
+    rules = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        match = _RULE_PATTERN.match(line)
+        if match is None:
+            raise ValueError(f"Linje {line_number}: kan ikke tolke regelen '{line}'")
+        variable = match['variable'].lower()
+        variable = ALIASES.get(variable, variable)
+        if variable not in variables:
+            raise ValueError(
+                f"Linje {line_number}: ukjent variabel '{match['variable']}' "
+                f"(tilgjengelige: {', '.join(list(variables) + list(ALIASES))})"
+            )
+        rules.append(Rule(
+            line, variable, match['operator'], float(match['threshold'].replace(',', '.')),
+            aggregate=match['aggregate'] and match['aggregate'].lower(),
+            window=int(match['window'] or 1),
+            within=int(match['within']) if match['within'] else None,
+            name=match['name'],
+        ))
+    return rules
+
+
+def load_rules(filename, variables):
+    """Compile a rules file (see parse_rules)."""
+    with open(filename, encoding='utf-8') as f:
+        return parse_rules(f.read(), variables)
+
+
+def evaluate(rules, values, variables, times, rows=None, now=None):
+    """
+    Evaluate every rule for the given kommune rows in one vectorized pass per rule.
+
+    Args:
+        rules: Compiled rules (parse_rules)
+        values: (kommune, hour, variable) array, e.g. ForecastCube.values
+        variables: Names of the last axis
+        times: datetime64 hour axis (UTC)
+        rows: Row indices to evaluate (default: all)
+        now: datetime64 (UTC) that 'within Nh' counts from (default: now, or the first hour)
+
+    Returns:
+        Dict of (rule index, row) -> (onset datetime64, peak value) for every triggered rule.
+    """
+    rows = np.arange(values.shape[0]) if rows is None else np.asarray(rows, dtype=np.intp)
+    now = np.datetime64('now', 's') if now is None else np.datetime64(now, 's')
+    first_hour = int(np.searchsorted(times, now, side='right')) - 1
+    first_hour = min(max(first_hour, 0), len(times))
+    hits = {}
+    if not len(rows):
+        return hits
+
+    for rule_index, rule in enumerate(rules):
+        series = np.asarray(values[rows, :, variables.index(rule.variable)], dtype=np.float64)
+        aggregated = rule.aggregated(series)
+        # Windows must start inside the rule's horizon
+        last_hour = aggregated.shape[1] if rule.within is None else first_hour + rule.within
+        horizon = aggregated[:, first_hour:last_hour]
+        with np.errstate(invalid='ignore'):
+            triggered = rule.compare(horizon, rule.threshold)  # NaN compares False
+        hit_rows = np.flatnonzero(triggered.any(axis=1))
+        if not len(hit_rows):
+            continue
+        onsets = triggered[hit_rows].argmax(axis=1) + first_hour
+        peaks = rule.peak(np.where(triggered[hit_rows], horizon[hit_rows], np.nan), axis=1)
+        for row, onset, peak in zip(rows[hit_rows].tolist(), onsets.tolist(), peaks.tolist()):
+            hits[rule_index, row] = (times[onset], peak)
+    return hits
+
+
+def run_alerts(rules, values, variables, times, kommuner, updated, state_file, now=None):
+    """
+    Evaluate rules for the kommuner whose data changed since the last run, and return the alert
+    events that are new since then (deduplicated through state_file).
+
+    Args:
+        rules: Compiled rules
+        values, variables, times: As for evaluate()
+        kommuner: Kommune name per row
+        updated: Last update time per row (datetime64); rows whose time differs from the
+            state file's are re-evaluated, the others keep their alert status unless it has
+            expired (an active alert's onset hour has passed, or a 'within' horizon has moved)
+        state_file: JSON file with the previous run's update times, hour and active alerts
+        now: As for evaluate()
+
+    Returns:
+        List of event dicts: {'event': 'alert' | 'cleared', 'rule', 'kommune', 'onset', 'value',
+        'threshold'}, in rule order.
+    """
+    state = _load_state(state_file)
+    rule_texts = [rule.text for rule in rules]
+    if state.get('rules') != rule_texts:
+        state = {'updated': {}, 'active': {}}  # New rules: evaluate everything afresh
+
+    now = np.datetime64('now', 's') if now is None else np.datetime64(now, 's')
+    this_hour = now.astype('datetime64[h]').astype('datetime64[s]')
+    kommuner = [str(kommune) for kommune in kommuner]
+    updated_text = np.asarray(updated, dtype='datetime64[s]').astype(str).tolist()
+    changed = {
+        row for row, kommune in enumerate(kommuner)
+        if state['updated'].get(kommune) != updated_text[row]
+    }
+    # Unchanged data can still give another answer later: an alert whose onset hour has passed
+    # may be over, and a new hour moves every 'within' horizon forward
+    if state.get('hour') != str(this_hour) and any(rule.within is not None for rule in rules):
+        changed = set(range(len(kommuner)))
+    else:
+        row_of = {kommune: row for row, kommune in enumerate(kommuner)}
+        changed.update(
+            row_of[kommune] for rule_active in state['active'].values()
+            for kommune, onset in rule_active.items()
+            if kommune in row_of and np.datetime64(onset.rstrip('Z'), 's') < this_hour
+        )
+    changed = sorted(changed)
+    hits = evaluate(rules, values, variables, times, rows=changed, now=now)
+
+    events = []
+    active = state['active']
+    for rule_index, rule in enumerate(rules):
+        rule_active = active.setdefault(rule.text, {})
+        for row in changed:
+            kommune = kommuner[row]
+            hit = hits.get((rule_index, row))
+            if hit is not None and kommune not in rule_active:
+                onset, peak = hit
+                rule_active[kommune] = f"{onset}Z"
+                events.append({
+                    'event': 'alert', 'rule': rule.name, 'kommune': kommune, 'onset': f"{onset}Z",
+                    'value': None if np.isnan(peak) else round(peak, 2), 'threshold': rule.threshold,
+                })
+            elif hit is None and kommune in rule_active:
+                events.append({
+                    'event': 'cleared', 'rule': rule.name, 'kommune': kommune,
+                    'onset': rule_active.pop(kommune), 'value': None, 'threshold': rule.threshold,
+                })
+
+    for row in changed:
+        state['updated'][kommuner[row]] = updated_text[row]
+    state['rules'] = rule_texts
+    state['hour'] = str(this_hour)
+    state['evaluated'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    _save_state(state_file, state)
+    return events
+
+
+def _load_state(state_file):
+    try:
+        with open(state_file, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'updated': {}, 'active': {}}
+
+
+def _save_state(state_file, state):
+    os.makedirs(os.path.dirname(os.path.abspath(state_file)), exist_ok=True)
+    temp_filename = f"{state_file}.{os.getpid()}.tmp"
+    with open(temp_filename, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(temp_filename, state_file)
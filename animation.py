@@ -0,0 +1,227 @@
+# ================================================================================================
+# ANIMATION (--animate): BLITTED FRAMES TO GIF / MP4
+# ================================================================================================
+#
+# The static part of a scene (axes, grid, fills, colorbar, ...) is rendered once and kept as a
+# pixel background. Each frame restores that background and draws only the animated artists
+# (time cursor, value annotation, temperature segments up to the cursor / map colors), then
+# copies the canvas buffer. Long animations are split into contiguous chunks rendered by worker
+# processes, each with its own figure and background.
+#
+# ================================================================================================
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from palette_static import get_palette_rgba, temperature_to_rgba
+from plotting import (
+    PLOT_COLORS_DM, PLOT_COLORS_LM, REALLYWARM, TEXT_COLOR_DM, TEXT_COLOR_LM, TRULYCOLD,
+    draw_forecast, plot_rc,
+)
+from national_map import draw_national_map, set_map_hour
+from terminal import format_val
+
+ANIMATION_FPS = 12                  # --animate: frames per second ...
+ANIMATION_FRAMES_PER_HOUR = 4       # ... and frames per forecast hour (48 h -> 16 s)
+ANIMATION_FRAMES_PER_WORKER = 100   # Fewer frames per process: starting workers costs more
+
+
+def _forecast_scene(figure, forecast, title_name="", test_mode=False, dark_mode=False):
+    """Forecast plot with a moving time cursor; the temperature line is drawn up to the cursor."""
+    from matplotlib.collections import LineCollection
+
+    artists = draw_forecast(
+        figure, forecast, title_name=title_name, dark_mode=dark_mode, test_mode=test_mode
+    )
+    multivar_axes = artists['multivar_axes']
+    temperature_line = artists['temperature_line']
+    segments = np.array(temperature_line.get_segments())
+    segment_values = np.asarray(temperature_line.get_array())
+    text_color = TEXT_COLOR_DM if dark_mode else TEXT_COLOR_LM
+    background_color = (PLOT_COLORS_DM if dark_mode else PLOT_COLORS_LM)[3]
+
+    # The whole line stays visible, faded, in the static background
+    faded_line = LineCollection(
+        segments, cmap=temperature_line.get_cmap(), norm=temperature_line.norm, alpha=0.25,
+        linewidth=5.8, capstyle='round', joinstyle='round', zorder=5,
+    )
+    faded_line.set_array(segment_values)
+    artists['temperature_axes'].add_collection(faded_line)
+
+    cursor = multivar_axes.axvline(0, color=text_color, linewidth=1.5, alpha=0.8, zorder=8)
+    annotation = multivar_axes.text(
+        0, 0.98, '', transform=multivar_axes.get_xaxis_transform(), va='top', fontsize=12,
+        fontweight='bold', zorder=8,
+        bbox=dict(boxstyle='round,pad=0.4', facecolor=background_color, alpha=0.8, edgecolor='none'),
+    )
+    last_hour = len(forecast) - 1
+
+    def update(position):
+        # Segments starting before the cursor; the one under it is cut at the cursor
+        n_visible = int(np.searchsorted(segments[:, 0, 0], position, side='left'))
+        visible = segments[:n_visible].copy()
+        if n_visible:
+            (x0, y0), (x1, y1) = visible[-1]
+            if x0 < position < x1:
+                visible[-1, 1] = (position, y0 + (y1 - y0) * (position - x0) / (x1 - x0))
+        temperature_line.set_segments(visible)
+        temperature_line.set_array(segment_values[:n_visible])
+
+        cursor.set_xdata([position, position])
+        i = min(int(round(position)), last_hour)
+        annotation.set_text(
+            f"kl. {forecast.labels[i]}   {format_val(forecast.temperature[i])} °C   "
+            f"{format_val(forecast.windspeed[i])} ({format_val(forecast.windgust[i])}) m/s   "
+            f"{format_val(forecast.precipitation[i])} mm"
+        )
+        # Keep the annotation on the wide side of the cursor
+        annotation.set_x(position)
+        annotation.set_horizontalalignment('left' if position < last_hour / 2 else 'right')
+
+    return [temperature_line, cursor, annotation], update
+
+
+def _map_scene(figure, entries, times, temperatures, dark_mode=False):
+    """National map; colors between whole hours are interpolated for smooth frames."""
+    artists = draw_national_map(figure, entries, times, temperatures, dark_mode=dark_mode, slider=False)
+    last_hour = len(times) - 1
+
+    def update(position):
+        hour = min(int(position), last_hour)
+        set_map_hour(artists, min(int(round(position)), last_hour), redraw=False)
+        fraction = position - hour
+        if fraction > 0 and hour < last_hour:
+            between = (1 - fraction) * temperatures[:, hour] + fraction * temperatures[:, hour + 1]
+            artists['scatter'].set_facecolor(
+                temperature_to_rgba(between, dark_mode, vmin=TRULYCOLD, vmax=REALLYWARM)
+            )
+
+    return [artists['scatter'], artists['title']], update
+
+
+_SCENES = {'forecast': _forecast_scene, 'map': _map_scene}
+
+
+def _render_frames(scene, scene_args, positions, dark_mode, figsize, dpi):
+    """Render the frames at the given hour positions (also run in worker processes)."""
+    import matplotlib as mpl
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with mpl.rc_context(plot_rc(dark_mode)):
+        figure = Figure(figsize=figsize, dpi=dpi)
+        canvas = FigureCanvasAgg(figure)
+        animated, update = _SCENES[scene](figure, *scene_args, dark_mode=dark_mode)
+        for artist in animated:
+            artist.set_animated(True)  # Left out of the full draw: not part of the background
+        canvas.draw()
+        background = canvas.copy_from_bbox(figure.bbox)
+
+        frames = []
+        for position in positions:
+            canvas.restore_region(background)
+            update(position)
+            for artist in animated:
+                figure.draw_artist(artist)
+            frames.append(np.asarray(canvas.buffer_rgba())[:, :, :3].copy())
+    return frames
+
+
+def animation_video_supported():
+    """Path of the ffmpeg executable matplotlib is configured with, or None (then only GIF)."""
+    import matplotlib as mpl
+
+    return shutil.which(mpl.rcParams['animation.ffmpeg_path'])
+
+
+def _write_frames(frame_chunks, filename, fps):
+    """Write frames (RGB arrays, arriving in chunks) as GIF (Pillow) or video (ffmpeg)."""
+    if os.path.splitext(filename)[1].lower() == '.gif':
+        from PIL import Image
+        images = []
+        palette_image = None
+        for frames in frame_chunks:
+            for frame in frames:
+                if palette_image is None:
+                    # One shared palette from the first frame plus every temperature color:
+                    # ~20x faster than an adaptive palette per frame, and colors don't flicker
+                    temperature_colors = np.concatenate(
+                        [get_palette_rgba(dark_mode, bytes=True)[:, :3] for dark_mode in (False, True)]
+                    )
+                    strip = np.resize(temperature_colors, (8, frame.shape[1], 3))
+                    palette_image = Image.fromarray(np.concatenate([frame, strip])).quantize(256)
+                images.append(
+                    Image.fromarray(frame).quantize(palette=palette_image, dither=Image.Dither.NONE)
+                )
+        images[0].save(
+            filename, save_all=True, append_images=images[1:], duration=round(1000 / fps), loop=0
+        )
+        return len(images)
+
+    ffmpeg = animation_video_supported()
+    if ffmpeg is None:
+        raise RuntimeError(f"{filename}: video krever ffmpeg (eller bruk .gif)")
+    process = None
+    n_frames = 0
+    try:
+        for frames in frame_chunks:
+            for frame in frames:
+                if process is None:
+                    height, width = frame.shape[:2]
+                    process = subprocess.Popen(
+                        [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                         '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+                         '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', filename],
+                        stdin=subprocess.PIPE,
+                    )
+                process.stdin.write(frame.tobytes())
+                n_frames += 1
+    finally:
+        if process is not None:
+            process.stdin.close()
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg feilet under skriving av {filename}")
+    return n_frames
+
+
+def animate(
+    filename, scene, scene_args, n_hours, dark_mode=False, figsize=(10, 6), dpi=100,
+    fps=ANIMATION_FPS, frames_per_hour=ANIMATION_FRAMES_PER_HOUR, workers=None,
+):
+    """
+    Render an hour-by-hour animation to filename (.gif, or .mp4/.webm/... with ffmpeg).
+
+    Args:
+        filename: Output path; the extension picks the writer
+        scene: 'forecast' (scene_args: forecast, title_name, test_mode) or 'map' (scene_args:
+            entries, times, temperatures - as from national.national_temperatures())
+        n_hours: Number of hours (points) in the data
+        dark_mode: Use the dark mode palette and colors
+        figsize, dpi: Frame size in inches and resolution
+        fps: Frames per second in the output
+        frames_per_hour: Frames per forecast hour (in-between frames are interpolated)
+        workers: Worker processes (default: one per ANIMATION_FRAMES_PER_WORKER frames, at most
+            the number of CPUs; 1 renders in this process)
+
+    Returns:
+        Number of frames written.
+    """
+    positions = np.linspace(0, n_hours - 1, (n_hours - 1) * frames_per_hour + 1)
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(positions) // ANIMATION_FRAMES_PER_WORKER)
+    render_args = (scene, scene_args)
+    frame_options = (dark_mode, figsize, dpi)
+
+    if workers <= 1:
+        return _write_frames([_render_frames(*render_args, positions, *frame_options)], filename, fps)
+
+    # Contiguous chunks, a few per worker, so frames stream to the writer in order
+    chunks = np.array_split(positions, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        frame_chunks = executor.map(
+            _render_frames, *zip(*[(*render_args, chunk, *frame_options) for chunk in chunks])
+        )
+        return _write_frames(frame_chunks, filename, fps)
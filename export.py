@@ -0,0 +1,249 @@
+# ================================================================================================
+# BULK EXPORT: MANY KOMMUNER IN ONE TYPED, COLUMNAR FILE
+# ================================================================================================
+#
+# Forecasts for one or many locations are laid out in long format, one row per location and
+# hour:
+#
+#   kommune, fylke, latitude, longitude, time (UTC), temperature, precipitation, ..., <extra fields>
+#
+# The columns are built with a handful of NumPy concatenations (no per-row Python objects
+# except for the text formats) and written as:
+#
+#   .jsonl / .ndjson   JSON Lines, one object per row, missing values as null
+#   .csv               Plain CSV, ISO 8601 UTC times, missing values empty
+#   .npz               NumPy arrays per column (strings as fixed-width unicode, no pickle)
+#   .parquet           Apache Parquet (needs pyarrow)
+#   .arrow / .feather  Arrow IPC file (needs pyarrow)
+#
+# With append=True rows are added to an existing file, which must have the same columns.
+# JSON Lines and CSV are appended in place; the binary formats are rewritten with old + new
+# rows (atomically, via a temp file).
+#
+# ================================================================================================
+import csv
+import json
+import os
+
+import numpy as np
+
+FORMATS = {
+    '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv', '.npz': 'npz',
+    '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow',
+}
+LOCATION_COLUMNS = ('kommune', 'fylke', 'latitude', 'longitude', 'time')
+
+
+def export_format(filename):
+    """
+    Export format for a filename, from its extension.
+
+    Also checks that the format's writer can be imported, so callers can validate up front.
+
+    Raises:
+        ValueError: Unknown extension
+        ImportError: Parquet/Arrow requested but pyarrow is not installed
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(
+            f"Ukjent eksportformat '{extension}'. Bruk en av: {', '.join(FORMATS)}"
+        )
+    if FORMATS[extension] in ('parquet', 'arrow'):
+        _import_pyarrow()
+    return FORMATS[extension]
+
+
+def to_columns(locations):
+    """
+    Long-format columns for many forecasts.
+
+    Args:
+        locations: Iterable of (kommune, fylke, latitude, longitude, Forecast). All forecasts
+            must hold the same fields.
+
+    Returns:
+        Dict of column name -> NumPy array, in LOCATION_COLUMNS order followed by the variables.
+    """
+    locations = list(locations)
+    fields = locations[0][4].fields if locations else ()
+    lengths = [len(forecast) for *_, forecast in locations]
+
+    def repeated(values, dtype):
+        return np.repeat(np.asarray(values, dtype=dtype), lengths)
+
+    columns = {
+        'kommune': repeated([location[0] for location in locations], str),
+        'fylke': repeated([location[1] for location in locations], str),
+        'latitude': repeated([location[2] for location in locations], np.float64),
+        'longitude': repeated([location[3] for location in locations], np.float64),
+        'time': np.concatenate(
+            [forecast.times for *_, forecast in locations] or [np.empty(0, 'datetime64[s]')]
+        ),
+    }
+    for name in fields:
+        columns[name] = np.concatenate([forecast[name] for *_, forecast in locations])
+    return columns
+
+
+def to_record(kommune, fylke, latitude, longitude, forecast):
+    """
+    One location's forecast as a JSON-ready dict (wide format: one list per variable), e.g. for
+    streaming one JSON line per location. Times are ISO 8601 UTC, missing values None.
+    """
+    record = {'kommune': kommune, 'fylke': fylke, 'latitude': latitude, 'longitude': longitude}
+    record['time'] = [f"{time}Z" for time in forecast.times.astype(str).tolist()]
+    for name in forecast.fields:
+        record[name] = [None if value != value else value for value in forecast[name].tolist()]
+    return record
+
+
+def export(locations, filename, append=False):
+    """
+    Write forecasts for one or many locations to filename (format from the extension).
+
+    Args:
+        locations: Iterable of (kommune, fylke, latitude, longitude, Forecast)
+        filename: Output path; .jsonl, .csv, .npz, .parquet or .arrow
+        append: Add rows to an existing file instead of replacing it
+
+    Returns:
+        Number of rows written.
+    """
+    writer = _WRITERS[export_format(filename)]
+    columns = to_columns(locations)
+    directory = os.path.dirname(os.path.abspath(filename))
+    os.makedirs(directory, exist_ok=True)
+    writer(columns, filename, append and os.path.exists(filename))
+    return len(columns['time'])
+
+
+# ---- TEXT FORMATS (APPENDED IN PLACE) ----------------------------------------------------------
+def _text_rows(columns):
+    """Rows as lists of Python values: times as ISO 8601 UTC, NaN as None."""
+    times = [f"{time}Z" for time in columns['time'].astype(str).tolist()]
+    text_columns = []
+    for name, values in columns.items():
+        if name == 'time':
+            text_columns.append(times)
+        elif values.dtype.kind == 'f':
+            text_columns.append([None if value != value else value for value in values.tolist()])
+        else:
+            text_columns.append(values.tolist())
+    return zip(*text_columns)
+
+
+def _check_header(existing, names, filename):
+    if list(existing) != list(names):
+        raise ValueError(
+            f"Kan ikke legge til i {filename}: kolonnene {list(existing)} "
+            f"stemmer ikke med {list(names)}"
+        )
+
+
+def _write_jsonl(columns, filename, append):
+    names = list(columns)
+    if append:
+        with open(filename, encoding='utf-8') as f:
+            first_line = f.readline()
+        if first_line.strip():
+            _check_header(json.loads(first_line), names, filename)
+    with open(filename, 'a' if append else 'w', encoding='utf-8') as f:
+        for row in _text_rows(columns):
+            f.write(json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n")
+
+
+def _write_csv(columns, filename, append):
+    names = list(columns)
+    write_header = True
+    if append:
+        with open(filename, newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f), None)
+        if header:
+            _check_header(header, names, filename)
+            write_header = False
+    with open(filename, 'a' if append else 'w', newline='', encoding='utf-8') as f:
+        csv_writer = csv.writer(f)
+        if write_header:
+            csv_writer.writerow(names)
+        csv_writer.writerows(
+            ['' if value is None else value for value in row] for row in _text_rows(columns)
+        )
+
+
+# ---- BINARY FORMATS (REWRITTEN WITH OLD + NEW ROWS) --------------------------------------------
+def _replace_atomically(filename, write):
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    write(temp_filename)
+    os.replace(temp_filename, filename)
+
+
+def _write_npz(columns, filename, append):
+    if append:
+        with np.load(filename) as existing:
+            _check_header(existing.files, columns, filename)
+            columns = {
+                name: np.concatenate([existing[name], values]) for name, values in columns.items()
+            }
+
+    def write(path):
+        with open(path, 'wb') as f:  # File object, so np.savez does not add '.npz'
+            np.savez(f, **columns)
+
+    _replace_atomically(filename, write)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet- og Arrow-eksport krever pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _arrow_table(columns):
+    pa = _import_pyarrow()
+    arrays = {}
+    for name, values in columns.items():
+        if name == 'time':
+            arrays[name] = pa.array(values, type=pa.timestamp('s', tz='UTC'))
+        elif values.dtype.kind == 'U':
+            arrays[name] = pa.array(values.tolist(), type=pa.string())
+        else:
+            arrays[name] = pa.array(values, from_pandas=True)  # from_pandas: NaN -> null
+    return pa.table(arrays)
+
+
+def _write_parquet(columns, filename, append):
+    table = _arrow_table(columns)
+    pa = _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    if append:
+        existing = pq.read_table(filename)
+        _check_header(existing.column_names, columns, filename)
+        table = pa.concat_tables([existing, table.cast(existing.schema)])
+    _replace_atomically(filename, lambda path: pq.write_table(table, path))
+
+
+def _write_arrow(columns, filename, append):
+    table = _arrow_table(columns)
+    pa = _import_pyarrow()
+
+    if append:
+        with pa.memory_map(filename) as source:
+            existing = pa.ipc.open_file(source).read_all()
+        _check_header(existing.column_names, columns, filename)
+        table = pa.concat_tables([existing, table.cast(existing.schema)])
+
+    def write(path):
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    _replace_atomically(filename, write)
+
+
+_WRITERS = {
+    'jsonl': _write_jsonl, 'csv': _write_csv, 'npz': _write_npz,
+    'parquet': _write_parquet, 'arrow': _write_arrow,
+}
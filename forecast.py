@@ -0,0 +1,265 @@
+# ================================================================================================
+# FORECAST CONTAINER: TYPED ARRAYS SHARED BY CSV, TERMINAL AND PLOT
+# ================================================================================================
+#
+# One hourly forecast is held as preallocated float64 NumPy arrays (NaN = missing value) on a
+# datetime64 time axis. Data is converted exactly once, when the MET timeseries is untangled,
+# and the same arrays are then handed to the CSV writer, terminal summary and plot.
+#
+# Which MET values are extracted is declared in FIELDS (name -> block, key, default). Any subset
+# of fields is compiled into a per-block extraction plan, so 4 or 20 variables cost one pass
+# over the timeseries. Fields beyond the four core VARIABLES are kept in Forecast.extra.
+#
+# ================================================================================================
+import csv
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+NORWAY_TIMEZONE = ZoneInfo("Europe/Oslo")  # It's Norway time.
+CSV_HEADER = ['time', 'temperature', 'precipitation', 'windspeed', 'windgust']
+VARIABLES = ('temperature', 'precipitation', 'windspeed', 'windgust')
+
+# ---- FIELD SPEC: NAME -> (MET BLOCK, KEY IN ITS 'details', VALUE IF ABSENT) --------------------
+FIELDS = {
+    # Core variables (always extracted). Missing precipitation counts as none, as before.
+    'temperature': ('instant', 'air_temperature', None),
+    'precipitation': ('next_1_hours', 'precipitation_amount', 0),
+    'windspeed': ('instant', 'wind_speed', None),
+    'windgust': ('instant', 'wind_speed_of_gust', None),
+    # Instant values
+    'humidity': ('instant', 'relative_humidity', None),
+    'pressure': ('instant', 'air_pressure_at_sea_level', None),
+    'dew_point': ('instant', 'dew_point_temperature', None),
+    'cloud_fraction': ('instant', 'cloud_area_fraction', None),
+    'cloud_fraction_low': ('instant', 'cloud_area_fraction_low', None),
+    'cloud_fraction_medium': ('instant', 'cloud_area_fraction_medium', None),
+    'cloud_fraction_high': ('instant', 'cloud_area_fraction_high', None),
+    'fog_fraction': ('instant', 'fog_area_fraction', None),
+    'wind_direction': ('instant', 'wind_from_direction', None),
+    'uv_index': ('instant', 'ultraviolet_index_clear_sky', None),
+    'temperature_p10': ('instant', 'air_temperature_percentile_10', None),
+    'temperature_p90': ('instant', 'air_temperature_percentile_90', None),
+    'windspeed_p10': ('instant', 'wind_speed_percentile_10', None),
+    'windspeed_p90': ('instant', 'wind_speed_percentile_90', None),
+    # Next hour
+    'precipitation_min': ('next_1_hours', 'precipitation_amount_min', None),
+    'precipitation_max': ('next_1_hours', 'precipitation_amount_max', None),
+    'precipitation_probability': ('next_1_hours', 'probability_of_precipitation', None),
+    'thunder_probability': ('next_1_hours', 'probability_of_thunder', None),
+    # Next 6 hours
+    'temperature_max_6h': ('next_6_hours', 'air_temperature_max', None),
+    'temperature_min_6h': ('next_6_hours', 'air_temperature_min', None),
+    'precipitation_6h': ('next_6_hours', 'precipitation_amount', None),
+}
+_EMPTY = {}
+
+
+def field_spec(name):
+    """
+    (block, key, default) for a field name.
+
+    Accepts a FIELDS name ('humidity'), a MET instant key ('wind_from_direction'), or any
+    'block.key' path ('next_12_hours.probability_of_precipitation').
+
+    Raises:
+        ValueError: Unknown name
+    """
+    if name in FIELDS:
+        return FIELDS[name]
+    for block, key, default in FIELDS.values():
+        if block == 'instant' and key == name:
+            return block, key, default
+    block, dot, key = name.partition('.')
+    if dot and block and key:
+        return block, key, None
+    raise ValueError(f"Ukjent felt '{name}'. Tilgjengelige: {', '.join(FIELDS)}")
+
+
+def parse_fields(fields):
+    """Field names from 'a,b,c' or an iterable, validated, duplicates and core variables dropped."""
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    names = []
+    for name in (name.strip() for name in fields):
+        if name and name not in VARIABLES and name not in names:
+            field_spec(name)
+            names.append(name)
+    return tuple(names)
+
+
+def compile_fields(names):
+    """
+    Extraction plan for the given field names: one entry per MET block.
+
+    Returns:
+        Tuple of (block, ((key, row, default), ...)), where row is the field's index in names.
+    """
+    plan = {}
+    for row, name in enumerate(names):
+        block, key, default = field_spec(name)
+        plan.setdefault(block, []).append((key, row, default))
+    return tuple((block, tuple(columns)) for block, columns in plan.items())
+
+
+def format_time_labels(times, tz=NORWAY_TIMEZONE):
+    """Format datetime64 (UTC) values as local 'HH.MM' labels, e.g. '10.00'."""
+    seconds = np.asarray(times, dtype='datetime64[s]').astype(np.int64)
+    return [datetime.fromtimestamp(s, tz).strftime('%H.%M') for s in seconds.tolist()]
+
+
+class Forecast:
+    """Hourly forecast as typed arrays: one datetime64 time axis, float64 values (NaN = missing)."""
+
+    __slots__ = ('times', 'labels', 'temperature', 'precipitation', 'windspeed', 'windgust', 'extra')
+
+    def __init__(
+        self, times, temperature, precipitation, windspeed, windgust, labels=None, extra=None
+    ):
+        self.times = np.asarray(times, dtype='datetime64[s]')
+        self.temperature = np.asarray(temperature, dtype=np.float64)
+        self.precipitation = np.asarray(precipitation, dtype=np.float64)
+        self.windspeed = np.asarray(windspeed, dtype=np.float64)
+        self.windgust = np.asarray(windgust, dtype=np.float64)
+        self.labels = list(labels) if labels is not None else format_time_labels(self.times)
+        # Additional fields (see FIELDS), name -> float64 array
+        self.extra = {
+            name: np.asarray(values, dtype=np.float64) for name, values in (extra or {}).items()
+        }
+
+    def __len__(self):
+        return len(self.times)
+
+    def __repr__(self):
+        return f"Forecast({len(self)} hours)"
+
+    def __getitem__(self, name):
+        """Values of a core variable or extra field by name."""
+        return getattr(self, name) if name in VARIABLES else self.extra[name]
+
+    @property
+    def fields(self):
+        """Names of all variables held: the core VARIABLES, then extra fields."""
+        return VARIABLES + tuple(self.extra)
+
+    @classmethod
+    def empty(cls, n_hours, fields=()):
+        """Preallocate a forecast of n_hours, every value missing (NaN / NaT)."""
+        return cls(
+            np.full(n_hours, np.datetime64('NaT'), dtype='datetime64[s]'),
+            *(np.full(n_hours, np.nan) for _ in VARIABLES),
+            labels=[''] * n_hours,
+            extra={name: np.full(n_hours, np.nan) for name in parse_fields(fields)},
+        )
+
+    @classmethod
+    def from_timeseries(cls, timeseries, hours, tz=NORWAY_TIMEZONE, fields=()):
+        """
+        Untangle a MET 'timeseries' list into a Forecast in a single pass.
+
+        Args:
+            timeseries: properties.timeseries from the MET locationforecast JSON
+            hours: Forecast length; hours+1 points are kept (both ends included)
+            tz: Timezone used for the time labels
+            fields: Extra fields besides the core VARIABLES, as names or 'a,b,c' (see FIELDS)
+
+        Returns:
+            Forecast with only the leading run of 1-hour intervals.
+        """
+        names = VARIABLES + parse_fields(fields)
+        plan = compile_fields(names)
+        n_hours = min(len(timeseries), hours + 1)
+        values = np.full((len(names), n_hours), np.nan)
+        times = np.full(n_hours, np.datetime64('NaT'), dtype='datetime64[s]')
+        labels = [''] * n_hours
+
+        prev_datetime = None
+        count = 0
+        for hourly_forecast_entry in timeseries:
+            if count >= n_hours:
+                break
+
+            datetime_object = datetime.fromisoformat(hourly_forecast_entry["time"]).astimezone(tz)
+
+            # Only intervals of 1 hour - stop at first non-hourly interval
+            if prev_datetime is not None and (datetime_object - prev_datetime).total_seconds() != 3600:
+                break
+
+            times[count] = np.datetime64(int(datetime_object.timestamp()), 's')
+            labels[count] = datetime_object.strftime('%H.%M')  # e.g., "10.00"
+
+            entry_data = hourly_forecast_entry["data"]
+            for block, columns in plan:
+                details = entry_data.get(block, _EMPTY).get("details", _EMPTY)
+                for key, row, default in columns:
+                    value = details.get(key, default)
+                    if value is not None:  # Absent stays NaN
+                        values[row, count] = value
+
+            prev_datetime = datetime_object
+            count += 1
+
+        core = len(VARIABLES)
+        return cls(
+            times[:count], *values[:core, :count], labels=labels[:count],
+            extra={name: values[row, :count] for row, name in enumerate(names[core:], core)},
+        )
+
+    def take(self, indices):
+        """New Forecast holding the given hours (slice or index array) of this one."""
+        if isinstance(indices, slice):
+            labels = self.labels[indices]
+        else:
+            labels = [self.labels[i] for i in np.asarray(indices).tolist()]
+        return Forecast(
+            self.times[indices], self.temperature[indices], self.precipitation[indices],
+            self.windspeed[indices], self.windgust[indices], labels=labels,
+            extra={name: values[indices] for name, values in self.extra.items()},
+        )
+
+    def decimation_indices(self, max_points):
+        """
+        Indices of the hours to draw when the plot has room for about max_points.
+
+        Min/max-bucket decimation: the series is cut into equal buckets and, for every
+        variable, the hours holding each bucket's minimum and maximum are kept. Extremes
+        (coldest/warmest hour, peak gust, precipitation maximum) are therefore never lost.
+        First and last hour are always kept, so the x-range is unchanged.
+
+        Returns:
+            Sorted index array; all hours if the series already fits.
+        """
+        n = len(self)
+        n_buckets = max(1, max_points // (2 * len(VARIABLES)))
+        if n <= max_points or n <= 2 * n_buckets:
+            return np.arange(n)
+
+        bucket_size = -(-n // n_buckets)  # ceil
+        values = np.full((len(VARIABLES), n_buckets * bucket_size), np.nan)
+        for row, name in enumerate(VARIABLES):
+            values[row, :n] = getattr(self, name)
+        values = values.reshape(len(VARIABLES), n_buckets, bucket_size)
+
+        # NaN (missing, or padding past the end) never wins a bucket
+        missing = np.isnan(values)
+        argmins = np.where(missing, np.inf, values).argmin(axis=2)
+        argmaxs = np.where(missing, -np.inf, values).argmax(axis=2)
+
+        bucket_starts = np.arange(n_buckets) * bucket_size
+        kept = np.concatenate([
+            (bucket_starts + argmins).ravel(), (bucket_starts + argmaxs).ravel(), [0, n - 1]
+        ])
+        return np.unique(kept[kept < n])
+
+    def write_csv(self, filename):
+        """Write time label + all variables (extra fields last) as CSV, missing values empty."""
+        columns = [
+            ['' if np.isnan(value) else value for value in self[name].tolist()]
+            for name in self.fields
+        ]
+        with open(filename, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(CSV_HEADER + list(self.extra))
+            csv_writer.writerows(zip(self.labels, *columns))
+
@@ -0,0 +1,243 @@
+# ================================================================================================
+# NATIONAL FORECAST CUBE: MEMORY-MAPPED KOMMUNE x HOUR x VARIABLE ARRAY
+# ================================================================================================
+#
+# Every kommune's forecast in one dense float32 array of shape (kommune, hour, variable), stored
+# as a .npy file and opened memory-mapped, so queries read only the pages they touch and a
+# refresh of one kommune rewrites one contiguous block in place. Sidecar .npy files index the
+# axes:
+#
+#   values.npy      float32 (kommune, hour, variable), NaN = no data
+#   kommuner.npy    kommune names           fylker.npy     fylke (may be empty)
+#   latitudes.npy   float64                 longitudes.npy float64
+#   times.npy       datetime64[s] (UTC), hourly; the window moves forward as data gets newer
+#   updated.npy     datetime64[s] (UTC) of each kommune's last refresh (NaT = never)
+#   variables.json  variable names, in the order of the last axis
+#
+# Queries (top_n, by_fylke, below) are NumPy reductions over a slice of the mapped array.
+#
+# ================================================================================================
+import json
+import os
+import warnings
+
+import numpy as np
+
+from forecast import VARIABLES
+
+HOUR = np.timedelta64(3600, 's')
+_SIDECARS = ('kommuner', 'fylker', 'latitudes', 'longitudes', 'times', 'updated')
+
+
+class ForecastCube:
+    """Memory-mapped (kommune, hour, variable) float32 forecast array with index sidecars."""
+
+    def __init__(self, directory, writable=False):
+        """
+        Open an existing cube.
+
+        Args:
+            directory: Directory written by ForecastCube.create()
+            writable: Open for in-place updates (values, times and updated are then writable)
+        """
+        self.directory = directory
+        mode = 'r+' if writable else 'r'
+        self.values = np.load(self._path('values'), mmap_mode=mode)
+        self.kommuner = np.load(self._path('kommuner'))
+        self.fylker = np.load(self._path('fylker'))
+        self.latitudes = np.load(self._path('latitudes'))
+        self.longitudes = np.load(self._path('longitudes'))
+        self.times = np.load(self._path('times'), mmap_mode=mode)
+        self.updated = np.load(self._path('updated'), mmap_mode=mode)
+        with open(os.path.join(directory, 'variables.json'), encoding='utf-8') as f:
+            self.variables = tuple(json.load(f))
+        self._rows = {name: row for row, name in enumerate(self.kommuner.tolist())}
+
+    def __repr__(self):
+        n_kommuner, n_hours, n_variables = self.values.shape
+        return f"ForecastCube({n_kommuner} kommuner x {n_hours} hours x {n_variables} variables)"
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.npy")
+
+    @classmethod
+    def create(cls, directory, kommuner, fylker, latitudes, longitudes, start, hours=48,
+               variables=VARIABLES):
+        """
+        Create an empty cube (all NaN) on disk and open it for writing.
+
+        Args:
+            directory: Where the cube files go (created if missing)
+            kommuner, fylker, latitudes, longitudes: One entry per kommune (row)
+            start: First hour of the time window, datetime64 (UTC)
+            hours: Forecast length; the window holds hours+1 points
+            variables: Variable names for the last axis
+        """
+        os.makedirs(directory, exist_ok=True)
+        n_kommuner = len(kommuner)
+        sidecars = {
+            'kommuner': np.asarray(kommuner, dtype=str),
+            'fylker': np.asarray(fylker, dtype=str),
+            'latitudes': np.asarray(latitudes, dtype=np.float64),
+            'longitudes': np.asarray(longitudes, dtype=np.float64),
+            'times': np.datetime64(start, 's') + np.arange(hours + 1) * HOUR,
+            'updated': np.full(n_kommuner, np.datetime64('NaT'), dtype='datetime64[s]'),
+        }
+        for name in _SIDECARS:
+            np.save(os.path.join(directory, f"{name}.npy"), sidecars[name])
+        values = np.lib.format.open_memmap(
+            os.path.join(directory, 'values.npy'), mode='w+', dtype=np.float32,
+            shape=(n_kommuner, hours + 1, len(variables)),
+        )
+        values[:] = np.nan
+        values.flush()
+        del values
+        with open(os.path.join(directory, 'variables.json'), 'w', encoding='utf-8') as f:
+            json.dump(list(variables), f)
+        return cls(directory, writable=True)
+
+    # ---- UPDATES (IN PLACE) --------------------------------------------------------------------
+    def row(self, kommune):
+        """Row index of a kommune (KeyError if not in the cube)."""
+        return self._rows[kommune]
+
+    def advance(self, start):
+        """
+        Move the time window forward so it begins at start (whole hours); data that is still
+        inside the window is shifted along, the new hours at the end are NaN.
+        """
+        shift = int((np.datetime64(start, 's') - self.times[0]) // HOUR)
+        if shift <= 0:
+            return
+        n_hours = len(self.times)
+        if shift < n_hours:
+            self.values[:, :n_hours - shift] = self.values[:, shift:]
+        self.values[:, max(n_hours - shift, 0):] = np.nan
+        self.times[:] = self.times + shift * HOUR
+
+    def update(self, kommune, forecast, now=None):
+        """
+        Write one kommune's Forecast into its row, in place.
+
+        A forecast that starts after the window moves the window forward first. Variables the
+        cube holds but the forecast lacks become NaN.
+        """
+        if len(forecast) and forecast.times[0] > self.times[0]:
+            self.advance(forecast.times[0])
+        block = np.full(self.values.shape[1:], np.nan, dtype=np.float32)
+        columns = ((forecast.times - self.times[0]) // HOUR).astype(np.intp)
+        inside = (columns >= 0) & (columns < len(self.times))
+        for v, name in enumerate(self.variables):
+            if name in forecast.fields:
+                block[columns[inside], v] = forecast[name][inside]
+        row = self.row(kommune)
+        self.values[row] = block  # One contiguous write
+        self.updated[row] = np.datetime64('now', 's') if now is None else now
+
+    def flush(self):
+        """Write pending changes to disk."""
+        for array in (self.values, self.times, self.updated):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    # ---- QUERIES (REDUCTIONS OVER THE MAPPED ARRAY) --------------------------------------------
+    def hour_slice(self, start=None, end=None):
+        """
+        Slice of the hour axis between two datetime64 times (UTC), start inclusive, end exclusive.
+        None means the start/end of the window.
+        """
+        first = 0 if start is None else int(np.searchsorted(self.times, np.datetime64(start, 's')))
+        last = (
+            len(self.times) if end is None
+            else int(np.searchsorted(self.times, np.datetime64(end, 's')))
+        )
+        return slice(first, max(first, last))
+
+    def _reduce(self, variable, hours, how):
+        """Per-kommune nan-reduction ('max', 'min', 'mean', 'sum'); NaN for kommuner without data."""
+        values = self.values[:, hours, self.variables.index(variable)]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN rows
+            reduced = getattr(np, f'nan{how}')(values, axis=1)
+        reduced[np.isnan(values).all(axis=1)] = np.nan
+        return reduced
+
+    def top_n(self, variable='windgust', n=10, start=None, end=None, how='max'):
+        """
+        The n kommuner with the highest per-kommune reduction of a variable in a time range.
+
+        Args:
+            variable: Variable name, e.g. 'windgust' or 'windspeed'
+            n: Number of kommuner
+            start, end: Time range (see hour_slice)
+            how: Per-kommune reduction over the hours: 'max', 'mean', 'sum' or 'min'
+
+        Returns:
+            List of (kommune, value), highest first; kommuner without data are left out.
+        """
+        reduced = self._reduce(variable, self.hour_slice(start, end), how)
+        ranked = np.argsort(np.where(np.isnan(reduced), -np.inf, reduced))[::-1][:n]
+        return [
+            (str(self.kommuner[row]), float(reduced[row])) for row in ranked.tolist()
+            if not np.isnan(reduced[row])
+        ]
+
+    @property
+    def has_fylker(self):
+        """True if every kommune has a fylke, so per-fylke results cover the whole country."""
+        return len(self.fylker) > 0 and bool(np.all(self.fylker != ''))
+
+    def by_fylke(self, variable='precipitation', start=None, end=None, how='sum'):
+        """
+        Mean and max over each fylke's kommuner of a per-kommune reduction in a time range.
+
+        A sum over kommuner would mostly reflect how many kommuner a fylke has, so each fylke
+        gets its typical (mean) and worst (max) kommune instead.
+
+        Args:
+            variable: Variable name
+            start, end: Time range (see hour_slice)
+            how: Per-kommune reduction over the hours, as for top_n (e.g. 'sum' for precipitation)
+
+        Returns:
+            Dict of fylke -> (mean, max), highest mean first; fylker without data are left out.
+
+        Raises:
+            ValueError: Some kommuner have no fylke (see has_fylker)
+        """
+        if not self.has_fylker:
+            raise ValueError("Kuben mangler fylke for noen kommuner")
+        per_kommune = self._reduce(variable, self.hour_slice(start, end), how)
+        groups, inverse = np.unique(self.fylker, return_inverse=True)
+        valid = ~np.isnan(per_kommune)
+        counts = np.bincount(inverse[valid], minlength=len(groups))
+        sums = np.bincount(inverse[valid], weights=per_kommune[valid], minlength=len(groups))
+        maxima = np.full(len(groups), -np.inf)
+        np.maximum.at(maxima, inverse[valid], per_kommune[valid])
+        means = sums / np.maximum(counts, 1)
+        order = np.argsort(np.where(counts > 0, means, -np.inf))[::-1]
+        return {
+            str(groups[i]): (float(means[i]), float(maxima[i])) for i in order.tolist() if counts[i]
+        }
+
+    def below(self, threshold=0.0, variable='temperature', start=None, end=None):
+        """
+        Kommuner where a variable drops below threshold in a time range (e.g. frost tonight).
+
+        Returns:
+            List of (kommune, minimum, first time below threshold), coldest first.
+        """
+        hours = self.hour_slice(start, end)
+        values = self.values[:, hours, self.variables.index(variable)]
+        with np.errstate(invalid='ignore'):
+            under = values < threshold
+        rows = np.flatnonzero(under.any(axis=1))
+        minimums = np.nanmin(values[rows], axis=1) if len(rows) else np.empty(0)
+        first_hours = under[rows].argmax(axis=1)
+        window_times = self.times[hours]
+        result = [
+            (str(self.kommuner[row]), float(minimum), window_times[first])
+            for row, minimum, first in zip(rows.tolist(), minimums.tolist(), first_hours.tolist())
+        ]
+        return sorted(result, key=lambda item: item[1])
+
@@ -0,0 +1,236 @@
+# ================================================================================================
+# ONE KOMMUNE: LOAD, WRITE AND SHOW A FORECAST
+# ================================================================================================
+#
+# A ForecastRun is the single-kommune command line: where its forecast comes from (test data,
+# a sample file or MET through the cache), the files written for every forecast shown (the CSV
+# and --export) and how it is shown (table, terminal chart, plot window).
+#
+# The MET request (or cache read), parsing and terminal output run in a worker thread, started
+# as soon as the coordinates are known. Meanwhile the main thread (where Tk must live) imports
+# matplotlib, probes the screen and opens the empty figure, so a slow fetch hides behind them.
+# Watch mode (watch.py) reloads and redraws through the same methods.
+#
+# ================================================================================================
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from forecast import Forecast
+from phase_timer import TIMER
+import metrics
+from export import export
+from palette_static import get_colormap
+from plotting import draw_forecast, plot_rc, screen_figsize
+from terminal import render_table, render_termplot
+from national import update_cube_row
+from weather_data import (
+    cache_expires_in, fetch_forecast, kommune_entry, load_sample, resolve, synthetic_forecast
+)
+
+OUTPUT_CSV = os.path.join("output", "norweather_twoday.csv")
+
+
+class ForecastRun:
+    """
+    One kommune's forecast as the command line shows it (see the header).
+
+    After start(): forecast, stale_note, table_text (None without terminal output) and figure
+    (None without a plot window); after draw(), plot_artists.
+    """
+
+    def __init__(
+        self, kommune, hours=48, test=False, seed=None, swr=False, fields=(), export_file=None,
+        append=False, table=True, termplot=False, dark_mode=False,
+    ):
+        """
+        Args:
+            kommune: Name as accepted by resolve(), 'sample1'/'sample2', or the key for test data
+            hours: Forecast length
+            test: Synthetic data (seeded with seed) instead of MET
+            swr: Stale-while-revalidate, see weather_data.fetch_weather_data()
+            fields: Extra variables for the CSV and export (see forecast.FIELDS)
+            export_file: Also write each forecast to this file (see export.py) ...
+            append: ... adding rows to it instead of replacing it
+            table, termplot: Terminal output: the table, the terminal chart (either or both)
+            dark_mode: Dark background with glow effects (neon)
+
+        Raises:
+            ValueError: Unknown or ambiguous kommune
+        """
+        self.kommune = kommune
+        self.hours = hours
+        self.test = test
+        self.seed = seed
+        self.swr = swr
+        self.fields = fields
+        self.export_file = export_file
+        self.append = append
+        self.show_table = table
+        self.show_termplot = termplot
+        self.show_terminal = table or termplot
+        self.dark_mode = dark_mode
+
+        display_name = None
+        self.latitude = self.longitude = None
+        if test:
+            display_name = "Test Mode"  # Shown in title / terminal
+        else:
+            with TIMER.phase('get_coordinates'):
+                (self.latitude, self.longitude), display_name = resolve(kommune)
+        if export_file:
+            if test:
+                self.export_entry = (kommune, "", np.nan, np.nan)
+            else:
+                self.export_entry = kommune_entry(kommune)
+
+        self.title_name = display_name or kommune.title()
+        self.table_kwargs = dict(title_name=self.title_name, hours=hours, dark_mode=dark_mode)
+        self.plot_kwargs = dict(self.table_kwargs, test_mode=test)
+
+        self.forecast = self.stale_note = self.table_text = None
+        self.figure = self.plot_artists = None
+
+    def load(self, log=print):
+        """Forecast and stale note from this run's source (test data, sample or MET)."""
+        if self.test:
+            return synthetic_forecast(self.hours, seed=self.seed), None
+
+        stale_note = None  # Shown in terminal and plot when serving data older than the fresh window
+        # Special handling for sample cases
+        if self.kommune in ["sample1", "sample2"]:
+            weather_data = load_sample(self.kommune)
+            log(f"Using sample data from {self.kommune}")
+            # Untangle relevant data
+            with TIMER.phase('extract'), metrics.PARSE_DURATION.time(step='extract'):
+                weather_timeseries = weather_data["properties"]["timeseries"] # Yields a list of dicts.
+                forecast = Forecast.from_timeseries(weather_timeseries, self.hours, fields=self.fields)
+        else:
+            # Through the shared forecast arena too, with --shared-cache
+            forecast, stale_note = fetch_forecast(
+                self.latitude, self.longitude, self.hours, cache_key=self.kommune, swr=self.swr,
+                fields=self.fields, log=log,
+            )
+
+        if self.kommune not in ["sample1", "sample2"] and stale_note is None:
+            update_cube_row(self.kommune, forecast)  # Keeps the national cube current, if there is one
+        return forecast, stale_note
+
+    def expires_in(self):
+        """Seconds until the cached forecast goes stale, or None (no cache, sample or test data)."""
+        if self.test or self.kommune in ["sample1", "sample2"]:
+            return None
+        return cache_expires_in(self.kommune)
+
+    def write_outputs(self, forecast):
+        """Files written for every forecast shown, on start and on each watch refresh."""
+        with TIMER.phase('csv_write'):
+            os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
+            forecast.write_csv(OUTPUT_CSV)
+        if self.export_file:
+            with TIMER.phase('export'):
+                export([(*self.export_entry, forecast)], self.export_file, append=self.append)
+
+    def terminal_text(self, forecast, stale_note, unicode=True):
+        """Table and terminal chart (--termplot), as one string."""
+        parts = []
+        if self.show_table:
+            parts.append(
+                render_table(forecast, stale_note=stale_note, unicode=unicode, **self.table_kwargs)
+            )
+        if self.show_termplot:
+            parts.append(render_termplot(forecast, unicode=unicode, **self.table_kwargs))
+        return "\n".join(parts)
+
+    def fetch_and_print(self, print_table=True):
+        """
+        Load the forecast, write the CSV (and --export) and render the terminal forecast as soon
+        as the data is in, printing it unless print_table is False (watch mode prints it as a
+        live block).
+
+        Returns:
+            (forecast, stale_note, terminal text or None)
+        """
+        forecast, stale_note = self.load()
+        self.write_outputs(forecast)
+
+        # ---- COMMAND-LINE FORECAST -------------------------------------------------------------
+        table_text = None
+        TIMER.start('terminal')
+        render_start = time.perf_counter()
+        if self.show_terminal:
+            table_text = self.terminal_text(forecast, stale_note)
+            if print_table:
+                try:
+                    print(table_text)
+                except UnicodeEncodeError:
+                    # Fallback for terminals that don't support Unicode bullets
+                    print(self.terminal_text(forecast, stale_note, unicode=False))
+            metrics.RENDER_DURATION.observe(time.perf_counter() - render_start, target='terminal')
+        else:
+            print("Kun plot, ikke kommandolinje-varsel")
+        TIMER.stop('terminal')
+        return forecast, stale_note, table_text
+
+    def start(self, open_figure=True, print_table=True):
+        """
+        Get the forecast in a worker thread (fetch_and_print()) while this thread opens the empty
+        plot window, if open_figure.
+
+        Raises:
+            MetUnavailable, MetRequestError: No data from MET and no cached copy.
+        """
+        with ThreadPoolExecutor(max_workers=1) as fetcher:
+            pending = fetcher.submit(self.fetch_and_print, print_table)
+            if open_figure:
+                with TIMER.phase('imports'):
+                    import matplotlib as mpl
+                    import matplotlib.pyplot as plt
+                    get_colormap(dark_mode=self.dark_mode)  # Built once, cached
+
+                #  Dynamic figure sizing based on screen resolution w/ fallback
+                with TIMER.phase('screen_probe'):
+                    figsize = screen_figsize()
+                with mpl.rc_context(plot_rc(self.dark_mode)):
+                    self.figure = plt.figure(figsize=figsize)
+            with TIMER.phase('fetch_wait'):  # Fetch time not hidden behind the plot setup
+                self.forecast, self.stale_note, self.table_text = pending.result()
+
+    def draw(self):
+        """Draw the current forecast into the figure, clearing an earlier drawing first."""
+        import matplotlib as mpl
+
+        with mpl.rc_context(plot_rc(self.dark_mode)):
+            if self.plot_artists is not None:
+                self.figure.clear()
+            self.plot_artists = draw_forecast(
+                self.figure, self.forecast, stale_note=self.stale_note, **self.plot_kwargs
+            )
+
+    def show_plot(self, draw_now=False, show=True):
+        """
+        Plot into the figure opened by start() and show the window (blocking) if show.
+
+        Args:
+            draw_now: Render once outside the event loop, so drawing cost shows up in --profile
+            show: plt.show() here; watch mode shows the window itself, without blocking
+        """
+        import matplotlib as mpl
+        import matplotlib.pyplot as plt
+
+        self.draw()
+        if draw_now:
+            with TIMER.phase('draw'):
+                self.figure.canvas.draw()
+
+        # Window maximization
+        try:
+            plt.get_current_fig_manager().window.wm_state('zoomed')
+        except:
+            pass
+
+        if show:
+            with mpl.rc_context(plot_rc(self.dark_mode)):
+                plt.show()
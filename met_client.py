@@ -0,0 +1,358 @@
+# ================================================================================================
+# RESILIENT HTTP CLIENT FOR api.met.no: TIMEOUTS, RETRIES, CIRCUIT BREAKER
+# ================================================================================================
+#
+# Every request has a connect and a read timeout, so a stalled connection can never hang the
+# process. Connection errors, timeouts, 429 and 5xx are retried a bounded number of times with
+# full-jitter exponential backoff, honoring Retry-After when the server sends it. Only 200 and
+# 304 are ever returned; everything else raises MetUnavailable (upstream unhealthy, try the
+# cache) or MetRequestError (our request is wrong, retrying will not help).
+#
+# The circuit breaker state lives in a small JSON file, so it survives between the short runs
+# of the script: after repeated failed fetches the circuit opens and further runs skip the
+# network entirely (serving the last good cache) until the cooldown has passed.
+#
+# fetch_to_cache() wraps the conditional GET (If-Modified-Since from the cache file's mtime)
+# and the atomic cache write. spawn_revalidation() runs it in a detached process, for
+# stale-while-revalidate: the caller renders the stale entry and exits at once, while the
+# refreshed entry is ready for the next call.
+#
+# Usage:
+#   client = MetClient()
+#   try:
+#       response = client.get(url, headers=headers)    # 200 or 304
+#   except MetUnavailable:
+#       ...                                             # fall back to last good cache
+#
+#   python met_client.py --revalidate URL CACHE_FILE    # what spawn_revalidation() runs
+#
+# ================================================================================================
+import argparse
+import contextlib
+import email.utils
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+import metrics
+
+CONNECT_TIMEOUT = 3.05              # Seconds; slightly above a multiple of 3 (TCP retransmit)
+READ_TIMEOUT = 10.0                 # Seconds between bytes, not for the whole body
+MAX_RETRIES = 3                     # Retries after the first attempt
+BACKOFF_BASE = 0.5                  # Seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 30.0                  # Upper bound on any single wait, including Retry-After
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+BREAKER_FAILURE_THRESHOLD = 3       # Consecutive failed fetches before the circuit opens
+BREAKER_COOLDOWN = 300.0            # Seconds the circuit stays open before one trial request
+BREAKER_STATE_FILE = os.path.join("temp_data", "met_circuit.json")
+
+USER_AGENT = "norweather-twoday github.com/haaveb/norweather-twoday"
+REVALIDATION_LOCK_TIMEOUT = 120.0   # Seconds before a leftover revalidation lock is ignored
+
+
+class MetUnavailable(Exception):
+    """Upstream is unhealthy (timeouts, 429/5xx, open circuit); use cached data if any."""
+
+
+class MetRequestError(Exception):
+    """Non-retryable response (e.g. 400, 403, 404); the request itself needs fixing."""
+
+
+def retry_after_seconds(value, now=None):
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds to wait.
+
+    Returns:
+        Non-negative float, or None if the header is absent or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_time = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, retry_time.timestamp() - now)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with file-backed state.
+
+    closed → open after failure_threshold failed fetches; open → half-open (one trial
+    request allowed) after cooldown seconds; a success closes it again, a failure re-opens it.
+    With state_file=None the state is kept in memory only.
+    """
+
+    def __init__(
+        self, state_file=BREAKER_STATE_FILE,
+        failure_threshold=BREAKER_FAILURE_THRESHOLD, cooldown=BREAKER_COOLDOWN,
+    ):
+        self.state_file = state_file
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures, self.opened_at = self._load()
+
+    def _load(self):
+        if self.state_file is None:
+            return 0, None
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return int(state.get('failures', 0)), state.get('opened_at')
+        except (OSError, ValueError, AttributeError):
+            return 0, None
+
+    def _save(self):
+        if self.state_file is None:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_file)), exist_ok=True)
+        temp_filename = _temp_name(self.state_file)
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump({'failures': self.failures, 'opened_at': self.opened_at}, f)
+        os.replace(temp_filename, self.state_file)
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.time() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow_request(self):
+        return self.state != 'open'
+
+    def record_success(self):
+        if self.failures or self.opened_at is not None:
+            self.failures, self.opened_at = 0, None
+            self._save()
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half-open' or self.failures >= self.failure_threshold:
+            self.opened_at = time.time()
+        self._save()
+
+
+class MetClient:
+    """GET requests to api.met.no with timeouts, bounded jittered retries and a circuit breaker."""
+
+    def __init__(
+        self, session=None, breaker=None,
+        connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+        max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+    ):
+        self.session = session if session is not None else requests.Session()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (0-based): Retry-After, else full jitter."""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get(self, url, headers=None):
+        """
+        GET url, retrying transient failures.
+
+        Returns:
+            requests.Response with status 200 or 304.
+
+        Raises:
+            MetUnavailable: Circuit open, or every attempt failed transiently.
+            MetRequestError: Non-retryable status (4xx other than 429).
+        """
+        if not self.breaker.allow_request():
+            raise MetUnavailable(
+                f"api.met.no marked unhealthy after {self.breaker.failures} failed fetches; "
+                f"skipping network for up to {int(self.breaker.cooldown)} s"
+            )
+
+        last_problem = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            fetch_start = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.Timeout, requests.ConnectionError) as exc:
+                metrics.FETCH_DURATION.observe(time.perf_counter() - fetch_start)
+                metrics.MET_RESPONSES.inc(code=type(exc).__name__)
+                last_problem = f"{type(exc).__name__}: {exc}"
+            else:
+                metrics.FETCH_DURATION.observe(time.perf_counter() - fetch_start)
+                metrics.MET_RESPONSES.inc(code=response.status_code)
+                metrics.FETCH_BYTES.inc(len(response.content))
+
+                if response.status_code in (200, 304):
+                    self.breaker.record_success()
+                    return response
+                if response.status_code not in RETRY_STATUS_CODES:
+                    raise MetRequestError(
+                        f"api.met.no answered {response.status_code} {response.reason} for {url}"
+                    )
+                last_problem = f"HTTP {response.status_code} {response.reason}"
+                retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+
+            if attempt < self.max_retries:
+                metrics.MET_RETRIES.inc()
+                time.sleep(self.backoff(attempt, retry_after))
+
+        self.breaker.record_failure()
+        raise MetUnavailable(
+            f"api.met.no failed {self.max_retries + 1} attempts (last: {last_problem})"
+        )
+
+
+# ================================================================================================
+# CACHE FILES: CONDITIONAL FETCH, BACKGROUND REVALIDATION
+# ================================================================================================
+
+def conditional_headers(cache_file, user_agent=USER_AGENT):
+    """Request headers, with If-Modified-Since from the cache file's mtime if it exists."""
+    headers = {"User-Agent": user_agent}
+    try:
+        cache_mtime = os.path.getmtime(cache_file)
+    except OSError:
+        return headers
+    cache_time = datetime.fromtimestamp(cache_mtime, tz=timezone.utc)
+    headers["If-Modified-Since"] = cache_time.strftime('%a, %d %b %Y %H:%M:%S GMT')
+    return headers
+
+
+def _temp_name(filename):
+    """Temp file next to filename, unique per process and thread (fetches may run in threads)."""
+    return f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def write_cache(cache_file, weather_data):
+    """Write JSON to a temp file and rename, so an interrupted write never leaves a broken cache."""
+    temp_cache_file = _temp_name(cache_file)
+    with open(temp_cache_file, 'w', encoding='utf-8') as f:
+        json.dump(weather_data, f)
+    os.replace(temp_cache_file, cache_file)
+
+
+def _untimed(name):
+    return contextlib.nullcontext()
+
+
+def fetch_to_cache(url, cache_file, client=None, headers=None, timer=None):
+    """
+    Conditional GET of url into cache_file.
+
+    Args:
+        url: MET locationforecast URL
+        cache_file: JSON cache; its mtime is sent as If-Modified-Since
+        client: MetClient to use (default: a new one)
+        headers: Request headers (default: conditional_headers(cache_file))
+        timer: PhaseTimer to record the 'http_fetch', 'json_decode' and 'cache_write' phases
+            in (default: not timed)
+
+    Returns:
+        ('revalidated', None) on 304 - the cache mtime is bumped, so it counts as fresh again;
+        ('miss', weather_data) on 200 - validated data, already written to cache_file.
+
+    Raises:
+        MetUnavailable: Upstream unhealthy, or the 200 body is not a usable forecast.
+        MetRequestError: Non-retryable status.
+    """
+    client = client if client is not None else MetClient()
+    headers = headers if headers is not None else conditional_headers(cache_file)
+    phase = timer.phase if timer is not None else _untimed
+    with phase('http_fetch'):
+        response = client.get(url, headers=headers)
+
+    if response.status_code == 304:
+        os.utime(cache_file)
+        return 'revalidated', None
+
+    try:
+        with phase('json_decode'), metrics.PARSE_DURATION.time(step='json_decode'):
+            weather_data = response.json()
+    except ValueError as exc:
+        raise MetUnavailable(f"api.met.no returned invalid JSON ({exc})") from exc
+    if not isinstance(weather_data, dict) or "timeseries" not in weather_data.get("properties", {}):
+        raise MetUnavailable("api.met.no returned JSON without properties.timeseries")
+    with phase('cache_write'):
+        write_cache(cache_file, weather_data)
+    return 'miss', weather_data
+
+
+def spawn_revalidation(url, cache_file):
+    """
+    Revalidate cache_file in a detached process and return immediately.
+
+    A lock file next to the cache keeps concurrent calls from starting more than one
+    revalidation per entry; a lock older than REVALIDATION_LOCK_TIMEOUT is treated as left
+    over from a crashed run.
+
+    Returns:
+        True if a revalidation process was started, False if one is already running.
+    """
+    lock_file = f"{cache_file}.lock"
+    try:
+        if time.time() - os.path.getmtime(lock_file) > REVALIDATION_LOCK_TIMEOUT:
+            os.remove(lock_file)
+    except OSError:
+        pass
+    try:
+        os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+    except FileExistsError:
+        return False
+
+    command = [sys.executable, os.path.abspath(__file__), '--revalidate', url, cache_file]
+    popen_kwargs = dict(
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        cwd=os.getcwd(), close_fds=True,
+    )
+    if os.name == 'nt':
+        popen_kwargs['creationflags'] = (
+            subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        )
+    else:
+        popen_kwargs['start_new_session'] = True  # Survives the parent exiting / Ctrl-C
+    try:
+        subprocess.Popen(command, **popen_kwargs)
+    except OSError:
+        os.remove(lock_file)
+        raise
+    return True
+
+
+# ================================================================================================
+# COMMAND LINE: BACKGROUND REVALIDATION (STARTED BY spawn_revalidation)
+# ================================================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Oppdater værdata-cache fra api.met.no')
+    parser.add_argument(
+        '--revalidate', nargs=2, metavar=('URL', 'CACHEFIL'), required=True,
+        help='Betinget henting (If-Modified-Since) av URL til CACHEFIL'
+    )
+    args = parser.parse_args()
+
+    url, cache_file = args.revalidate
+    try:
+        fetch_to_cache(url, cache_file)
+    except (MetUnavailable, MetRequestError) as exc:
+        sys.exit(f"Revalidation failed: {exc}")
+    finally:
+        try:
+            os.remove(f"{cache_file}.lock")
+        except OSError:
+            pass
@@ -0,0 +1,197 @@
+# ================================================================================================
+# PROMETHEUS-STYLE METRICS FOR FETCHES, CACHE AND RENDERING
+# ================================================================================================
+#
+# Minimal counters and histograms (no client library needed), rendered in the Prometheus text
+# exposition format. Exposed either as a file for node_exporter's textfile collector, or over
+# HTTP at /metrics for long-running use.
+#
+# Metrics:
+#   norweather_cache_lookups_total{result}       hit | miss | revalidated (304) | stale | sample
+#   norweather_met_responses_total{code}         HTTP status codes (or error type) per attempt
+#   norweather_met_retries_total                 Retried MET requests
+#   norweather_fetch_duration_seconds            MET request latency (histogram)
+#   norweather_fetch_bytes_total                 Response body bytes received
+#   norweather_parse_duration_seconds{step}      json_decode | extract, per forecast (histogram)
+#   norweather_render_duration_seconds{target}   terminal | plot | map, per render (histogram)
+#
+# ================================================================================================
+import http.server
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonically increasing value per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Histogram:
+    """Observations counted into cumulative buckets, with _sum and _count."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the enclosed block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            for upper, count in zip(self.buckets, state):
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(upper))])
+                yield f"{self.name}_bucket", labels, count
+            yield f"{self.name}_bucket", _format_labels(self.labelnames, key, [('le', '+Inf')]), state[-1]
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), state[-2]
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), state[-1]
+
+
+class Registry:
+    """Collection of metrics, rendered together."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, *args, **kwargs):
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, filename):
+        """Write atomically (temp file + rename), as the textfile collector expects."""
+        directory = os.path.dirname(os.path.abspath(filename))
+        os.makedirs(directory, exist_ok=True)
+        temp_filename = f"{filename}.{os.getpid()}.tmp"
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_filename, filename)
+
+    def serve(self, port, host=''):
+        """Serve /metrics over HTTP from a daemon thread. Returns the server."""
+        registry = self
+
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep terminal output clean
+
+        server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# ---- METRICS USED BY norweather_twoday.py ------------------------------------------------------
+REGISTRY = Registry()
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    'norweather_cache_lookups_total',
+    'Forecast cache lookups by result (hit, miss, revalidated, stale, sample, shared).',
+    ['result'],
+)
+MET_RESPONSES = REGISTRY.counter(
+    'norweather_met_responses_total',
+    'Attempts against api.met.no by HTTP status code, or exception name on timeout/connection error.',
+    ['code'],
+)
+MET_RETRIES = REGISTRY.counter(
+    'norweather_met_retries_total', 'Retried requests to api.met.no (timeouts, 429, 5xx).',
+)
+FETCH_DURATION = REGISTRY.histogram(
+    'norweather_fetch_duration_seconds', 'Latency of requests to api.met.no.',
+)
+FETCH_BYTES = REGISTRY.counter(
+    'norweather_fetch_bytes_total', 'Response body bytes received from api.met.no.',
+)
+PARSE_DURATION = REGISTRY.histogram(
+    'norweather_parse_duration_seconds', 'Parse time by step (json_decode, extract).', ['step'],
+)
+RENDER_DURATION = REGISTRY.histogram(
+    'norweather_render_duration_seconds', 'Render time by target (terminal, plot, map).', ['target'],
+)
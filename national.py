@@ -0,0 +1,307 @@
+# ================================================================================================
+# MANY KOMMUNER: BULK EXPORT, NATIONAL TEMPERATURES AND THE FORECAST CUBE
+# ================================================================================================
+#
+# Forecasts for every kommune in the catalogue, fetched one after another through the usual
+# cache: written to one export file (--kommuner), gathered on a shared time axis for the
+# national map (national_map.py), or kept in the memory-mapped national cube (forecast_cube.py)
+# that --query and --alerts read.
+#
+# ================================================================================================
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import alerts
+from export import export, export_format
+from forecast import NORWAY_TIMEZONE
+from forecast_cube import ForecastCube
+from met_client import MetRequestError, MetUnavailable
+from phase_timer import TIMER
+from synthetic_data import hourly_times, synthetic_arrays
+from terminal import format_val
+from weather_data import (
+    CACHE_DIR, _silent, get_forecast, kommune_entries, kommune_entry, kommune_key
+)
+
+CUBE_DIR = os.path.join(CACHE_DIR, "forecast_cube")
+ALERT_STATE_FILE = os.path.join(CACHE_DIR, "alert_state.json")  # Active alerts between runs
+
+
+def fetch_kommuner(entries, hours=48, fields=(), swr=False, log=_silent, on_forecast=None):
+    """
+    Forecasts for many kommuner through the usual cache, one after another.
+
+    Args:
+        entries: (kommune, fylke, latitude, longitude) tuples, see kommune_entries()
+        hours, fields, swr: As for get_forecast()
+        log: Progress messages
+        on_forecast: Called as on_forecast(key, forecast) as soon as each forecast is in
+
+    Returns:
+        (locations, skipped): (kommune, fylke, latitude, longitude, Forecast) for every kommune
+        with data, and the cache keys of those skipped because MET was unavailable or
+        rejected the request (and nothing was cached).
+    """
+    locations, skipped = [], []
+    for i, (kommune, fylke, latitude, longitude) in enumerate(entries, 1):
+        cache_key = kommune_key(kommune, fylke)
+        log(f"[{i}/{len(entries)}] {cache_key}")
+        try:
+            forecast = get_forecast(
+                latitude, longitude, hours, cache_key=cache_key, swr=swr, fields=fields
+            )
+        except (MetUnavailable, MetRequestError) as exc:
+            log(f"Hopper over {cache_key}: {exc}")
+            skipped.append(cache_key)
+            continue
+        locations.append((kommune, fylke, latitude, longitude, forecast))
+        if on_forecast is not None:
+            on_forecast(cache_key, forecast)
+    return locations, skipped
+
+
+def export_kommuner(names, filename, hours=48, fields=(), append=False, swr=False, log=_silent):
+    """
+    Fetch forecasts for many kommuner and write them as one long-format file (see export.py).
+
+    Args:
+        names: Kommune names as accepted by resolve(), or None for every kommune in the CSV
+        filename: Output path; the extension picks the format (.jsonl, .csv, .npz, .parquet, .arrow)
+        hours: Forecast length per kommune
+        fields: Extra variables besides the core four (see forecast.FIELDS)
+        append: Add rows to an existing file instead of replacing it
+        swr: Serve stale cache entries and revalidate them in the background
+        log: Progress messages
+
+    Returns:
+        (rows written, names of kommuner skipped because no data was available)
+
+    Raises:
+        ValueError: Unknown or ambiguous kommune name, or unknown file extension
+        ImportError: Parquet/Arrow file but pyarrow is not installed
+    """
+    export_format(filename)  # Fail before fetching anything
+    entries = kommune_entries() if names is None else [kommune_entry(name) for name in names]
+    locations, skipped = fetch_kommuner(entries, hours, fields=fields, swr=swr, log=log)
+    with TIMER.phase('export'):
+        rows = export(locations, filename, append=append)
+    return rows, skipped
+
+
+def _synthetic_national(entries, hours, seed=None):
+    """Synthetic data for every kommune: time axis from local midnight, (kommune, hour) arrays."""
+    start = datetime.now(NORWAY_TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+    times = hourly_times(hours, start=np.datetime64(int(start.timestamp()), 's'))
+    arrays = synthetic_arrays(
+        hours, len(entries), seed=seed, temperature_range=(-8, 18), location_spread=2.0
+    )
+    # Colder towards the north, roughly
+    latitudes = np.array([entry[2] for entry in entries])
+    arrays['temperature'] = arrays['temperature'] - 0.8 * (latitudes[:, None] - 58)
+    return times, arrays
+
+
+def national_temperatures(hours=48, swr=False, test=False, seed=None, log=_silent):
+    """
+    Temperature for every kommune in kommuners_koordinater.csv on one shared time axis.
+
+    Args:
+        hours: Forecast length
+        swr: As for get_forecast()
+        test: Synthetic data (one vectorized pass, no network), for trying out the map
+        seed: Seed for the synthetic data
+        log: Progress messages
+
+    Returns:
+        (entries, times, temperatures): the (kommune, fylke, lat, lon) tuples, datetime64 time
+        axis and a (kommune, hour) float64 matrix, NaN where a kommune has no data.
+    """
+    entries = kommune_entries()
+    if test:
+        times, arrays = _synthetic_national(entries, hours, seed)
+        return entries, times, arrays['temperature']
+
+    locations, _ = fetch_kommuner(entries, hours, swr=swr, log=log)
+    if not locations:
+        raise MetUnavailable("ingen kommuner har data")
+    # Forecasts fetched minutes apart can start an hour apart: align on the earliest start
+    start = min(forecast.times[0] for *_, forecast in locations)
+    times = start + np.arange(hours + 1) * np.timedelta64(3600, 's')
+    temperatures = np.full((len(entries), len(times)), np.nan)
+    row_of = {entry: row for row, entry in enumerate(entries)}
+    for *entry, forecast in locations:
+        columns = ((forecast.times - start) // np.timedelta64(3600, 's')).astype(np.intp)
+        keep = columns < len(times)
+        temperatures[row_of[tuple(entry)], columns[keep]] = forecast.temperature[keep]
+    return entries, times, temperatures
+
+
+def open_cube(hours=48, start=None, directory=CUBE_DIR):
+    """
+    Open the national forecast cube for writing, creating it (empty) if it is missing or was
+    built for another kommune list or forecast length.
+    """
+    entries = kommune_entries()
+    keys = [kommune_key(kommune, fylke) for kommune, fylke, _, _ in entries]
+    try:
+        cube = ForecastCube(directory, writable=True)
+        if cube.kommuner.tolist() == keys and len(cube.times) == hours + 1:
+            return cube
+    except (OSError, ValueError):
+        pass  # Missing or unreadable: build a new one
+    if start is None:
+        start = np.datetime64(datetime.now().replace(minute=0, second=0, microsecond=0), 's')
+    return ForecastCube.create(
+        directory, keys, [entry[1] for entry in entries], [entry[2] for entry in entries],
+        [entry[3] for entry in entries], start, hours=hours,
+    )
+
+
+def refresh_cube(hours=48, swr=False, test=False, seed=None, directory=CUBE_DIR, log=_silent):
+    """
+    Refresh every kommune in the national cube, each row written in place as its forecast is in.
+
+    Args:
+        hours: Forecast length
+        swr: As for get_forecast()
+        test: Fill with synthetic data for all kommuner (one vectorized pass, no network)
+        seed: Seed for the synthetic data
+        directory: Where the cube lives
+        log: Progress messages
+
+    Returns:
+        (cube, keys of kommuner skipped because no data was available)
+    """
+    if test:
+        times, arrays = _synthetic_national(kommune_entries(), hours, seed)
+        cube = open_cube(hours, start=times[0], directory=directory)
+        cube.times[:] = times
+        cube.values[:] = np.stack([arrays[name] for name in cube.variables], axis=-1)
+        cube.updated[:] = np.datetime64('now', 's')
+        cube.flush()
+        return cube, []
+
+    cube = open_cube(hours, directory=directory)
+    _, skipped = fetch_kommuner(kommune_entries(), hours, swr=swr, log=log, on_forecast=cube.update)
+    cube.flush()
+    return cube, skipped
+
+
+def update_cube_row(kommune_name, forecast, directory=CUBE_DIR):
+    """
+    Write one kommune's fresh forecast into the national cube, if there is one and the forecast
+    covers the cube's whole time window (shorter --hours runs are left out).
+    """
+    try:
+        cube = ForecastCube(directory, writable=True)
+    except (OSError, ValueError):
+        return
+    if len(forecast) < len(cube.times):
+        return
+    kommune, fylke, _, _ = kommune_entry(kommune_name)
+    key = kommune_key(kommune, fylke)
+    if key in cube.kommuner:
+        cube.update(key, forecast)
+        cube.flush()
+
+
+def cube_report(cube, query, now=None):
+    """
+    Answer a standard question from the national cube, as text.
+
+    Args:
+        cube: ForecastCube
+        query: 'windiest' (top 10 gusts, next 24 h), 'precipitation' (top 10 kommuner by total,
+            next 24 h; mean and max per fylke if the cube has fylke for every kommune) or 'frost'
+            (below 0 °C tonight, 18-08 local time)
+        now: Reference time (default: now)
+    """
+    now = datetime.now(NORWAY_TIMEZONE) if now is None else now
+    utc = lambda moment: np.datetime64(int(moment.timestamp()), 's')
+    next_day = (utc(now), utc(now) + np.timedelta64(24 * 3600, 's'))
+
+    if query == 'windiest':
+        lines = ["Mest vind de neste 24 timene (maks. vindkast):"]
+        for rank, (kommune, gust) in enumerate(cube.top_n('windgust', 10, *next_day), 1):
+            lines.append(f"  {rank:>2}. {kommune.title():<32} {format_val(gust):>5} m/s")
+    elif query == 'precipitation':
+        if cube.has_fylker:
+            lines = ["Nedbør de neste 24 timene, per fylke (snitt og maks. over kommunene):"]
+            for fylke, (mean, maximum) in cube.by_fylke('precipitation', *next_day).items():
+                lines.append(f"  {fylke:<32} {mean:>6.1f} mm  (maks. {maximum:.1f} mm)")
+        else:
+            # The bundled catalogue only names the fylke for duplicate kommune names
+            lines = ["Mest nedbør de neste 24 timene (sum per kommune):"]
+            wettest = cube.top_n('precipitation', 10, *next_day, how='sum')
+            for rank, (kommune, total) in enumerate(wettest, 1):
+                lines.append(f"  {rank:>2}. {kommune.title():<32} {total:>6.1f} mm")
+    elif query == 'frost':
+        # Tonight: 18-08 local time; after midnight, the rest of it
+        morning = now.replace(hour=8, minute=0, second=0, microsecond=0)
+        if now >= morning:
+            morning += timedelta(days=1)
+        evening = max(now, morning - timedelta(hours=14))
+        lines = [f"Under 0 °C i natt (kl. {evening:%H:%M}-{morning:%H:%M}):"]
+        frost = cube.below(0.0, 'temperature', utc(evening), utc(morning))
+        for kommune, minimum, first_time in frost:
+            first_local = datetime.fromtimestamp(int(first_time.astype(np.int64)), NORWAY_TIMEZONE)
+            lines.append(
+                f"  {kommune.title():<32} {format_val(minimum):>5} °C  (fra kl. {first_local:%H:%M})"
+            )
+        if not frost:
+            lines.append("  Ingen kommuner")
+    else:
+        raise ValueError(f"Ukjent spørring '{query}'")
+    return "\n".join(lines)
+
+
+def run_cube(
+    hours=48, update=False, query=None, rules_file=None, swr=False, test=False, seed=None,
+    directory=CUBE_DIR, state_file=ALERT_STATE_FILE, log=_silent,
+):
+    """
+    The national cube from the command line (--cube-update, --query, --alerts): refresh or open
+    the cube, print the answer to the query and the new alert events (JSON Lines).
+
+    Args:
+        hours, swr, test, seed: As for refresh_cube()
+        update: Refresh the cube first; otherwise it must exist
+        query: See cube_report()
+        rules_file: Alert rules to check (see alerts.py); active alerts are kept in state_file
+        directory: Where the cube lives
+        log: Progress messages
+
+    Raises:
+        ValueError: No cube yet (and update=False), or the rules file could not be read
+    """
+    if update:
+        cube, skipped = refresh_cube(
+            hours, swr=swr, test=test, seed=seed, directory=directory, log=log
+        )
+        print(f"Oppdatert: {cube} i {directory}")
+        if skipped:
+            print(f"Ingen data for {len(skipped)} kommuner")
+    else:
+        try:
+            cube = ForecastCube(directory)
+        except OSError:
+            raise ValueError(f"Ingen kube i {directory} - kjør med --cube-update først") from None
+    if query:
+        with TIMER.phase('query'):
+            report = cube_report(cube, query)
+        print(report)
+    if rules_file:
+        try:
+            rules = alerts.load_rules(rules_file, cube.variables)
+        except (OSError, ValueError) as exc:
+            raise ValueError(f"Kunne ikke lese varslingsreglene i {rules_file}: {exc}") from None
+        with TIMER.phase('alerts'):
+            events = alerts.run_alerts(
+                rules, cube.values, cube.variables, cube.times, cube.kommuner, cube.updated,
+                state_file,
+            )
+        for event in events:
+            print(json.dumps(event, ensure_ascii=False))
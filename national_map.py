@@ -0,0 +1,115 @@
+# ================================================================================================
+# NATIONWIDE MAP (--map): EVERY KOMMUNE AT ONE HOUR
+# ================================================================================================
+#
+# One scatter of all kommuner, colored by temperature, with a slider for the hours. The colors
+# for the whole (kommune x hour) matrix are looked up once; moving the slider only swaps them.
+#
+# ================================================================================================
+from datetime import datetime
+
+import numpy as np
+
+from forecast import NORWAY_TIMEZONE
+from palette_static import get_colormap, temperature_to_rgba
+from phase_timer import TIMER
+import metrics
+from plotting import PLOT_COLORS_DM, PLOT_COLORS_LM, REALLYWARM, TRULYCOLD, plot_rc, screen_figsize
+
+
+def draw_national_map(figure, entries, times, temperatures, hour=0, dark_mode=False, slider=True):
+    """
+    Scatter every kommune, colored by temperature, into figure; one hour at a time.
+
+    The colors for the whole (kommune x hour) matrix are looked up in one vectorized pass, so
+    moving to another hour only swaps the face colors of the single PathCollection.
+
+    Args:
+        figure: Matplotlib Figure to draw into
+        entries, times, temperatures: As returned by national.national_temperatures()
+        hour: Hour index shown first
+        dark_mode: Use the dark mode palette and colors
+        slider: Add a slider below the map for moving through the hours
+
+    Returns:
+        Dict of artists and state for set_map_hour().
+    """
+    import matplotlib as mpl
+    from matplotlib.colors import TwoSlopeNorm
+    from matplotlib.widgets import Slider
+
+    latitudes = np.array([entry[2] for entry in entries])
+    longitudes = np.array([entry[3] for entry in entries])
+    # (hour, kommune, RGBA): each hour is one contiguous block, ready for set_facecolor
+    hour_colors = np.ascontiguousarray(
+        temperature_to_rgba(temperatures.T, dark_mode, vmin=TRULYCOLD, vmax=REALLYWARM)
+    )
+    labels = [
+        datetime.fromtimestamp(seconds, NORWAY_TIMEZONE).strftime('%d.%m kl. %H:%M')
+        for seconds in times.astype('datetime64[s]').astype(np.int64).tolist()
+    ]
+    gridline_color = (PLOT_COLORS_DM if dark_mode else PLOT_COLORS_LM)[4]
+
+    map_axes = figure.subplots()
+    # Equirectangular, but with distances roughly right at Norway's latitudes
+    map_axes.set_aspect(1 / np.cos(np.radians(np.nanmean(latitudes))))
+    scatter = map_axes.scatter(
+        longitudes, latitudes, s=28, c=hour_colors[hour], edgecolors=gridline_color,
+        linewidths=0.3, zorder=3,
+    )
+    map_axes.grid(True, color=gridline_color, alpha=0.3, linewidth=0.5)
+    map_axes.set_xlabel('Lengdegrad')
+    map_axes.set_ylabel('Breddegrad')
+    title = map_axes.set_title('', fontsize=13, fontweight='bold')
+
+    colorbar_mappable = mpl.cm.ScalarMappable(
+        norm=TwoSlopeNorm(vmin=TRULYCOLD, vcenter=0, vmax=REALLYWARM), cmap=get_colormap(dark_mode)
+    )
+    figure.colorbar(colorbar_mappable, ax=map_axes, label='Temperatur (°C)', shrink=0.8)
+    figure.text(
+        0.99, 0.01, 'Værdata: Meteorologisk institutt (MET.no)', ha='right', va='bottom',
+        fontsize=8, style='italic', alpha=0.7,
+    )
+
+    artists = {
+        'figure': figure, 'scatter': scatter, 'title': title, 'hour_colors': hour_colors,
+        'labels': labels, 'temperatures': temperatures, 'slider': None,
+    }
+    if slider and len(times) > 1:
+        figure.subplots_adjust(bottom=0.17)
+        slider_axes = figure.add_axes([0.2, 0.06, 0.55, 0.03])
+        hour_slider = Slider(
+            slider_axes, 'Time', 0, len(times) - 1, valinit=hour, valstep=1, valfmt='%d',
+            color=gridline_color,
+        )
+        hour_slider.on_changed(lambda value: set_map_hour(artists, int(value)))
+        artists['slider'] = hour_slider
+    set_map_hour(artists, hour, redraw=False)
+    return artists
+
+
+def set_map_hour(artists, hour, redraw=True):
+    """Show another hour on the national map: new face colors and title, no new artists."""
+    artists['scatter'].set_facecolor(artists['hour_colors'][hour])
+    temperatures = artists['temperatures'][:, hour]
+    if np.isnan(temperatures).all():
+        summary = 'ingen data'
+    else:
+        summary = f"{np.nanmin(temperatures):.0f} til {np.nanmax(temperatures):.0f} °C"
+    artists['title'].set_text(f"Temperatur i alle kommuner, {artists['labels'][hour]} ({summary})")
+    if redraw:
+        artists['figure'].canvas.draw_idle()
+
+
+def show_national_map(entries, times, temperatures, hour=0, dark_mode=False):
+    """Open the map in a plot window, with the hour slider; returns when the window is closed."""
+    with TIMER.phase('imports'):
+        import matplotlib as mpl
+        import matplotlib.pyplot as plt
+    with mpl.rc_context(plot_rc(dark_mode)):
+        with TIMER.phase('figure'), metrics.RENDER_DURATION.time(target='map'):
+            figure = plt.figure(figsize=screen_figsize(default=(8, 9)))
+            map_artists = draw_national_map(  # Keep a reference: the slider needs it alive
+                figure, entries, times, temperatures, hour=hour, dark_mode=dark_mode
+            )
+        plt.show()
@@ -11,7 +11,6 @@
 # ============================================================================
 import numpy as np
 from matplotlib.colors import to_rgb, to_hex, ListedColormap
-from skimage import color
 
 # ============================================================================
 # COLOR ANCHOR DEFINITIONS
@@ -39,6 +38,15 @@ from skimage import color
     "#f1ff2c", "#fec800","#fda900"
 ] """
 
+# Anchors that the shipped palette_static.py was generated from (= Saved Reference 2)
+palette_anchors_static = [
+    "#2416a1", "#222ec6", "#2b44e7", 
+    "#1f6dff", "#488fff", "#91c9ff", 
+    "#f6f6f6",
+    "#ade0b9", "#8adf87","#c1df35", 
+    "#f1ff2c", "#fec800","#fda900"
+]
+
 palette_anchors = [
     "#2416a1", "#222ec6", "#2b44e7", 
     "#1f6dff", "#488fff", "#91c9ff", 
@@ -65,22 +73,117 @@ palette_anchors_colorblind = [
     "#f1ff2c", "#fec800","#fda900"
 ]
 
+# ============================================================================
+# COLOR SPACE CONVERSIONS: sRGB ↔ XYZ ↔ CIE LUV (NumPy only)
+# ============================================================================
+# Vectorized over arrays of shape (..., 3). Same constants as scikit-image
+# (sRGB matrix, D65 white point, 2° observer), so results match rgb2luv/luv2rgb.
+
+XYZ_FROM_RGB = np.array([
+    [0.412453, 0.357580, 0.180423],
+    [0.212671, 0.715160, 0.072169],
+    [0.019334, 0.119193, 0.950227]
+])
+RGB_FROM_XYZ = np.linalg.inv(XYZ_FROM_RGB)
+WHITE_D65 = np.array([0.95047, 1.0, 1.08883])  # Reference white, 2° observer
+
+_EPS = np.finfo(np.float64).eps
+_U0 = 4 * WHITE_D65[0] / (WHITE_D65 @ [1, 15, 3])  # u' of reference white
+_V0 = 9 * WHITE_D65[1] / (WHITE_D65 @ [1, 15, 3])  # v' of reference white
+
+def srgb_to_xyz(rgb):
+    """sRGB (0-1) → XYZ, removing the sRGB gamma."""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+    return linear @ XYZ_FROM_RGB.T
+
+def xyz_to_srgb(xyz):
+    """XYZ → sRGB (0-1), applying the sRGB gamma and clipping to gamut."""
+    linear = np.asarray(xyz, dtype=np.float64) @ RGB_FROM_XYZ.T
+    with np.errstate(invalid='ignore'):  # negative values take the linear branch
+        rgb = np.where(linear > 0.0031308, 1.055 * linear ** (1 / 2.4) - 0.055, linear * 12.92)
+    return np.clip(rgb, 0, 1)
+
+def xyz_to_luv(xyz):
+    """XYZ → CIE LUV (D65)."""
+    xyz = np.asarray(xyz, dtype=np.float64)
+    x, y, z = xyz[..., 0], xyz[..., 1], xyz[..., 2]
+    y_rel = y / WHITE_D65[1]
+    L = np.where(y_rel > 0.008856, 116.0 * np.cbrt(y_rel) - 16.0, 903.3 * y_rel)
+    denom = x + 15.0 * y + 3.0 * z + _EPS
+    u = 13.0 * L * (4.0 * x / denom - _U0)
+    v = 13.0 * L * (9.0 * y / denom - _V0)
+    return np.stack([L, u, v], axis=-1)
+
+def luv_to_xyz(luv):
+    """CIE LUV (D65) → XYZ."""
+    luv = np.asarray(luv, dtype=np.float64)
+    L, u, v = luv[..., 0], luv[..., 1], luv[..., 2]
+    y = np.where(L > 7.999625, ((L + 16.0) / 116.0) ** 3, L / 903.3) * WHITE_D65[1]
+    a = _U0 + u / (13.0 * L + _EPS)
+    b = _V0 + v / (13.0 * L + _EPS)
+    c = 3 * y * (5 * b - 3)
+    z = ((a - 4) * c - 15 * a * b * y) / (12 * b)
+    x = -(c / b + 3.0 * z)
+    return np.stack([x, y, z], axis=-1)
+
+def rgb_to_luv(rgb):
+    """sRGB (0-1) → CIE LUV."""
+    return xyz_to_luv(srgb_to_xyz(rgb))
+
+def luv_to_rgb(luv):
+    """CIE LUV → sRGB (0-1), clipped to gamut."""
+    return xyz_to_srgb(luv_to_xyz(luv))
+
+def hex_to_rgb_array(hex_colors):
+    """List of hex strings → (N, 3) float array in 0-1."""
+    return np.array([to_rgb(c) for c in hex_colors])
+
 # ============================================================================
 # COLOR INTERPOLATION FUNCTIONS
 # ============================================================================
+def interpolate_luv_rgb(rgb, n_colors):
+    """
+    Interpolate (..., N, 3) RGB anchors in LUV to (..., n_colors, 3) RGB.
+
+    All channels (and any leading batch dimensions, e.g. several anchor sets
+    of equal length) are interpolated in one vectorized call.
+    """
+    luv = rgb_to_luv(rgb)
+    n_anchors = luv.shape[-2]
+
+    # Position of each output color between anchors (evenly spaced, like np.interp)
+    position = np.linspace(0, n_anchors - 1, n_colors)
+    left = np.minimum(position.astype(np.intp), n_anchors - 2)
+    weight = (position - left)[:, np.newaxis]
+
+    luv_interp = luv[..., left, :] * (1 - weight) + luv[..., left + 1, :] * weight
+    return luv_to_rgb(luv_interp)
+
 def interpolate_luv(hex_colors, n_colors): 
     """Interpolate colors in LUV color space - optimized for screens."""
-    rgb = np.array([to_rgb(c) for c in hex_colors])
-    luv = color.rgb2luv(rgb[np.newaxis, :, :])
-    x = np.linspace(0, 1, luv.shape[1])
-    xi = np.linspace(0, 1, n_colors)
-    luv_interp = np.array([
-        np.interp(xi, x, luv[0, :, i]) 
-        for i in range(3)
-    ]).T
-    rgb_interp = color.luv2rgb(luv_interp[np.newaxis, :, :])[0]
+    rgb_interp = interpolate_luv_rgb(hex_to_rgb_array(hex_colors), n_colors)
     return [to_hex(c) for c in rgb_interp]
 
+def check_static_palette(n_colors=256):
+    """
+    Re-interpolate palette_anchors_static and compare with palette_static.py.
+
+    Returns:
+        Dict with number of differing colors and max channel difference (0-255).
+    """
+    import palette_static
+
+    generated = interpolate_luv(palette_anchors_static, n_colors)
+    shipped = palette_static.TEMPERATURE_PALETTE_HEX_LIGHT
+    generated_rgb8 = np.round(hex_to_rgb_array(generated) * 255)
+    shipped_rgb8 = np.round(hex_to_rgb_array(shipped) * 255)
+    return {
+        'n_colors': len(shipped),
+        'n_different': sum(a != b for a, b in zip(generated, shipped)),
+        'max_channel_difference': int(np.abs(generated_rgb8 - shipped_rgb8).max()),
+    }
+
 def get_temperature_colormap(
     n_colors, 
     anchors=None, 
@@ -115,6 +218,50 @@ def get_temperature_colormap(
 # ============================================================================
 # COLORBLIND SIMULATION FUNCTIONS
 # ============================================================================
+# Colorblind transformation matrices
+# Source: Murtagh and Birch (2006) via https://mk.bcgsc.ca/colorblind/math.mhtml
+CB_MATRICES = {
+    # Complete absence (dichromacy)
+    'protanopia': np.array([
+        [0.152286, 1.052583, -0.204868],
+        [0.114503, 0.786281, 0.099216], 
+        [-0.003882, -0.048116, 1.051998]
+    ]),
+    'deuteranopia': np.array([
+        [0.367322, 0.860646, -0.227968],
+        [0.280085, 0.672501, 0.047413],
+        [-0.011820, 0.042940, 0.968881]
+    ]),
+    'tritanopia': np.array([
+        [1.255528, -0.076749, -0.178779],
+        [-0.078411, 0.930809, 0.147602],
+        [0.004733, 0.691367, 0.303900]
+    ]),
+    # Reduced sensitivity (anomalous trichromacy)
+    'protanomaly': np.array([
+        [0.458064, 0.679578, -0.137642],
+        [0.092785, 0.846313, 0.060902],
+        [-0.007494, -0.016807, 1.024301]
+    ]),
+    'deuteranomaly': np.array([  # Most common type.
+        [0.547494, 0.607765, -0.155259],
+        [0.181692, 0.781742, 0.036566],
+        [-0.010410, 0.027275, 0.983136]
+    ]),
+    'tritanomaly': np.array([
+        [1.017277, 0.027029, -0.044306],
+        [-0.006113, 0.958479, 0.047634],
+        [0.006379, 0.248708, 0.744913]
+    ]),
+    # Complete color blindness - grayscale from luminance (R=0.299, G=0.587, B=0.114),
+    # written as a matrix whose three rows are the luminance weights.
+    'achromatopsia': np.tile([0.299, 0.587, 0.114], (3, 1)),
+}
+
+# All deficiency types in a fixed order, stacked as one (7, 3, 3) tensor
+CB_TYPES = tuple(CB_MATRICES)
+CB_TENSOR = np.stack([CB_MATRICES[cb_type] for cb_type in CB_TYPES])
+
 def simulate_colorblindness(rgb_color, cb_type='protanopia'):
     """
     Simulate colorblindness by applying transformation matrices.
@@ -133,77 +280,43 @@ def simulate_colorblindness(rgb_color, cb_type='protanopia'):
         Martin Krzywinski, Canada's Michael Smith Genome Sciences Centre
         https://mk.bcgsc.ca/colorblind/math.mhtml
     """
-
-    # Colorblind transformation matrices
-    # Source: Murtagh and Birch (2006) via https://mk.bcgsc.ca/colorblind/math.mhtml
-    matrices = {
-        # Complete absence (dichromacy)
-        'protanopia': np.array([
-            [0.152286, 1.052583, -0.204868],
-            [0.114503, 0.786281, 0.099216], 
-            [-0.003882, -0.048116, 1.051998]
-        ]),
-        'deuteranopia': np.array([
-            [0.367322, 0.860646, -0.227968],
-            [0.280085, 0.672501, 0.047413],
-            [-0.011820, 0.042940, 0.968881]
-        ]),
-        'tritanopia': np.array([
-            [1.255528, -0.076749, -0.178779],
-            [-0.078411, 0.930809, 0.147602],
-            [0.004733, 0.691367, 0.303900]
-        ]),
-        # Reduced sensitivity (anomalous trichromacy)
-        'protanomaly': np.array([
-            [0.458064, 0.679578, -0.137642],
-            [0.092785, 0.846313, 0.060902],
-            [-0.007494, -0.016807, 1.024301]
-        ]),
-        'deuteranomaly': np.array([  # Most common type.
-            [0.547494, 0.607765, -0.155259],
-            [0.181692, 0.781742, 0.036566],
-            [-0.010410, 0.027275, 0.983136]
-        ]),
-        'tritanomaly': np.array([
-            [1.017277, 0.027029, -0.044306],
-            [-0.006113, 0.958479, 0.047634],
-            [0.006379, 0.248708, 0.744913]
-        ])
-    }
-    
-    if cb_type == 'achromatopsia':
-        # Complete color blindness - convert to grayscale using luminance
-        # Standard luminance weights: R=0.299, G=0.587, B=0.114
-        luminance_weights = np.array([0.299, 0.587, 0.114])
-        if rgb_color.ndim > 1:
-            gray_values = np.dot(rgb_color, luminance_weights)
-            return np.column_stack([gray_values, gray_values, gray_values])
-        else:
-            gray_value = np.dot(rgb_color, luminance_weights)
-            return np.array([gray_value, gray_value, gray_value])
-    
-    if cb_type not in matrices:
+    if cb_type not in CB_MATRICES:
         return rgb_color
     
-    # Apply transformation matrix
-    rgb_array = np.array(rgb_color).reshape(-1, 3)
-    transformed = rgb_array @ matrices[cb_type].T
-    
-    # Ensure values stay in [0, 1] range
-    transformed = np.clip(transformed, 0, 1)
-    
-    return (
-        transformed.reshape(rgb_color.shape) 
-        if rgb_color.ndim > 1 
-        else transformed[0]
-    )
+    # Apply transformation matrix, keep values in [0, 1] range
+    transformed = np.asarray(rgb_color, dtype=np.float64) @ CB_MATRICES[cb_type].T
+    return np.clip(transformed, 0, 1)
+
+def simulate_colorblindness_all(rgb_colors, include_normal=False):
+    """
+    Simulate every deficiency type at once with a single einsum.
+
+    Args:
+        rgb_colors: Array of shape (..., 3), values 0-1 - e.g. one (N, 3) palette
+                    or a (P, N, 3) batch of palettes
+        include_normal: If True, unmodified colors are prepended as 'normal'
+
+    Returns:
+        Tuple of (type names, array of shape (n_types, ..., 3)), where the
+        names are CB_TYPES (with 'normal' first if requested).
+    """
+    rgb = np.asarray(rgb_colors, dtype=np.float64)
+    variants = np.clip(np.einsum('kij,...j->k...i', CB_TENSOR, rgb), 0, 1)
+    if include_normal:
+        return ('normal',) + CB_TYPES, np.concatenate([rgb[np.newaxis], variants])
+    return CB_TYPES, variants
 
 def create_colorblind_palette(hex_colors, cb_type):
     """Create a colorblind-simulated version of a hex color palette."""
-    rgb_colors = np.array([to_rgb(c) for c in hex_colors])
+    rgb_colors = hex_to_rgb_array(hex_colors)
     cb_rgb = simulate_colorblindness(rgb_colors, cb_type)
     return [to_hex(c) for c in cb_rgb]
 
+def create_colorblind_palettes(hex_colors, include_normal=False):
+    """All colorblind-simulated versions of a hex palette, as {type: hex list}."""
+    names, variants = simulate_colorblindness_all(hex_to_rgb_array(hex_colors), include_normal)
+    return {name: [to_hex(c) for c in palette] for name, palette in zip(names, variants)}
+
 def get_colorblind_colormap(
     n_colors, cb_type, anchors=None, colorblind_friendly=False
 ):
@@ -220,17 +333,214 @@ def get_colorblind_colormap(
     cmap_name = f"temp_colormap_{cb_type}"
     return ListedColormap(cb_palette, name=cmap_name), cb_palette
 
+# ============================================================================
+# PALETTE ANALYSIS: PERCEPTUAL UNIFORMITY & ACCESSIBILITY METRICS
+# ============================================================================
+# Computed for a whole batch of palettes at once. Color differences are
+# ΔE*uv, i.e. Euclidean distance in CIE LUV - the space the palettes are
+# interpolated in.
+
+# Built-in anchor sets screened by default
+ANCHOR_SETS = {
+    'primary': palette_anchors,
+    'dark': palette_anchors_dark,
+    'colorblind': palette_anchors_colorblind,
+    'static': palette_anchors_static,
+}
+
+def delta_e_uv_steps(luv):
+    """ΔE*uv between adjacent colors along axis -2: (..., N, 3) → (..., N-1)."""
+    return np.linalg.norm(np.diff(luv, axis=-2), axis=-1)
+
+def palette_metrics(rgb_palettes):
+    """
+    Perceptual and accessibility metrics for a batch of diverging palettes.
+
+    Args:
+        rgb_palettes: Array (P, N, 3) of RGB values 0-1, neutral color in the middle
+
+    Returns:
+        Dict of arrays, first axis P (palettes):
+            step_min/mean/max/cv - adjacent-step ΔE*uv and its coefficient of variation
+            lightness_min/max    - range of L*
+            lightness_reversals  - sign changes of the L* slope along the palette
+            monotonic_cold/warm  - L* rises towards neutral on the cold side, falls after it
+            cb_min_step          - (P, n_types) smallest adjacent ΔE*uv per simulated type
+        plus 'cb_types', the type names for the last axis of cb_min_step.
+    """
+    rgb = np.asarray(rgb_palettes, dtype=np.float64)
+    n_colors = rgb.shape[-2]
+    center = (n_colors - 1) // 2
+
+    luv = rgb_to_luv(rgb)
+    steps = delta_e_uv_steps(luv)                     # (P, N-1)
+
+    # Lightness: direction of each step, ignoring flat steps
+    lightness = luv[..., 0]
+    slope_sign = np.sign(np.round(np.diff(lightness, axis=-1), 6))
+    signed = np.where(slope_sign == 0, np.nan, slope_sign)
+    reversals = np.sum(signed[..., 1:] * signed[..., :-1] < 0, axis=-1)
+
+    # Every simulated deficiency for every palette in one call: (K, P, N, 3)
+    cb_types, cb_rgb = simulate_colorblindness_all(rgb)
+    cb_steps = delta_e_uv_steps(rgb_to_luv(cb_rgb))   # (K, P, N-1)
+
+    return {
+        'step_min': steps.min(axis=-1),
+        'step_mean': steps.mean(axis=-1),
+        'step_max': steps.max(axis=-1),
+        'step_cv': steps.std(axis=-1) / steps.mean(axis=-1),
+        'lightness_min': lightness.min(axis=-1),
+        'lightness_max': lightness.max(axis=-1),
+        'lightness_reversals': reversals,
+        'monotonic_cold': np.all(slope_sign[..., :center] >= 0, axis=-1),
+        'monotonic_warm': np.all(slope_sign[..., center:] <= 0, axis=-1),
+        'cb_min_step': cb_steps.min(axis=-1).T,       # (P, K)
+        'cb_types': cb_types,
+    }
+
+def analyze_anchor_sets(anchor_sets, n_colors=256):
+    """
+    Interpolate named anchor sets and report their metrics.
+
+    Args:
+        anchor_sets: Dict of {name: list of hex anchors}
+        n_colors: Palette resolution used for the metrics
+
+    Returns:
+        JSON-serializable report, one entry per anchor set.
+    """
+    names = list(anchor_sets)
+    rgb_palettes = np.stack([
+        interpolate_luv_rgb(hex_to_rgb_array(anchor_sets[name]), n_colors) for name in names
+    ])
+    metrics = palette_metrics(rgb_palettes)
+
+    palettes = []
+    for i, name in enumerate(names):
+        cb_min_step = dict(zip(metrics['cb_types'], metrics['cb_min_step'][i].round(3).tolist()))
+        palettes.append({
+            'name': name,
+            'anchors': list(anchor_sets[name]),
+            'delta_e_uv': {
+                key: round(float(metrics[f'step_{key}'][i]), 4) for key in ('min', 'mean', 'max', 'cv')
+            },
+            'lightness': {
+                'min': round(float(metrics['lightness_min'][i]), 2),
+                'max': round(float(metrics['lightness_max'][i]), 2),
+                'reversals': int(metrics['lightness_reversals'][i]),
+                'monotonic_cold': bool(metrics['monotonic_cold'][i]),
+                'monotonic_warm': bool(metrics['monotonic_warm'][i]),
+            },
+            'colorblind_min_step': cb_min_step,
+            'worst_colorblind_type': min(cb_min_step, key=cb_min_step.get),
+        })
+    return {'metric': 'delta_e_uv', 'n_colors': n_colors, 'palettes': palettes}
+
+def load_anchor_sets(filename):
+    """Anchor sets from JSON: {name: [hex, ...]} or a plain list of hex lists."""
+    import json
+
+    with open(filename, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {f"set{i}": anchors for i, anchors in enumerate(data)}
+    return data
+
+# ============================================================================
+# PALETTE PREVIEW: ONE RASTER IMAGE PER SHEET
+# ============================================================================
+
+# Vision types shown in previews, top to bottom, with display names
+PREVIEW_VISION_TYPES = {
+    'normal': 'Normal Vision',
+    'deuteranomaly': 'Deuteranomaly (~5% of males)',
+    'deuteranopia': 'Deuteranopia (no green)',
+    'protanopia': 'Protanopia (no red)',
+    'tritanopia': 'Tritanopia (no blue)',
+    'achromatopsia': 'Achromatopsia (no color)',
+}
+
+def preview_image(rgb_palette, vision_types=tuple(PREVIEW_VISION_TYPES)):
+    """Stacked (n_types, N, 3) RGB image: one row per vision type."""
+    names, variants = simulate_colorblindness_all(rgb_palette, include_normal=True)
+    return variants[[names.index(vision_type) for vision_type in vision_types]]
+
+def draw_palette_preview(
+    fig, rgb_palette, title, vision_types=tuple(PREVIEW_VISION_TYPES), coldend=-15, warmend=30
+):
+    """
+    Draw all vision types of a palette into fig as a single imshow.
+
+    Args:
+        fig: matplotlib Figure to draw into
+        rgb_palette: (N, 3) RGB palette, values 0-1
+        title: Figure title
+        vision_types: Keys of PREVIEW_VISION_TYPES, top to bottom
+        coldend, warmend: Temperatures for the palette ends (tick labels)
+
+    Returns:
+        The Axes holding the image.
+    """
+    image = preview_image(rgb_palette, vision_types)
+    n_rows, n = image.shape[:2]
+
+    ax = fig.add_subplot()
+    ax.imshow(image, aspect='auto', interpolation='nearest', extent=(0, n, n_rows, 0))
+    fig.suptitle(title, fontsize=14, fontweight='bold')
+
+    # Rows separated by background-colored bands, all in one collection
+    if n_rows > 1:
+        ax.hlines(np.arange(1, n_rows), 0, n, color=fig.get_facecolor(), linewidth=6)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    ax.set_yticks(np.arange(n_rows) + 0.5)
+    ax.set_yticklabels(
+        [PREVIEW_VISION_TYPES[vision_type] for vision_type in vision_types],
+        fontsize=11, fontweight='bold'
+    )
+    ax.tick_params(axis='y', length=0)
+
+    # Major ticks with labels; minor ticks without labels (just the visual marks)
+    ax.set_xticks([0, (n-1)/2+0.5, n])
+    ax.set_xticklabels([f"{coldend}°C", "0°C", f"{warmend}°C"], fontsize=11, fontweight='bold')
+    ax.set_xticks(np.linspace(0, n, 13), minor=True)  # 13 positions = 12 intervals
+    ax.tick_params(axis='x', which='major', length=8, width=2)
+    ax.tick_params(axis='x', which='minor', length=4, width=1)
+    return ax
+
+def save_palette_preview(filename, rgb_palette, title, vision_types=tuple(PREVIEW_VISION_TYPES)):
+    """Render a preview sheet straight to file - headless, no pyplot or GUI backend."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 1.2 + 1.1 * len(vision_types)), layout='tight')
+    draw_palette_preview(fig, rgb_palette, title, vision_types)
+    fig.savefig(filename, dpi=100)
+
 # ============================================================================
 # STATIC PALETTE EXPORT
 # ============================================================================
-def export_static_palette(filename="palette_static.py"):
-    """Export light and dark colormaps as static data for dependency-free usage."""
+def export_static_palette(filename="palette_static.py", palette_hex_light=None, palette_hex_dark=None):
+    """
+    Export light and dark colormaps as static data for dependency-free usage.
+
+    Pass existing hex lists (e.g. those already in palette_static.py) to re-export them
+    unchanged with the current file layout; otherwise both are generated from the anchors.
+    """
     
     # Generate both palettes using LUV interpolation
     n_colors = 256  # High resolution just in case
-    _, palette_hex_light = get_temperature_colormap(n_colors, anchors=palette_anchors)
-    _, palette_hex_dark = get_temperature_colormap(n_colors, anchors=palette_anchors_dark)
+    if palette_hex_light is None:
+        _, palette_hex_light = get_temperature_colormap(n_colors, anchors=palette_anchors)
+    if palette_hex_dark is None:
+        _, palette_hex_dark = get_temperature_colormap(n_colors, anchors=palette_anchors_dark)
+    n_colors = len(palette_hex_light)
     
+    # 8-bit RGB rows matching the hex lists, shipped as literals (no parsing at import)
+    rgb8_light = [[int(c[i:i + 2], 16) for i in (1, 3, 5)] for c in palette_hex_light]
+    rgb8_dark = [[int(c[i:i + 2], 16) for i in (1, 3, 5)] for c in palette_hex_dark]
+
     # Create the static file content
     static_content = f'''# ============================================================================
 # STATIC TEMPERATURE PALETTE
@@ -242,8 +552,12 @@ def export_static_palette(filename="palette_static.py"):
 # Generated with {n_colors} colors using LUV color space interpolation.
 # Temperature range: -15°C to +30°C
 # ============================================================================
+import functools
 
-from matplotlib.colors import ListedColormap
+import numpy as np
+
+# Default two-slope temperature scale: coldest color, neutral (white) and warmest color
+TEMPERATURE_VMIN, TEMPERATURE_VCENTER, TEMPERATURE_VMAX = -15.0, 0.0, 30.0
 
 # Pre-computed color palette for LIGHT mode (hex values) - LUV interpolated
 TEMPERATURE_PALETTE_HEX_LIGHT = {palette_hex_light}
@@ -251,9 +565,22 @@ TEMPERATURE_PALETTE_HEX_LIGHT = {palette_hex_light}
 # Pre-computed color palette for DARK mode (hex values) - LUV interpolated
 TEMPERATURE_PALETTE_HEX_DARK = {palette_hex_dark}
 
+# Same palettes as 8-bit RGB, one row per hex value above
+TEMPERATURE_PALETTE_RGB8_LIGHT = np.array({rgb8_light}, dtype=np.uint8)
+TEMPERATURE_PALETTE_RGB8_DARK = np.array({rgb8_dark}, dtype=np.uint8)
+
+# Lookup tables (N, 4): float RGBA in 0-1 (as matplotlib uses) and 8-bit RGBA
+_RGBA_BYTES = {{
+    dark: np.column_stack([rgb8, np.full(len(rgb8), 255, dtype=np.uint8)])
+    for dark, rgb8 in ((False, TEMPERATURE_PALETTE_RGB8_LIGHT), (True, TEMPERATURE_PALETTE_RGB8_DARK))
+}}
+_RGBA_FLOAT = {{dark: rgba / 255.0 for dark, rgba in _RGBA_BYTES.items()}}
+
+@functools.lru_cache(maxsize=None)
 def get_colormap(dark_mode=False):
     """
     Get the temperature colormap without any external dependencies.
+    Built once per theme and cached; matplotlib is only imported here.
     
     Args:
         dark_mode (bool): If True, returns the dark mode version of the colormap.
@@ -261,10 +588,12 @@ def get_colormap(dark_mode=False):
     Returns:
         matplotlib.colors.ListedColormap: The selected colormap.
     """
+    from matplotlib.colors import ListedColormap
+
     if dark_mode:
-        return ListedColormap(TEMPERATURE_PALETTE_HEX_DARK, name="cold_neutral_warm_static_dark")
+        return ListedColormap(_RGBA_FLOAT[True], name="cold_neutral_warm_static_dark")
     else:
-        return ListedColormap(TEMPERATURE_PALETTE_HEX_LIGHT, name="cold_neutral_warm_static_light")
+        return ListedColormap(_RGBA_FLOAT[False], name="cold_neutral_warm_static_light")
 
 def get_palette(dark_mode=False):
     """Get the raw hex color list for the specified theme."""
@@ -272,6 +601,51 @@ def get_palette(dark_mode=False):
         return TEMPERATURE_PALETTE_HEX_DARK
     else:
         return TEMPERATURE_PALETTE_HEX_LIGHT
+
+def get_palette_rgba(dark_mode=False, bytes=False):
+    """Get the (N, 4) RGBA lookup table, floats in 0-1 or uint8 if bytes=True. Do not modify."""
+    return _RGBA_BYTES[dark_mode] if bytes else _RGBA_FLOAT[dark_mode]
+
+def temperature_to_index(
+    temperatures, vmin=TEMPERATURE_VMIN, vcenter=TEMPERATURE_VCENTER, vmax=TEMPERATURE_VMAX
+):
+    """
+    Map temperatures to palette indices through the two-slope scale.
+
+    vmin..vcenter fills the cold half of the palette and vcenter..vmax the warm half;
+    values outside are clipped to the end colors. Matches matplotlib's
+    ListedColormap(TwoSlopeNorm(vmin, vcenter, vmax)(t)) exactly.
+
+    Returns:
+        (index array of same shape, NaN mask)
+    """
+    t = np.asarray(temperatures, dtype=np.float64)
+    nan_mask = np.isnan(t)
+    n_colors = len(TEMPERATURE_PALETTE_RGB8_LIGHT)
+    scaled = np.interp(np.where(nan_mask, vcenter, t), [vmin, vcenter, vmax], [0.0, 0.5, 1.0])
+    indices = np.minimum((scaled * n_colors).astype(np.intp), n_colors - 1)
+    return indices, nan_mask
+
+def temperature_to_rgba(
+    temperatures, dark_mode=False, bytes=False,
+    vmin=TEMPERATURE_VMIN, vcenter=TEMPERATURE_VCENTER, vmax=TEMPERATURE_VMAX
+):
+    """
+    Vectorized temperature → RGBA lookup, without matplotlib.
+
+    Args:
+        temperatures: Scalar or array of temperatures (°C); NaN becomes transparent
+        dark_mode (bool): Use the dark mode palette
+        bytes (bool): Return uint8 (0-255) instead of floats (0-1)
+        vmin, vcenter, vmax: Two-slope scale (coldest, neutral and warmest color)
+
+    Returns:
+        Array of shape temperatures.shape + (4,).
+    """
+    indices, nan_mask = temperature_to_index(temperatures, vmin, vcenter, vmax)
+    rgba = get_palette_rgba(dark_mode, bytes)[indices]
+    rgba[nan_mask] = 0
+    return rgba
 '''
     
     # Write the file
@@ -285,7 +659,53 @@ def get_palette(dark_mode=False):
 # DEMO CONFIGURATION & VISUALIZATION
 # ============================================================================
 if __name__ == "__main__":
-    import matplotlib.pyplot as plt
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description='Temperaturpalett: demo og eksport')
+    parser.add_argument(
+        '--check-static', action='store_true',
+        help='Sammenlign ny LUV-interpolering med palette_static.py og avslutt'
+    )
+    parser.add_argument(
+        '--analyze', nargs='?', const='', metavar='ANCHORS.json',
+        help='Skriv JSON-rapport med palettmålinger og avslutt '
+             '(standard: innebygde ankersett; ellers JSON {navn: [hex, ...]})'
+    )
+    parser.add_argument(
+        '--n-colors', type=int, default=None, metavar='N',
+        help='Antall farger (standard: 256 for --analyze, 61 for forhåndsvisning)'
+    )
+    parser.add_argument(
+        '--save', metavar='STI',
+        help='Lagre forhåndsvisning til fil uten vindu og avslutt. Med --anchors: mappe, '
+             'ett ark per ankersett'
+    )
+    parser.add_argument(
+        '--anchors', metavar='ANCHORS.json', help='Ankersett for --save (JSON {navn: [hex, ...]})'
+    )
+    parser.add_argument('--output', metavar='FIL', help='Lagre rapporten til fil (ellers stdout)')
+    args = parser.parse_args()
+
+    if args.analyze is not None:
+        import json
+
+        anchor_sets = load_anchor_sets(args.analyze) if args.analyze else ANCHOR_SETS
+        report_json = json.dumps(analyze_anchor_sets(anchor_sets, args.n_colors or 256), indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(report_json + "\n")
+        else:
+            print(report_json)
+        raise SystemExit(0)
+
+    if args.check_static:
+        report = check_static_palette()
+        print(
+            f"palette_static.py: {report['n_different']} of {report['n_colors']} colors differ "
+            f"(max channel difference {report['max_channel_difference']}/255)"
+        )
+        raise SystemExit(1 if report['n_different'] else 0)
 
     # ========================================================================
     # DEMO PARAMETERS
@@ -294,10 +714,37 @@ if __name__ == "__main__":
     # Temperature range for demo
     COLDEND = -15
     WARMEND = 30
-    DEMO_N_COLORS = int(WARMEND)*2+1  # Odd number centers white at 0°C
+    DEMO_N_COLORS = args.n_colors or int(WARMEND)*2+1  # Odd number centers white at 0°C
     
     # Display mode configuration
     SHOW_COLORBLIND_ANALYSIS = True   # Show accessibility analysis
+
+    # ========================================================================
+    # HEADLESS PREVIEW SHEETS (--save)
+    # ========================================================================
+    if args.save:
+        if args.anchors:
+            # Batch: one sheet per candidate anchor set
+            os.makedirs(args.save, exist_ok=True)
+            for name, anchors in load_anchor_sets(args.anchors).items():
+                rgb_palette = interpolate_luv_rgb(hex_to_rgb_array(anchors), DEMO_N_COLORS)
+                save_palette_preview(
+                    os.path.join(args.save, f"{name}.png"), rgb_palette,
+                    f'Temperature Colormap "{name}": Accessibility Analysis'
+                )
+            print(f"Preview sheets saved to: {args.save}")
+        else:
+            rgb_palette = interpolate_luv_rgb(
+                hex_to_rgb_array(palette_anchors_colorblind), DEMO_N_COLORS
+            )
+            save_palette_preview(
+                args.save, rgb_palette,
+                'Colorblind-Friendly Temperature Colormap: Accessibility Analysis'
+            )
+            print(f"Preview saved to: {args.save}")
+        raise SystemExit(0)
+
+    import matplotlib.pyplot as plt
     
     # ========================================================================
     # DEMO VISUALIZATION
@@ -305,109 +752,25 @@ if __name__ == "__main__":
 
     if SHOW_COLORBLIND_ANALYSIS:
         # Show colorblind-friendly palette with accessibility analysis
-        colorblind_palette = interpolate_luv(
-            palette_anchors_colorblind, DEMO_N_COLORS
+        fig = plt.figure(figsize=(12, 8))
+        draw_palette_preview(
+            fig,
+            interpolate_luv_rgb(hex_to_rgb_array(palette_anchors_colorblind), DEMO_N_COLORS),
+            'Colorblind-Friendly Temperature Colormap: Accessibility Analysis',
+            coldend=COLDEND, warmend=WARMEND
         )
-        
-        # Create colorblind simulations
-        cb_types = [
-            'normal', 'deuteranomaly', 'deuteranopia', 
-            'protanopia', 'tritanopia', 'achromatopsia'
-        ]
-        cb_names = [
-            'Normal Vision', 
-            'Deuteranomaly (~5% of males)', 
-            'Deuteranopia (no green)', 
-            'Protanopia (no red)', 
-            'Tritanopia (no blue)', 
-            'Achromatopsia (no color)'
-        ]
-
-        # Create figure with accessibility analysis
-        fig, axes = plt.subplots(len(cb_types), 1, figsize=(12, 8))
-        fig.suptitle(
-            'Colorblind-Friendly Temperature Colormap: '
-            'Accessibility Analysis', 
-            fontsize=14, fontweight='bold'
-        )
-        
-        for idx, (cb_type, cb_name) in enumerate(zip(cb_types, cb_names)):
-            ax = axes[idx]
-            
-            # Get palette for this vision type
-            if cb_type == 'normal':
-                palette = colorblind_palette
-            else:
-                palette = create_colorblind_palette(
-                    colorblind_palette, cb_type
-                )
-            
-            # Plot color bars
-            for i, color_hex in enumerate(palette):
-                ax.fill_between([i, i+1], 0, 1, color=color_hex)
-            
-            # Configure axes
-            ax.get_yaxis().set_visible(False)
-            ax.set_title(cb_name, fontsize=12, fontweight='bold', pad=10)
-            ax.set_xlim(0, len(palette))
-            ax.set_ylim(0, 1)
-            
-            # Add temperature tick marks only for the top plot
-            if idx == 0:
-                n = len(palette)
-                
-                # Major ticks with labels (same as before)
-                major_tick_positions = [0, (n-1)/2+0.5, n]
-                major_tick_labels = [f"{COLDEND}°C", "0°C", f"{WARMEND}°C"]
-                
-                # Minor ticks without labels (just the visual marks)
-                minor_tick_positions = np.linspace(0, n, 13)  # 13 positions = 12 intervals
-                
-                # Set major ticks
-                ax.set_xticks(major_tick_positions)
-                ax.set_xticklabels(major_tick_labels, fontsize=11, fontweight='bold')
-                
-                # Add minor ticks
-                ax.set_xticks(minor_tick_positions, minor=True)
-                ax.tick_params(axis='x', which='major', length=8, width=2)
-                ax.tick_params(axis='x', which='minor', length=4, width=1)
-            else:
-                ax.set_xticks([])
-        
-        plt.tight_layout()
-        
     else:
         # Show only normal palette using LUV color space
-        original_palette = interpolate_luv(palette_anchors, DEMO_N_COLORS)
-        
-        fig, ax = plt.subplots(figsize=(12, 2))
-        fig.suptitle(
-            'Temperature Colormap: Cold → Neutral → Warm (LUV Color Space)', 
-            fontsize=14, fontweight='bold'
+        fig = plt.figure(figsize=(12, 2))
+        draw_palette_preview(
+            fig,
+            interpolate_luv_rgb(hex_to_rgb_array(palette_anchors), DEMO_N_COLORS),
+            'Temperature Colormap: Cold → Neutral → Warm (LUV Color Space)',
+            vision_types=('normal',), coldend=COLDEND, warmend=WARMEND
         )
-        
-        # Plot color bars
-        for i, color_hex in enumerate(original_palette):
-            ax.fill_between([i, i+1], 0, 1, color=color_hex)
-        
-        # Configure axes
-        ax.get_yaxis().set_visible(False)
-        ax.set_xlim(0, len(original_palette))
-        ax.set_ylim(0, 1)
-        
-        # Add edge temperature tick marks
-        n = len(original_palette)
-        tick_positions = [0, (n-1)/2+0.5, n]
-        tick_labels = [f"{COLDEND}°C", "0°C", f"{WARMEND}°C"]
-        ax.set_xticks(tick_positions)
-        ax.set_xticklabels(tick_labels, fontsize=12, fontweight='bold')
-        ax.tick_params(axis='x', length=10, width=2)
-        
-        plt.tight_layout()
+    plt.tight_layout()
 
     plt.show()
     print("GENERATING STATIC PALETTE FOR DEPENDENCY-FREE USAGE...")
     print("="*60)
     export_static_palette()
-
-    
\ No newline at end of file
@@ -8,8 +8,12 @@
 # Generated with 256 colors using LUV color space interpolation.
 # Temperature range: -15°C to +30°C
 # ============================================================================
+import functools
 
-from matplotlib.colors import ListedColormap
+import numpy as np
+
+# Default two-slope temperature scale: coldest color, neutral (white) and warmest color
+TEMPERATURE_VMIN, TEMPERATURE_VCENTER, TEMPERATURE_VMAX = -15.0, 0.0, 30.0
 
 # Pre-computed color palette for LIGHT mode (hex values) - LUV interpolated
 TEMPERATURE_PALETTE_HEX_LIGHT = ['#2416a1', '#2417a3', '#2419a4', '#241aa6', '#241ba8', '#241ca9', '#231eab', '#231fad', '#2320ae', '#2321b0', '#2322b2', '#2323b4', '#2324b5', '#2325b7', '#2327b9', '#2328bb', '#2329bc', '#222abe', '#222bc0', '#222cc2', '#222dc4', '#222ec6', '#222fc7', '#2330c9', '#2331ca', '#2432cc', '#2433cd', '#2434cf', '#2535d0', '#2536d2', '#2637d3', '#2638d5', '#2639d6', '#273ad8', '#273bd9', '#283cdb', '#283ddc', '#293fde', '#2940e0', '#2941e1', '#2a42e3', '#2a43e5', '#2b44e6', '#2b45e7', '#2a47e8', '#2a49e9', '#294cea', '#294eeb', '#2850ec', '#2852ed', '#2754ee', '#2756ef', '#2658f0', '#2659f1', '#255bf3', '#255df4', '#245ff5', '#2361f6', '#2363f8', '#2265f9', '#2266fa', '#2168fb', '#206afd', '#206cfe', '#206dff', '#236fff', '#2571ff', '#2872fe', '#2a74fe', '#2c76fe', '#2f77fe', '#3179fe', '#337bfe', '#347cfe', '#367efe', '#387ffe', '#3a81fe', '#3c83fe', '#3d84fe', '#3f86fe', '#4087fe', '#4289fe', '#448aff', '#458cff', '#478dff', '#488fff', '#4d92ff', '#5194ff', '#5597fe', '#599afe', '#5d9dfe', '#609ffe', '#64a2fe', '#67a5fe', '#6ba8fe', '#6eaafe', '#72adfe', '#75b0fe', '#78b2fe', '#7bb5fe', '#7eb8ff', '#81bbff', '#84bdff', '#87c0ff', '#8ac3ff', '#8dc6ff', '#90c8ff', '#95cbff', '#9bcdfe', '#a0cffe', '#a6d1fe', '#abd3fe', '#b0d5fd', '#b5d7fd', '#bad9fd', '#bedbfc', '#c3ddfc', '#c8dffb', '#cce1fb', '#d1e4fa', '#d5e6fa', '#dae8fa', '#deeaf9', '#e3ecf9', '#e7eef8', '#ebf1f7', '#f0f3f7', '#f4f5f6', '#f4f5f5', '#f1f4f2', '#eef3ef', '#eaf2ec', '#e7f1e9', '#e4f0e6', '#e0efe3', '#ddeee1', '#d9edde', '#d6ecdb', '#d3ebd8', '#cfead5', '#cce9d2', '#c8e8cf', '#c5e7cd', '#c1e6ca', '#bee5c7', '#bae4c4', '#b7e3c1', '#b3e2be', '#b0e1bb', '#ade0b8', '#abe0b6', '#a9e0b4', '#a8e0b2', '#a6e0b0', '#a5e0ad', '#a3e0ab', '#a1e0a9', '#a0e0a7', '#9ee0a4', '#9de0a2', '#9be0a0', '#99e09d', '#98e09b', '#96df99', '#94df96', '#93df94', '#91df91', '#8fdf8f', '#8ddf8c', '#8cdf8a', '#8adf87', '#8ddf84', '#90df82', '#93df7f', '#96df7c', '#99df7a', '#9cdf77', '#9fdf74', '#a2df71', '#a4df6d', '#a7df6a', '#a9df67', '#acdf63', '#aedf5f', '#b1df5b', '#b3df57', '#b5df53', '#b8df4e', '#badf49', '#bcdf44', '#bedf3e', '#c0df37', '#c3e035', '#c5e235', '#c7e334', '#cae534', '#cce634', '#cee833', '#d0e933', '#d3eb33', '#d5ec32', '#d7ee32', '#d9ef31', '#dcf131', '#def230', '#e0f430', '#e2f530', '#e5f72f', '#e7f82f', '#e9fa2e', '#ebfb2d', '#eefd2d', '#f0fe2c', '#f1fe2b', '#f2fb2a', '#f3f928', '#f4f627', '#f5f326', '#f6f124', '#f7ee22', '#f7ec21', '#f8e91f', '#f9e61e', '#f9e41c', '#fae11a', '#fadf18', '#fbdc16', '#fbda14', '#fcd711', '#fcd40f', '#fdd20c', '#fdcf09', '#fdcd06', '#feca02', '#fec800', '#fec600', '#fec500', '#fec300', '#fec200', '#fec000', '#febf00', '#febd00', '#febc00', '#febb00', '#feb900', '#feb800', '#feb600', '#feb500', '#feb300', '#feb200', '#fdb000', '#fdaf00', '#fdad00', '#fdac00', '#fdaa00', '#fda900']
@@ -17,9 +21,22 @@ TEMPERATURE_PALETTE_HEX_LIGHT = ['#2416a1', '#2417a3', '#2419a4', '#241aa6', '#2
 # Pre-computed color palette for DARK mode (hex values) - LUV interpolated
 TEMPERATURE_PALETTE_HEX_DARK = ['#2416a1', '#2417a3', '#2419a4', '#241aa6', '#241ba8', '#241ca9', '#231eab', '#231fad', '#2320ae', '#2321b0', '#2322b2', '#2323b4', '#2324b5', '#2325b7', '#2327b9', '#2328bb', '#2329bc', '#222abe', '#222bc0', '#222cc2', '#222dc4', '#222ec6', '#222fc7', '#2330c9', '#2331ca', '#2432cc', '#2433cd', '#2434cf', '#2535d0', '#2536d2', '#2637d3', '#2638d5', '#2639d6', '#273ad8', '#273bd9', '#283cdb', '#283ddc', '#293fde', '#2940e0', '#2941e1', '#2a42e3', '#2a43e5', '#2b44e6', '#2b45e7', '#2a47e8', '#2a49e9', '#294cea', '#294eeb', '#2850ec', '#2852ed', '#2754ee', '#2756ef', '#2658f0', '#2659f1', '#255bf3', '#255df4', '#245ff5', '#2361f6', '#2363f8', '#2265f9', '#2266fa', '#2168fb', '#206afd', '#206cfe', '#206dff', '#236fff', '#2571ff', '#2872fe', '#2a74fe', '#2c76fe', '#2f77fe', '#3179fe', '#337bfe', '#347cfe', '#367efe', '#387ffe', '#3a81fe', '#3c83fe', '#3d84fe', '#3f86fe', '#4087fe', '#4289fe', '#448aff', '#458cff', '#478dff', '#488fff', '#4d92ff', '#5194ff', '#5597fe', '#599afe', '#5d9dfe', '#609ffe', '#64a2fe', '#67a5fe', '#6ba8fe', '#6eaafe', '#72adfe', '#75b0fe', '#78b2fe', '#7bb5fe', '#7eb8ff', '#81bbff', '#84bdff', '#87c0ff', '#8ac3ff', '#8dc6ff', '#90c8ff', '#95cbff', '#9bcdfe', '#a0cffe', '#a6d1fe', '#abd3fe', '#b0d5fd', '#b5d7fd', '#bad9fd', '#bedbfc', '#c3ddfc', '#c8dffb', '#cce1fb', '#d1e4fa', '#d5e6fa', '#dae8fa', '#deeaf9', '#e3ecf9', '#e7eef8', '#ebf1f7', '#f0f3f7', '#f4f5f6', '#f4f5f5', '#f1f4f2', '#eef3ef', '#eaf2ec', '#e7f1e9', '#e4f0e6', '#e0efe3', '#ddeee1', '#d9edde', '#d6ecdb', '#d3ebd8', '#cfead5', '#cce9d2', '#c8e8cf', '#c5e7cd', '#c1e6ca', '#bee5c7', '#bae4c4', '#b7e3c1', '#b3e2be', '#b0e1bb', '#ade0b8', '#abe0b6', '#a9e0b4', '#a8e0b2', '#a6e0b0', '#a5e0ad', '#a3e0ab', '#a1e0a9', '#a0e0a7', '#9ee0a4', '#9de0a2', '#9be0a0', '#99e09d', '#98e09b', '#96df99', '#94df96', '#93df94', '#91df91', '#8fdf8f', '#8ddf8c', '#8cdf8a', '#8adf87', '#8ddf84', '#90df82', '#93df7f', '#96df7c', '#99df7a', '#9cdf77', '#9fdf74', '#a2df71', '#a4df6d', '#a7df6a', '#a9df67', '#acdf63', '#aedf5f', '#b1df5b', '#b3df57', '#b5df53', '#b8df4e', '#badf49', '#bcdf44', '#bedf3e', '#c0df37', '#c3e035', '#c5e235', '#c7e334', '#cae534', '#cce634', '#cee833', '#d0e933', '#d3eb33', '#d5ec32', '#d7ee32', '#d9ef31', '#dcf131', '#def230', '#e0f430', '#e2f530', '#e5f72f', '#e7f82f', '#e9fa2e', '#ebfb2d', '#eefd2d', '#f0fe2c', '#f1fe2b', '#f2fb2a', '#f3f928', '#f4f627', '#f5f326', '#f6f124', '#f7ee22', '#f7ec21', '#f8e91f', '#f9e61e', '#f9e41c', '#fae11a', '#fadf18', '#fbdc16', '#fbda14', '#fcd711', '#fcd40f', '#fdd20c', '#fdcf09', '#fdcd06', '#feca02', '#fec800', '#fec600', '#fec500', '#fec300', '#fec200', '#fec000', '#febf00', '#febd00', '#febc00', '#febb00', '#feb900', '#feb800', '#feb600', '#feb500', '#feb300', '#feb200', '#fdb000', '#fdaf00', '#fdad00', '#fdac00', '#fdaa00', '#fda900']
 
+# Same palettes as 8-bit RGB, one row per hex value above
+TEMPERATURE_PALETTE_RGB8_LIGHT = np.array([[36, 22, 161], [36, 23, 163], [36, 25, 164], [36, 26, 166], [36, 27, 168], [36, 28, 169], [35, 30, 171], [35, 31, 173], [35, 32, 174], [35, 33, 176], [35, 34, 178], [35, 35, 180], [35, 36, 181], [35, 37, 183], [35, 39, 185], [35, 40, 187], [35, 41, 188], [34, 42, 190], [34, 43, 192], [34, 44, 194], [34, 45, 196], [34, 46, 198], [34, 47, 199], [35, 48, 201], [35, 49, 202], [36, 50, 204], [36, 51, 205], [36, 52, 207], [37, 53, 208], [37, 54, 210], [38, 55, 211], [38, 56, 213], [38, 57, 214], [39, 58, 216], [39, 59, 217], [40, 60, 219], [40, 61, 220], [41, 63, 222], [41, 64, 224], [41, 65, 225], [42, 66, 227], [42, 67, 229], [43, 68, 230], [43, 69, 231], [42, 71, 232], [42, 73, 233], [41, 76, 234], [41, 78, 235], [40, 80, 236], [40, 82, 237], [39, 84, 238], [39, 86, 239], [38, 88, 240], [38, 89, 241], [37, 91, 243], [37, 93, 244], [36, 95, 245], [35, 97, 246], [35, 99, 248], [34, 101, 249], [34, 102, 250], [33, 104, 251], [32, 106, 253], [32, 108, 254], [32, 109, 255], [35, 111, 255], [37, 113, 255], [40, 114, 254], [42, 116, 254], [44, 118, 254], [47, 119, 254], [49, 121, 254], [51, 123, 254], [52, 124, 254], [54, 126, 254], [56, 127, 254], [58, 129, 254], [60, 131, 254], [61, 132, 254], [63, 134, 254], [64, 135, 254], [66, 137, 254], [68, 138, 255], [69, 140, 255], [71, 141, 255], [72, 143, 255], [77, 146, 255], [81, 148, 255], [85, 151, 254], [89, 154, 254], [93, 157, 254], [96, 159, 254], [100, 162, 254], [103, 165, 254], [107, 168, 254], [110, 170, 254], [114, 173, 254], [117, 176, 254], [120, 178, 254], [123, 181, 254], [126, 184, 255], [129, 187, 255], [132, 189, 255], [135, 192, 255], [138, 195, 255], [141, 198, 255], [144, 200, 255], [149, 203, 255], [155, 205, 254], [160, 207, 254], [166, 209, 254], [171, 211, 254], [176, 213, 253], [181, 215, 253], [186, 217, 253], [190, 219, 252], [195, 221, 252], [200, 223, 251], [204, 225, 251], [209, 228, 250], [213, 230, 250], [218, 232, 250], [222, 234, 249], [227, 236, 249], [231, 238, 248], [235, 241, 247], [240, 243, 247], [244, 245, 246], [244, 245, 245], [241, 244, 242], [238, 243, 239], [234, 242, 236], [231, 241, 233], [228, 240, 230], [224, 239, 227], [221, 238, 225], [217, 237, 222], [214, 236, 219], [211, 235, 216], [207, 234, 213], [204, 233, 210], [200, 232, 207], [197, 231, 205], [193, 230, 202], [190, 229, 199], [186, 228, 196], [183, 227, 193], [179, 226, 190], [176, 225, 187], [173, 224, 184], [171, 224, 182], [169, 224, 180], [168, 224, 178], [166, 224, 176], [165, 224, 173], [163, 224, 171], [161, 224, 169], [160, 224, 167], [158, 224, 164], [157, 224, 162], [155, 224, 160], [153, 224, 157], [152, 224, 155], [150, 223, 153], [148, 223, 150], [147, 223, 148], [145, 223, 145], [143, 223, 143], [141, 223, 140], [140, 223, 138], [138, 223, 135], [141, 223, 132], [144, 223, 130], [147, 223, 127], [150, 223, 124], [153, 223, 122], [156, 223, 119], [159, 223, 116], [162, 223, 113], [164, 223, 109], [167, 223, 106], [169, 223, 103], [172, 223, 99], [174, 223, 95], [177, 223, 91], [179, 223, 87], [181, 223, 83], [184, 223, 78], [186, 223, 73], [188, 223, 68], [190, 223, 62], [192, 223, 55], [195, 224, 53], [197, 226, 53], [199, 227, 52], [202, 229, 52], [204, 230, 52], [206, 232, 51], [208, 233, 51], [211, 235, 51], [213, 236, 50], [215, 238, 50], [217, 239, 49], [220, 241, 49], [222, 242, 48], [224, 244, 48], [226, 245, 48], [229, 247, 47], [231, 248, 47], [233, 250, 46], [235, 251, 45], [238, 253, 45], [240, 254, 44], [241, 254, 43], [242, 251, 42], [243, 249, 40], [244, 246, 39], [245, 243, 38], [246, 241, 36], [247, 238, 34], [247, 236, 33], [248, 233, 31], [249, 230, 30], [249, 228, 28], [250, 225, 26], [250, 223, 24], [251, 220, 22], [251, 218, 20], [252, 215, 17], [252, 212, 15], [253, 210, 12], [253, 207, 9], [253, 205, 6], [254, 202, 2], [254, 200, 0], [254, 198, 0], [254, 197, 0], [254, 195, 0], [254, 194, 0], [254, 192, 0], [254, 191, 0], [254, 189, 0], [254, 188, 0], [254, 187, 0], [254, 185, 0], [254, 184, 0], [254, 182, 0], [254, 181, 0], [254, 179, 0], [254, 178, 0], [253, 176, 0], [253, 175, 0], [253, 173, 0], [253, 172, 0], [253, 170, 0], [253, 169, 0]], dtype=np.uint8)
+TEMPERATURE_PALETTE_RGB8_DARK = np.array([[36, 22, 161], [36, 23, 163], [36, 25, 164], [36, 26, 166], [36, 27, 168], [36, 28, 169], [35, 30, 171], [35, 31, 173], [35, 32, 174], [35, 33, 176], [35, 34, 178], [35, 35, 180], [35, 36, 181], [35, 37, 183], [35, 39, 185], [35, 40, 187], [35, 41, 188], [34, 42, 190], [34, 43, 192], [34, 44, 194], [34, 45, 196], [34, 46, 198], [34, 47, 199], [35, 48, 201], [35, 49, 202], [36, 50, 204], [36, 51, 205], [36, 52, 207], [37, 53, 208], [37, 54, 210], [38, 55, 211], [38, 56, 213], [38, 57, 214], [39, 58, 216], [39, 59, 217], [40, 60, 219], [40, 61, 220], [41, 63, 222], [41, 64, 224], [41, 65, 225], [42, 66, 227], [42, 67, 229], [43, 68, 230], [43, 69, 231], [42, 71, 232], [42, 73, 233], [41, 76, 234], [41, 78, 235], [40, 80, 236], [40, 82, 237], [39, 84, 238], [39, 86, 239], [38, 88, 240], [38, 89, 241], [37, 91, 243], [37, 93, 244], [36, 95, 245], [35, 97, 246], [35, 99, 248], [34, 101, 249], [34, 102, 250], [33, 104, 251], [32, 106, 253], [32, 108, 254], [32, 109, 255], [35, 111, 255], [37, 113, 255], [40, 114, 254], [42, 116, 254], [44, 118, 254], [47, 119, 254], [49, 121, 254], [51, 123, 254], [52, 124, 254], [54, 126, 254], [56, 127, 254], [58, 129, 254], [60, 131, 254], [61, 132, 254], [63, 134, 254], [64, 135, 254], [66, 137, 254], [68, 138, 255], [69, 140, 255], [71, 141, 255], [72, 143, 255], [77, 146, 255], [81, 148, 255], [85, 151, 254], [89, 154, 254], [93, 157, 254], [96, 159, 254], [100, 162, 254], [103, 165, 254], [107, 168, 254], [110, 170, 254], [114, 173, 254], [117, 176, 254], [120, 178, 254], [123, 181, 254], [126, 184, 255], [129, 187, 255], [132, 189, 255], [135, 192, 255], [138, 195, 255], [141, 198, 255], [144, 200, 255], [149, 203, 255], [155, 205, 254], [160, 207, 254], [166, 209, 254], [171, 211, 254], [176, 213, 253], [181, 215, 253], [186, 217, 253], [190, 219, 252], [195, 221, 252], [200, 223, 251], [204, 225, 251], [209, 228, 250], [213, 230, 250], [218, 232, 250], [222, 234, 249], [227, 236, 249], [231, 238, 248], [235, 241, 247], [240, 243, 247], [244, 245, 246], [244, 245, 245], [241, 244, 242], [238, 243, 239], [234, 242, 236], [231, 241, 233], [228, 240, 230], [224, 239, 227], [221, 238, 225], [217, 237, 222], [214, 236, 219], [211, 235, 216], [207, 234, 213], [204, 233, 210], [200, 232, 207], [197, 231, 205], [193, 230, 202], [190, 229, 199], [186, 228, 196], [183, 227, 193], [179, 226, 190], [176, 225, 187], [173, 224, 184], [171, 224, 182], [169, 224, 180], [168, 224, 178], [166, 224, 176], [165, 224, 173], [163, 224, 171], [161, 224, 169], [160, 224, 167], [158, 224, 164], [157, 224, 162], [155, 224, 160], [153, 224, 157], [152, 224, 155], [150, 223, 153], [148, 223, 150], [147, 223, 148], [145, 223, 145], [143, 223, 143], [141, 223, 140], [140, 223, 138], [138, 223, 135], [141, 223, 132], [144, 223, 130], [147, 223, 127], [150, 223, 124], [153, 223, 122], [156, 223, 119], [159, 223, 116], [162, 223, 113], [164, 223, 109], [167, 223, 106], [169, 223, 103], [172, 223, 99], [174, 223, 95], [177, 223, 91], [179, 223, 87], [181, 223, 83], [184, 223, 78], [186, 223, 73], [188, 223, 68], [190, 223, 62], [192, 223, 55], [195, 224, 53], [197, 226, 53], [199, 227, 52], [202, 229, 52], [204, 230, 52], [206, 232, 51], [208, 233, 51], [211, 235, 51], [213, 236, 50], [215, 238, 50], [217, 239, 49], [220, 241, 49], [222, 242, 48], [224, 244, 48], [226, 245, 48], [229, 247, 47], [231, 248, 47], [233, 250, 46], [235, 251, 45], [238, 253, 45], [240, 254, 44], [241, 254, 43], [242, 251, 42], [243, 249, 40], [244, 246, 39], [245, 243, 38], [246, 241, 36], [247, 238, 34], [247, 236, 33], [248, 233, 31], [249, 230, 30], [249, 228, 28], [250, 225, 26], [250, 223, 24], [251, 220, 22], [251, 218, 20], [252, 215, 17], [252, 212, 15], [253, 210, 12], [253, 207, 9], [253, 205, 6], [254, 202, 2], [254, 200, 0], [254, 198, 0], [254, 197, 0], [254, 195, 0], [254, 194, 0], [254, 192, 0], [254, 191, 0], [254, 189, 0], [254, 188, 0], [254, 187, 0], [254, 185, 0], [254, 184, 0], [254, 182, 0], [254, 181, 0], [254, 179, 0], [254, 178, 0], [253, 176, 0], [253, 175, 0], [253, 173, 0], [253, 172, 0], [253, 170, 0], [253, 169, 0]], dtype=np.uint8)
+
+# Lookup tables (N, 4): float RGBA in 0-1 (as matplotlib uses) and 8-bit RGBA
+_RGBA_BYTES = {
+    dark: np.column_stack([rgb8, np.full(len(rgb8), 255, dtype=np.uint8)])
+    for dark, rgb8 in ((False, TEMPERATURE_PALETTE_RGB8_LIGHT), (True, TEMPERATURE_PALETTE_RGB8_DARK))
+}
+_RGBA_FLOAT = {dark: rgba / 255.0 for dark, rgba in _RGBA_BYTES.items()}
+
+@functools.lru_cache(maxsize=None)
 def get_colormap(dark_mode=False):
     """
     Get the temperature colormap without any external dependencies.
+    Built once per theme and cached; matplotlib is only imported here.
     
     Args:
         dark_mode (bool): If True, returns the dark mode version of the colormap.
@@ -27,10 +44,12 @@ def get_colormap(dark_mode=False):
     Returns:
         matplotlib.colors.ListedColormap: The selected colormap.
     """
+    from matplotlib.colors import ListedColormap
+
     if dark_mode:
-        return ListedColormap(TEMPERATURE_PALETTE_HEX_DARK, name="cold_neutral_warm_static_dark")
+        return ListedColormap(_RGBA_FLOAT[True], name="cold_neutral_warm_static_dark")
     else:
-        return ListedColormap(TEMPERATURE_PALETTE_HEX_LIGHT, name="cold_neutral_warm_static_light")
+        return ListedColormap(_RGBA_FLOAT[False], name="cold_neutral_warm_static_light")
 
 def get_palette(dark_mode=False):
     """Get the raw hex color list for the specified theme."""
@@ -38,3 +57,48 @@ def get_palette(dark_mode=False):
         return TEMPERATURE_PALETTE_HEX_DARK
     else:
         return TEMPERATURE_PALETTE_HEX_LIGHT
+
+def get_palette_rgba(dark_mode=False, bytes=False):
+    """Get the (N, 4) RGBA lookup table, floats in 0-1 or uint8 if bytes=True. Do not modify."""
+    return _RGBA_BYTES[dark_mode] if bytes else _RGBA_FLOAT[dark_mode]
+
+def temperature_to_index(
+    temperatures, vmin=TEMPERATURE_VMIN, vcenter=TEMPERATURE_VCENTER, vmax=TEMPERATURE_VMAX
+):
+    """
+    Map temperatures to palette indices through the two-slope scale.
+
+    vmin..vcenter fills the cold half of the palette and vcenter..vmax the warm half;
+    values outside are clipped to the end colors. Matches matplotlib's
+    ListedColormap(TwoSlopeNorm(vmin, vcenter, vmax)(t)) exactly.
+
+    Returns:
+        (index array of same shape, NaN mask)
+    """
+    t = np.asarray(temperatures, dtype=np.float64)
+    nan_mask = np.isnan(t)
+    n_colors = len(TEMPERATURE_PALETTE_RGB8_LIGHT)
+    scaled = np.interp(np.where(nan_mask, vcenter, t), [vmin, vcenter, vmax], [0.0, 0.5, 1.0])
+    indices = np.minimum((scaled * n_colors).astype(np.intp), n_colors - 1)
+    return indices, nan_mask
+
+def temperature_to_rgba(
+    temperatures, dark_mode=False, bytes=False,
+    vmin=TEMPERATURE_VMIN, vcenter=TEMPERATURE_VCENTER, vmax=TEMPERATURE_VMAX
+):
+    """
+    Vectorized temperature → RGBA lookup, without matplotlib.
+
+    Args:
+        temperatures: Scalar or array of temperatures (°C); NaN becomes transparent
+        dark_mode (bool): Use the dark mode palette
+        bytes (bool): Return uint8 (0-255) instead of floats (0-1)
+        vmin, vcenter, vmax: Two-slope scale (coldest, neutral and warmest color)
+
+    Returns:
+        Array of shape temperatures.shape + (4,).
+    """
+    indices, nan_mask = temperature_to_index(temperatures, vmin, vcenter, vmax)
+    rgba = get_palette_rgba(dark_mode, bytes)[indices]
+    rgba[nan_mask] = 0
+    return rgba
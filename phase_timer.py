@@ -0,0 +1,107 @@
+# ================================================================================================
+# PHASE TIMER: WHERE DOES A RUN SPEND ITS TIME?
+# ================================================================================================
+#
+# Wall-clock timing of named phases (imports, coordinate lookup, cache, fetch, parse, terminal,
+# figure, ...), reported as a human-readable table or JSON. Repeated phases accumulate.
+#
+# Phases may be recorded from worker threads (e.g. the fetch running while the plot is set up).
+# Time recorded outside the thread that created the timer overlaps the main thread's phases, so
+# it is marked as concurrent and left out of the total: the total stays the wall-clock time of
+# the main thread's phases, and the shares add up to 100% over those.
+#
+# Usage:
+#   timer = PhaseTimer()
+#   with timer.phase('json_decode'):
+#       weather_data = json.loads(raw)
+#   timer.start('terminal'); ...; timer.stop('terminal')    # for long, flat script sections
+#   print(timer.report_table())
+#
+# TIMER is the one timer of a command-line run: every module records its phases there.
+#
+# ================================================================================================
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """Accumulates wall-clock seconds per named phase, in first-seen order."""
+
+    def __init__(self):
+        self.seconds = {}
+        self.counts = {}
+        self.concurrent_seconds = {}  # Part of seconds recorded outside the creating thread
+        self._started = {}
+        self._lock = threading.Lock()
+        self._main_thread = threading.get_ident()
+
+    def add(self, name, seconds):
+        """Record seconds for a phase (accumulates if the phase repeats)."""
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+            if threading.get_ident() != self._main_thread:
+                self.concurrent_seconds[name] = self.concurrent_seconds.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def start(self, name):
+        """Start timing phase `name` (pair with stop, in the same thread)."""
+        with self._lock:
+            self._started[name, threading.get_ident()] = time.perf_counter()
+
+    def stop(self, name):
+        """Stop timing phase `name`, started with start()."""
+        with self._lock:
+            start = self._started.pop((name, threading.get_ident()))
+        self.add(name, time.perf_counter() - start)
+
+    @property
+    def total(self):
+        """Seconds in the main thread's phases (concurrent time overlaps them)."""
+        with self._lock:
+            return sum(self.seconds.values()) - sum(self.concurrent_seconds.values())
+
+    def as_dict(self):
+        """Phases as {name: {'ms': ..., 'count': ..., 'concurrent_ms': ...}} plus total."""
+        phases = {}
+        for name, seconds in list(self.seconds.items()):
+            phases[name] = {'ms': round(seconds * 1000, 3), 'count': self.counts[name]}
+            if name in self.concurrent_seconds:
+                phases[name]['concurrent_ms'] = round(self.concurrent_seconds[name] * 1000, 3)
+        return {'phases': phases, 'total_ms': round(self.total * 1000, 3)}
+
+    def report_json(self):
+        return json.dumps(self.as_dict(), indent=2)
+
+    def report_table(self):
+        """
+        Human-readable table: phase, milliseconds, share of total. Phases (partly) run in a
+        worker thread are marked; their share is how much of the run they overlapped.
+        """
+        total = self.total or 1.0
+        width = max([len(name) for name in self.seconds] + [5])
+        lines = [f"  {'Fase':<{width}}  {'ms':>9}  {'andel':>6}"]
+        lines.append(f"  {'':-<{width}}  {'':->9}  {'':->6}")
+        for name, seconds in list(self.seconds.items()):
+            notes = f"  (x{self.counts[name]})" if self.counts[name] > 1 else ""
+            if name in self.concurrent_seconds:
+                notes += "  (parallelt)"
+            lines.append(
+                f"  {name:<{width}}  {seconds * 1000:>9.1f}  {100 * seconds / total:>5.1f}%{notes}"
+            )
+        lines.append(f"  {'total':<{width}}  {self.total * 1000:>9.1f}")
+        return "\n".join(lines)
+
+
+# ---- THE RUN'S TIMER (--profile) ---------------------------------------------------------------
+TIMER = PhaseTimer()
@@ -0,0 +1,223 @@
+# ================================================================================================
+# SHARED FORECAST CACHE: PARSED FORECASTS IN ONE MEMORY-MAPPED ARENA FOR ALL PROCESSES
+# ================================================================================================
+#
+# Worker processes (a multi-process server, batch renderers, parallel --stdin pipelines) that
+# read the same JSON cache files would each decode the same payloads and hold their own copy
+# of the arrays. Here the parsed Forecast arrays are stored once in a file-backed arena,
+# memory-mapped by every process, so the pages are shared through the OS page cache and a
+# lookup copies one small block (at most MAX_FIELDS x MAX_POINTS values) out of the mapping
+# instead of decoding JSON. The copy keeps a returned Forecast from changing under its holder
+# when the slot is later rewritten or evicted.
+#
+# The arena is a .npy file holding one structured array of fixed-size slots:
+#
+#   generation    uint64   bumped before and after every write (odd = write in progress)
+#   key           cache key (kommune name or coordinates), empty = free slot
+#   source_mtime  mtime of the JSON cache file the forecast was parsed from
+#   stored_at     when the slot was written (the oldest slot is evicted when probing is full)
+#   hours         forecast length that was requested when parsing
+#   n_points      number of points held
+#   fields        variable names, in the order of the values rows
+#   times         int64 seconds (UTC)
+#   values        float64 (field, point), NaN = missing
+#
+# A key lives in one of PROBE_SLOTS slots after its hash. Readers take no lock: they check the
+# generation counter before and after copying the data (a seqlock), and an entry only counts
+# if its source_mtime matches the JSON cache file, so a refreshed cache invalidates it. Writers
+# serialize on a lock file (fcntl; without fcntl, e.g. on Windows, writes are unlocked).
+#
+# ================================================================================================
+import os
+import time
+import zlib
+
+import numpy as np
+
+from forecast import Forecast, VARIABLES
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+ARENA_SLOTS = 1024          # Room for every kommune and then some
+PROBE_SLOTS = 8             # Slots searched for a key before the oldest one is evicted
+MAX_POINTS = 96             # Longest forecast stored (hours + 1)
+MAX_FIELDS = 12             # Core variables + extra fields per entry
+KEY_BYTES = 96
+FIELD_NAME_BYTES = 48
+
+SLOT = np.dtype([
+    ('generation', '<u8'),
+    ('key', f'S{KEY_BYTES}'),
+    ('source_mtime', '<f8'),
+    ('stored_at', '<f8'),
+    ('hours', '<i4'),
+    ('n_points', '<i4'),
+    ('fields', f'S{FIELD_NAME_BYTES}', (MAX_FIELDS,)),
+    ('times', '<i8', (MAX_POINTS,)),
+    ('values', '<f8', (MAX_FIELDS, MAX_POINTS)),
+])
+
+
+class SharedForecastCache:
+    """Parsed forecasts in a memory-mapped arena file, shared by every process that opens it."""
+
+    def __init__(self, filename, slots=ARENA_SLOTS):
+        """
+        Open the arena, creating it (all slots free) if it is missing or has another layout.
+
+        Args:
+            filename: Arena file (.npy), e.g. temp_data/forecast_arena.npy
+            slots: Number of slots when creating it
+        """
+        self.filename = filename
+        self._lock_filename = f"{filename}.lock"
+        try:
+            self.slots = self._open()
+        except (OSError, ValueError):
+            with self._write_lock():
+                try:
+                    self.slots = self._open()  # Another process created it meanwhile
+                except (OSError, ValueError):
+                    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+                    temp_filename = f"{filename}.{os.getpid()}.tmp"
+                    arena = np.lib.format.open_memmap(
+                        temp_filename, mode='w+', dtype=SLOT, shape=(slots,)
+                    )
+                    arena.flush()
+                    del arena
+                    os.replace(temp_filename, filename)
+                    self.slots = self._open()
+
+    def __repr__(self):
+        used = int(np.count_nonzero(self.slots['key']))
+        return f"SharedForecastCache({used}/{len(self.slots)} slots, {self.filename})"
+
+    def _open(self):
+        slots = np.load(self.filename, mmap_mode='r+')
+        if slots.dtype != SLOT or slots.ndim != 1:
+            raise ValueError(f"{self.filename} has another layout")
+        return slots
+
+    def _candidates(self, key):
+        start = zlib.crc32(key) % len(self.slots)
+        return [(start + i) % len(self.slots) for i in range(min(PROBE_SLOTS, len(self.slots)))]
+
+    def _write_lock(self):
+        return _FileLock(self._lock_filename)
+
+    # ---- LOOKUP (LOCK-FREE) --------------------------------------------------------------------
+    def get(self, key, source_mtime, hours, fields=()):
+        """
+        Forecast for key if the arena holds one parsed from the same JSON cache file version.
+
+        Args:
+            key: Cache key
+            source_mtime: Current mtime of the key's JSON cache file
+            hours: Forecast length wanted; entries parsed for longer forecasts are cut to fit
+            fields: Extra fields wanted (names, as parsed by forecast.parse_fields)
+
+        Returns:
+            Forecast (its own copy of the data), or None if the arena has no matching, current
+            entry.
+        """
+        key_bytes = key.encode('utf-8')
+        if len(key_bytes) > KEY_BYTES:
+            return None
+        for index in self._candidates(key_bytes):
+            slot = self.slots[index]
+            generation = int(slot['generation'])
+            if generation % 2 or slot['key'] != key_bytes:
+                continue
+            if slot['source_mtime'] != source_mtime or slot['hours'] < hours:
+                return None
+            stored_fields = [name.decode('utf-8') for name in slot['fields'][slot['fields'] != b'']]
+            if not all(name in stored_fields for name in fields):
+                return None
+            n_points = min(int(slot['n_points']), hours + 1)
+            values = self.slots['values'][index, :, :n_points].copy()
+            times = self.slots['times'][index, :n_points].view('datetime64[s]').copy()
+            if int(self.slots['generation'][index]) != generation:
+                return None  # Rewritten while copying
+            rows = {name: row for row, name in enumerate(stored_fields)}
+            return Forecast(
+                times, *(values[rows[name]] for name in VARIABLES),
+                extra={name: values[rows[name]] for name in fields},
+            )
+        return None
+
+    # ---- STORE (UNDER THE WRITE LOCK) ----------------------------------------------------------
+    def put(self, key, source_mtime, hours, forecast):
+        """
+        Store a parsed forecast for key, replacing an older entry for it.
+
+        Returns:
+            False if the forecast does not fit a slot (too long, too many fields or too long
+            a key), else True.
+        """
+        fields = forecast.fields
+        n_points = len(forecast)
+        name_bytes = [name.encode('utf-8') for name in fields]
+        key_bytes = key.encode('utf-8')
+        if (n_points > MAX_POINTS or len(fields) > MAX_FIELDS or len(key_bytes) > KEY_BYTES
+                or any(len(name) > FIELD_NAME_BYTES for name in name_bytes)):
+            return False
+
+        with self._write_lock():
+            candidates = self._candidates(key_bytes)
+            keys = self.slots['key'][candidates]
+            if key_bytes in keys:
+                index = candidates[keys.tolist().index(key_bytes)]
+            elif b'' in keys:
+                index = candidates[keys.tolist().index(b'')]
+            else:
+                index = candidates[int(np.argmin(self.slots['stored_at'][candidates]))]
+
+            self.slots['generation'][index] += 1  # Odd: readers skip the slot
+            slot = self.slots[index]
+            slot['key'] = key_bytes
+            slot['source_mtime'] = source_mtime
+            slot['stored_at'] = time.time()
+            slot['hours'] = hours
+            slot['n_points'] = n_points
+            slot['fields'] = name_bytes + [b''] * (MAX_FIELDS - len(name_bytes))
+            slot['times'][:n_points] = forecast.times.astype(np.int64)
+            for row, name in enumerate(fields):
+                slot['values'][row, :n_points] = forecast[name]
+            self.slots['generation'][index] += 1
+            self.slots.flush()
+        return True
+
+    def invalidate(self, key):
+        """Drop the entry for key, if any."""
+        key_bytes = key.encode('utf-8')
+        with self._write_lock():
+            for index in self._candidates(key_bytes):
+                if self.slots['key'][index] == key_bytes:
+                    self.slots['generation'][index] += 1
+                    self.slots['key'][index] = b''
+                    self.slots['generation'][index] += 1
+            self.slots.flush()
+
+
+class _FileLock:
+    """Exclusive lock on a lock file for the duration of a with block (no-op without fcntl)."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.filename)), exist_ok=True)
+            self._file = open(self.filename, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
@@ -0,0 +1,117 @@
+# ================================================================================================
+# STREAMING (--stdin): ONE JSON LINE PER INPUT LINE
+# ================================================================================================
+#
+# Kommune names or 'lat,lon' pairs in, one NDJSON record per line out, written as soon as the
+# forecast is ready - for shell pipelines (e.g. | jq). Fetches run in a small thread pool with
+# bounded read-ahead, so memory stays flat however long the input is.
+#
+# ================================================================================================
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from export import to_record
+from met_client import MetRequestError, MetUnavailable
+from weather_data import get_forecast, kommune_entry, kommune_key
+
+STREAM_WORKERS = 8                  # --stdin: concurrent fetches ...
+STREAM_PENDING_PER_WORKER = 4       # ... and input lines read ahead per worker (backpressure)
+
+
+def stream_location(line):
+    """
+    Location for one --stdin line: a kommune name as accepted by resolve(), or 'lat,lon' /
+    'lat lon' in decimal degrees.
+
+    Returns:
+        (kommune, fylke, latitude, longitude, cache_key); kommune and fylke are empty and
+        cache_key is None (derived from the coordinates) for coordinate lines.
+
+    Raises:
+        ValueError: Unknown or ambiguous kommune, or coordinates out of range
+    """
+    parts = line.replace(',', ' ').split()
+    if len(parts) == 2:
+        try:
+            latitude, longitude = float(parts[0]), float(parts[1])
+        except ValueError:
+            pass  # Two-word kommune name
+        else:
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValueError(f"Ugyldige koordinater '{line}'")
+            return "", "", latitude, longitude, None
+    kommune, fylke, latitude, longitude = kommune_entry(line)
+    return kommune, fylke, latitude, longitude, kommune_key(kommune, fylke)
+
+
+def _stream_record(number, line, hours, fields, swr):
+    """One --stdin line as a JSON-ready record; on failure the record holds 'error' instead."""
+    try:
+        kommune, fylke, latitude, longitude, cache_key = stream_location(line)
+        forecast = get_forecast(
+            latitude, longitude, hours, cache_key=cache_key, swr=swr, fields=fields
+        )
+    except (ValueError, OSError, MetUnavailable, MetRequestError) as exc:
+        return {'line': number, 'input': line, 'error': str(exc)}
+    return {'line': number, 'input': line, **to_record(kommune, fylke, latitude, longitude, forecast)}
+
+
+def stream_ndjson(lines, out, hours=48, fields=(), swr=False, workers=STREAM_WORKERS, ordered=True):
+    """
+    Forecast for every input line, written to out as one JSON line as soon as it is ready.
+
+    Lines are read by a background thread and fetched by a pool of worker threads (through the
+    usual cache). At most workers * STREAM_PENDING_PER_WORKER lines are in flight; reading
+    waits while the window is full, so memory stays flat however long the input is.
+
+    Args:
+        lines: Iterable of kommune names or 'lat,lon' pairs (blank lines and '#' comments skipped)
+        out: Text stream for the records, flushed after each one
+        hours, fields, swr: As for get_forecast()
+        workers: Concurrent fetches
+        ordered: Write records in input order (a slow line holds back the ones after it);
+            otherwise in completion order - each record carries its input 'line' number
+
+    Returns:
+        (records written, of which errors)
+    """
+    slots = threading.BoundedSemaphore(workers * STREAM_PENDING_PER_WORKER)
+    ready = queue.Queue()  # Futures to write: in input order, or as they complete
+    done = object()
+    read_errors = []
+
+    def read_lines(executor):
+        try:
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                slots.acquire()  # Backpressure: wait for a record to be written
+                future = executor.submit(_stream_record, number, line, hours, fields, swr)
+                if ordered:
+                    ready.put(future)
+                else:
+                    future.add_done_callback(ready.put)
+        except Exception as exc:  # E.g. undecodable input: re-raised in the calling thread
+            read_errors.append(exc)
+        finally:
+            executor.shutdown(wait=True)  # All callbacks have run after this
+            ready.put(done)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    threading.Thread(target=read_lines, args=(executor,), daemon=True).start()
+    written = errors = 0
+    while True:
+        future = ready.get()
+        if future is done:
+            if read_errors:
+                raise read_errors[0]
+            return written, errors
+        record = future.result()
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        slots.release()
+        written += 1
+        errors += 'error' in record
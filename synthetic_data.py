@@ -0,0 +1,171 @@
+# ================================================================================================
+# SYNTHETIC WEATHER DATA: VECTORIZED GENERATOR FOR TEST MODE AND STRESS TESTING
+# ================================================================================================
+#
+# Generates the same kind of curves as the original --test mode (temperature sweeping a large
+# range, precipitation bump, gusty wind), but for any number of hours and locations at once,
+# as (locations, hours) arrays from a seeded generator. Can also emit the data in the shape of
+# the MET locationforecast 'complete' JSON, for load-testing parsing and caching offline.
+#
+# Usage (stress data):
+#   python synthetic_data.py --hours 4800 --locations 100 --seed 1 --output temp_data/synthetic
+#   python synthetic_data.py --hours 48 --locations 10000 --format npz --output stress.npz
+#
+# ================================================================================================
+import argparse
+import json
+import os
+
+import numpy as np
+
+from forecast import VARIABLES
+
+TEST_TEMPERATURE_RANGE = (-22, 33)
+TEST_PRECIP_SCALE = 3.5             # Scale factor for test precipitation to ensure grid alignment
+
+# MET 'instant' detail keys for each variable (precipitation lives under 'next_1_hours')
+MET_KEYS = {
+    'temperature': 'air_temperature',
+    'windspeed': 'wind_speed',
+    'windgust': 'wind_speed_of_gust',
+    'precipitation': 'precipitation_amount',
+}
+MET_UNITS = {
+    'air_temperature': 'celsius',
+    'precipitation_amount': 'mm',
+    'wind_speed': 'm/s',
+    'wind_speed_of_gust': 'm/s',
+}
+
+
+def synthetic_arrays(
+    n_hours=48,
+    n_locations=1,
+    seed=None,
+    temperature_range=TEST_TEMPERATURE_RANGE,
+    precip_scale=TEST_PRECIP_SCALE,
+    location_spread=0.0,
+):
+    """
+    Generate synthetic weather for many locations in one vectorized pass.
+
+    Args:
+        n_hours: Forecast length; n_hours+1 points per location (both ends included)
+        n_locations: Number of synthetic locations
+        seed: Seed for the random generator (None for fresh randomness)
+        temperature_range: (min, max) temperature swept over the forecast
+        precip_scale: Scale factor for precipitation, keeps test-plot grid alignment
+        location_spread: Std. dev. (°C) of a per-location temperature offset
+
+    Returns:
+        Dict of float64 arrays, each of shape (n_locations, n_hours+1).
+    """
+    rng = np.random.default_rng(seed)
+    shape = (n_locations, n_hours + 1)
+
+    # Smooth progression 0 → 1 over the forecast, shared by all locations
+    progress = np.arange(n_hours + 1) / max(n_hours, 1)
+
+    # Temperature: sweep from min to max, with small oscillations
+    coldest, warmest = temperature_range
+    temperature = coldest + progress * (warmest - coldest) + 3 * np.sin(progress * 4 * np.pi)
+    temperature = temperature + rng.normal(0, location_spread, (n_locations, 1))
+
+    # Minimal precipitation/wind for completeness
+    # Temp: 80°C range, interval 8 → 11 ticks
+    # Want precip: 20mm range, interval 2 → 11 ticks  (20/80 = 1/4 ratio)
+    precipitation = precip_scale * (2 * np.sin(progress * np.pi) + rng.normal(0, 0.5, shape))
+    windspeed = 5 + 3 * np.sin(progress * 2 * np.pi) + rng.normal(0, 1, shape)
+    # Wind gusts are typically 1.3-1.8x sustained wind speed
+    windgust = windspeed * (1.3 + 0.5 * rng.random(shape)) + rng.normal(0, 0.5, shape)
+
+    return {
+        'temperature': np.broadcast_to(temperature, shape).copy(),
+        'precipitation': np.maximum(precipitation, 0),
+        'windspeed': np.maximum(windspeed, 0),
+        'windgust': np.maximum(windgust, 0),
+    }
+
+
+def hourly_times(n_hours, start=None):
+    """datetime64[s] axis of n_hours+1 hourly steps, by default from the current UTC hour."""
+    if start is None:
+        start = np.datetime64('now', 'h')
+    return np.datetime64(start, 's') + np.arange(n_hours + 1) * np.timedelta64(1, 'h')
+
+
+def to_met_json(arrays, times, latitude=59.9139, longitude=10.7522):
+    """
+    Yield one MET locationforecast-shaped dict per synthetic location.
+
+    Values are rounded to one decimal like MET's own; only the fields the script reads are
+    included. Time strings are formatted once for all locations.
+    """
+    time_strings = [f"{t}Z" for t in np.datetime_as_string(times, unit='s').tolist()]
+    updated_at = time_strings[0]
+    units = dict(MET_UNITS)
+
+    rounded = {name: np.round(arrays[name], 1).tolist() for name in VARIABLES}
+    for loc in range(len(rounded['temperature'])):
+        temperature = rounded['temperature'][loc]
+        precipitation = rounded['precipitation'][loc]
+        windspeed = rounded['windspeed'][loc]
+        windgust = rounded['windgust'][loc]
+        timeseries = [
+            {
+                "time": time_strings[i],
+                "data": {
+                    "instant": {"details": {
+                        "air_temperature": temperature[i],
+                        "wind_speed": windspeed[i],
+                        "wind_speed_of_gust": windgust[i],
+                    }},
+                    "next_1_hours": {"details": {"precipitation_amount": precipitation[i]}},
+                },
+            }
+            for i in range(len(time_strings))
+        ]
+        yield {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [longitude, latitude, 0]},
+            "properties": {
+                "meta": {"updated_at": updated_at, "units": units},
+                "timeseries": timeseries,
+            },
+        }
+
+
+# ================================================================================================
+# COMMAND LINE: WRITE STRESS DATA TO DISK
+# ================================================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Syntetiske værdata for belastningstesting')
+    parser.add_argument('--hours', type=int, default=48, metavar='N', help='Antall timer per sted')
+    parser.add_argument('--locations', type=int, default=1, metavar='N', help='Antall steder')
+    parser.add_argument('--seed', type=int, default=None, help='Frø for tilfeldige tall')
+    parser.add_argument(
+        '--spread', type=float, default=5.0, metavar='C',
+        help='Standardavvik (°C) for temperaturforskyvning per sted'
+    )
+    parser.add_argument(
+        '--format', choices=('json', 'npz'), default='json',
+        help="'json': én MET-formet fil per sted i --output (mappe). 'npz': alle arrays i én fil"
+    )
+    parser.add_argument('--output', required=True, help='Mappe (json) eller filnavn (npz)')
+    args = parser.parse_args()
+
+    arrays = synthetic_arrays(
+        args.hours, args.locations, seed=args.seed, location_spread=args.spread
+    )
+    times = hourly_times(args.hours)
+
+    if args.format == 'npz':
+        np.savez(args.output, times=times, **arrays)
+        print(f"Wrote {args.locations} x {args.hours + 1} points to {args.output}")
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        for i, payload in enumerate(to_met_json(arrays, times)):
+            filename = os.path.join(args.output, f"weather_cache_synthetic{i}.json")
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+        print(f"Wrote {args.locations} MET-style JSON files to {args.output}")
@@ -0,0 +1,381 @@
+# ================================================================================================
+# COMMAND-LINE FORECAST: TABLE AND TERMINAL CHART
+# ================================================================================================
+#
+# render_table() and render_termplot() return the forecast as text, with temperatures in the
+# plot's palette where the terminal supports ANSI escapes. No matplotlib.
+#
+# ================================================================================================
+import os
+import shutil
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from palette_static import get_palette, get_palette_rgba, temperature_to_index
+from plotting import REALLYWARM, TRULYCOLD
+
+# ---- ANSI ESCAPE CODES - ONLY USE IF SUPPORTED -------------------------------------------------
+def supports_ansi():
+    """Check if terminal supports ANSI escape codes"""
+    # Windows Command Prompt (cmd.exe) doesn't support ANSI by default
+    if os.name == 'nt':
+        # Only enable ANSI on Windows if we're in a modern terminal
+        return (
+            'ANSICON' in os.environ or           # ConEmu, cmder
+            'WT_SESSION' in os.environ or        # Windows Terminal
+            'TERM_PROGRAM' in os.environ or      # VS Code terminal
+            'COLORTERM' in os.environ            # Modern terminals
+        )
+    else:
+        # Unix-like systems generally support ANSI
+        return hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
+
+# BOLD, ITALIC, UNDERLINE, RESET, YELLOW, CYAN
+ANSI_CODES = ('\033[1m', '\033[3m', '\033[4m', '\033[0m', '\033[93m', '\033[96m')
+NO_ANSI_CODES = ('',) * len(ANSI_CODES)  # Empty strings for CMD
+
+# ---- TEMPERATURE COLORS: SAME PALETTE AS THE PLOT ----------------------------------------------
+def supports_truecolor():
+    """Check if terminal advertises 24-bit color (otherwise 256 colors are assumed)"""
+    return os.environ.get('COLORTERM', '').lower() in ('truecolor', '24bit')
+
+def rgb_to_ansi256(rgb8):
+    """Nearest xterm-256 color (6x6x6 cube or grayscale ramp) for each (N, 3) uint8 row."""
+    rgb = np.asarray(rgb8, dtype=np.int64)
+    cube_levels = np.array([0, 95, 135, 175, 215, 255])
+
+    # Nearest cube level per channel, and the resulting cube color
+    cube_idx = np.abs(rgb[..., np.newaxis] - cube_levels).argmin(axis=-1)
+    cube_rgb = cube_levels[cube_idx]
+    cube_code = 16 + 36 * cube_idx[:, 0] + 6 * cube_idx[:, 1] + cube_idx[:, 2]
+
+    # Nearest step on the grayscale ramp (8, 18, ..., 238)
+    gray_idx = np.clip(np.round((rgb.mean(axis=1) - 8) / 10), 0, 23).astype(np.int64)
+    gray_rgb = (8 + 10 * gray_idx)[:, np.newaxis]
+    gray_code = 232 + gray_idx
+
+    cube_dist = ((rgb - cube_rgb) ** 2).sum(axis=1)
+    gray_dist = ((rgb - gray_rgb) ** 2).sum(axis=1)
+    return np.where(gray_dist < cube_dist, gray_code, cube_code)
+
+@lru_cache(maxsize=None)
+def temperature_escape_table(dark_mode=False, ansi=True, truecolor=False):
+    """One escape string per palette entry, built once: coloring a cell is then a lookup."""
+    if not ansi:
+        return ('',) * len(get_palette(dark_mode))
+    palette_rgb8 = get_palette_rgba(dark_mode, bytes=True)[:, :3]
+    if truecolor:
+        return tuple(f'\033[38;2;{r};{g};{b}m' for r, g, b in palette_rgb8.tolist())
+    return tuple(f'\033[38;5;{code}m' for code in rgb_to_ansi256(palette_rgb8).tolist())
+
+def temperature_escapes(temperatures, escape_table, missing_escape=''):
+    """ANSI color escape per temperature (missing_escape for missing values)."""
+    indices, nan_mask = temperature_to_index(temperatures, vmin=TRULYCOLD, vmax=REALLYWARM)
+    return [
+        missing_escape if missing else escape_table[i]
+        for i, missing in zip(np.ravel(indices).tolist(), np.ravel(nan_mask).tolist())
+    ]
+# ------------------------------------------------------------------------------------------------
+
+def format_val(val, width=None):
+    """Format value with decimal logic. Optional width for alignment."""
+    if val is None or (isinstance(val, float) and np.isnan(val)):
+        result = "NA"
+    else:
+        val = float(val)
+        # One decimal place for val < 10, otherwise integer.
+        # Reasonable for these ranges, aids readability.
+        if abs(val) < 10:
+            result = f"{val:.1f}"
+        else:
+            result = f"{int(round(val))}"
+
+    # Apply width/alignment if specified
+    return f"{result:>{width}}" if width else result
+
+
+def render_table(
+    forecast, title_name="", hours=None, dark_mode=False, stale_note=None, ansi=None, unicode=True
+):
+    """
+    Terminal forecast: sampled hourly table plus summary.
+
+    Args:
+        forecast: Forecast to show
+        title_name: Place name for the header
+        hours: Forecast length shown in the header (default: len(forecast) - 1)
+        dark_mode: Use the neon palette for temperature colors
+        stale_note: Shown under the header when the data is older than the fresh window
+        ansi: Use ANSI colors and box characters (default: if stdout supports them)
+        unicode: Use bullets in the summary (False for terminals without Unicode)
+
+    Returns:
+        The forecast as one string, ready to print.
+    """
+    if not len(forecast):
+        return "Ingen data tilgjengelig for kommandolinje værvarsel"
+    if hours is None:
+        hours = len(forecast) - 1
+    if ansi is None:
+        ansi = supports_ansi()
+    BOLD, ITALIC, UNDERLINE, RESET, YELLOW, CYAN = ANSI_CODES if ansi else NO_ANSI_CODES
+    V_BAR, H_BAR = ('┃', '─') if ansi else ('|', '-')
+    escape_table = temperature_escape_table(dark_mode, ansi, ansi and supports_truecolor())
+
+    lines = []
+    # Header
+    lines.append(f"{BOLD}Værvarsel for {title_name}, neste {hours} timer:{RESET}")
+    if stale_note:
+        lines.append(f"{YELLOW}({stale_note}){RESET}")
+    lines.append("")  # Aesthetic line break
+
+    # Sampled time-temperature pairs
+    n = len(forecast)
+    if n <= 7:
+        step = 1
+    elif n <= 13:
+        step = 2
+    elif n <= 19:
+        step = 3
+    else:
+        step = 4
+    indices = list(range(0, n, step)) if n > 0 else []
+    if indices and indices[-1] != n - 1:
+        indices.append(n - 1)
+
+    if indices:
+        # Header for the hourly forecast table
+        lines.append(f"  {'Tid':^6} {V_BAR} {'Temp.':^7} {V_BAR} {'Vind(kast)':^16} {V_BAR} {'Nedbør':^8}")
+        separator = f"  {'':─<6} {V_BAR} {'':─<7} {V_BAR} {'':─<16} {V_BAR} {'':─<8}".replace('─', H_BAR)
+        lines.append(separator)
+
+        # Palette color per shown temperature, looked up in one vectorized pass
+        row_escapes = dict(zip(
+            indices, temperature_escapes(forecast.temperature[indices], escape_table, YELLOW)
+        ))
+
+        for i in indices:
+            t_raw = forecast.temperature[i]
+            p_raw = forecast.precipitation[i]
+            w_raw = forecast.windspeed[i]
+            g_raw = forecast.windgust[i]
+            time_str = forecast.labels[i].replace('.', ':')
+
+            # Format values with proper alignment for CMD compatibility
+            t_fmt = f"{format_val(t_raw, 4)} °C"
+            p_fmt = f"{format_val(p_raw, 4)} mm"
+
+            # Format wind with gust in parentheses
+            if g_raw is not None and not (isinstance(g_raw, float) and np.isnan(g_raw)):
+                w_fmt = f"{format_val(w_raw, 3)}  ({format_val(g_raw, 3)}) m/s"
+            else:
+                w_fmt = f"{format_val(w_raw, 4)} m/s"
+
+            if ansi:
+                # Use colors with exact spacing - account for ANSI codes with wider fields
+                temp_colored = f"{row_escapes[i]}{t_fmt:>7}{RESET}"
+                precip_colored = f"{CYAN}{p_fmt}{RESET}"
+                lines.append(f"  {time_str:<6} {V_BAR} {temp_colored} {V_BAR} {w_fmt:>16} {V_BAR} {precip_colored:>15}")
+            else:
+                # CMD-friendly without color codes - use exact widths
+                lines.append(f"  {time_str:<6} {V_BAR} {t_fmt:>7} {V_BAR} {w_fmt:>16} {V_BAR} {p_fmt:>7}")
+    else:
+        lines.append("  Ingen værvarseldata tilgjengelig.")
+
+    lines.append("")  # Aesthetic line break
+    lines.append(f"{BOLD}  Oppsummering:{RESET}")
+
+    # --- SUMMARY STATS --------------------------------------------------------------------------
+    t_avg = np.nanmean(forecast.temperature)
+    p_total = np.nansum(forecast.precipitation)
+    w_max = np.nanmax(forecast.windspeed)
+
+    # Calculate max gust if available
+    g_max = np.nanmax(forecast.windgust) if not np.isnan(forecast.windgust).all() else None
+
+    # Separate values and units for formatting
+    t_str = format_val(t_avg)
+    w_str = format_val(w_max)
+    p_str = format_val(p_total)
+
+    avg_escape = temperature_escapes(t_avg, escape_table, YELLOW)[0]
+
+    # Two-column alignment: description & value-with-unit
+    label_width = 20  # Width for description column
+
+    # Two-column alignment - with fallback for terminals without Unicode bullets
+    if unicode:
+        lines.append(f"{avg_escape}  {'• Snittemperatur:':<{label_width}} {t_str} °C{RESET}")
+        lines.append(f"  {'• Maks. middelvind:':<{label_width}} {w_str} m/s")
+        if g_max is not None:
+            g_str = format_val(g_max)
+            lines.append(f"  {'• Maks. vindkast:':<{label_width}} {g_str} m/s")
+        lines.append(f"{CYAN}  {'• Total nedbør:':<{label_width}} {p_str} mm{RESET}")
+    else:
+        lines.append(f"{avg_escape}   {'Snittemperatur:':<{label_width-1}} {t_str} °C{RESET}")
+        lines.append(f"   {'Maks. middelvind:':<{label_width-1}} {w_str} m/s")
+        if g_max is not None:
+            g_str = format_val(g_max)
+            lines.append(f"   {'Maks. vindkast:':<{label_width-1}} {g_str} m/s")
+        lines.append(f"{CYAN}   {'Total nedbør:':<{label_width-1}} {p_str} mm{RESET}")
+
+    lines.append("")  # Aesthetic line break
+    lines.append("  Værdata: Meteorologisk institutt (MET.no)")
+    lines.append("")  # Aesthetic line break
+    # --------------------------------------------------------------------------------------------
+    return "\n".join(lines)
+
+# ---- TERMINAL CHART (--termplot): BRAILLE CURVES AND BLOCK BARS, NO MATPLOTLIB -----------------
+BRAILLE_BITS = np.array([[0x01, 0x08], [0x02, 0x10], [0x04, 0x20], [0x40, 0x80]])  # 4x2 dots per cell
+BLOCKS = (' ▁▂▃▄▅▆▇█', ' ..::||##')  # Eighths of a cell: Unicode, ASCII fallback
+TERMPLOT_ROWS = (10, 3, 4)           # Text rows for temperature, precipitation and wind
+TERMPLOT_GUTTER = 8                  # Axis label width, incl. the axis line
+
+def braille_codes(pixels):
+    """Braille code point offsets (0 = blank) for a boolean (4*rows, 2*columns) pixel grid."""
+    rows, columns = pixels.shape[0] // 4, pixels.shape[1] // 2
+    cells = pixels.reshape(rows, 4, columns, 2) * BRAILLE_BITS[np.newaxis, :, np.newaxis, :]
+    return cells.sum(axis=(1, 3))
+
+def draw_curve(pixels, x, y, connect=True):
+    """
+    Set pixels along (x, y), given in pixel coordinates (row 0 at the top); NaN points are
+    skipped. connect=False only sets the points themselves (markers).
+    """
+    height, width = pixels.shape
+    valid = np.isfinite(y)
+    if not valid.any():
+        return
+    x, y = x[valid], y[valid]
+    if not connect:
+        pixels[np.clip(np.round(y), 0, height - 1).astype(int), np.round(x).astype(int)] = True
+        return
+    columns = np.arange(int(np.ceil(x.min())), int(np.floor(x.max())) + 1)
+    rows = np.clip(np.round(np.interp(columns, x, y)), 0, height - 1).astype(int)
+    # Fill each column from its own row towards the previous column's, so steep parts stay joined
+    previous = np.concatenate([rows[:1], rows[:-1]])
+    for column, row, previous_row in zip(columns.tolist(), rows.tolist(), previous.tolist()):
+        low, high = min(row, (row + previous_row) // 2), max(row, (row + previous_row + 1) // 2)
+        pixels[low:high + 1, column] = True
+
+def render_termplot(
+    forecast, title_name="", hours=None, dark_mode=False, ansi=None, unicode=True, width=None
+):
+    """
+    Terminal chart: palette-colored temperature curve, precipitation bars and wind with gust
+    markers, in Unicode braille and block characters - no matplotlib involved.
+
+    Args:
+        forecast: Forecast to show
+        title_name: Place name for the header
+        hours: Forecast length shown in the header (default: len(forecast) - 1)
+        dark_mode: Use the neon palette for temperature colors
+        ansi: Use ANSI colors (default: if stdout supports them)
+        unicode: Braille, blocks and box lines (False: ASCII only)
+        width: Chart width in characters (default: fit the terminal)
+
+    Returns:
+        The chart as one string, ready to print.
+    """
+    n = len(forecast)
+    if n < 2:
+        return "Ingen data tilgjengelig for terminalgraf"
+    if hours is None:
+        hours = n - 1
+    if ansi is None:
+        ansi = supports_ansi()
+    BOLD, ITALIC, UNDERLINE, RESET, YELLOW, CYAN = ANSI_CODES if ansi else NO_ANSI_CODES
+    escape_table = temperature_escape_table(dark_mode, ansi, ansi and supports_truecolor())
+    V_AXIS, TICK, CORNER, H_AXIS, X_TICK = ('│', '┤', '└', '─', '┬') if unicode else ('|', '|', '+', '-', '+')
+    blocks = BLOCKS[0] if unicode else BLOCKS[1]
+    if width is None:
+        terminal_width = shutil.get_terminal_size((80, 24)).columns
+        width = min(terminal_width - TERMPLOT_GUTTER - 1, 4 * (n - 1) + 1)
+    width = max(width, 10)
+    temperature_rows, precip_rows, wind_rows = TERMPLOT_ROWS
+
+    # Hour of each text column (centre) and pixel column of each forecast point
+    column_hours = (np.arange(width) + 0.5) / width * (n - 1)
+    point_x = np.arange(n) / (n - 1) * (2 * width - 1)
+
+    def cell(code, escape=''):
+        if not code:
+            return ' '
+        glyph = chr(0x2800 + code) if unicode else '*'
+        return f"{escape}{glyph}{RESET}" if escape else glyph
+
+    def gutter(label=''):
+        return f"{label:>{TERMPLOT_GUTTER - 2}} {TICK if label else V_AXIS}"
+
+    lines = [f"{BOLD}Graf for {title_name}, neste {hours} timer:{RESET}", ""]
+
+    # ---- Temperature: braille curve, each column in the palette color of its temperature
+    temperature = forecast.temperature
+    if np.isfinite(temperature).any():
+        top = np.ceil(np.nanmax(temperature))
+        bottom = np.floor(np.nanmin(temperature))
+    else:
+        top, bottom = 1.0, 0.0
+    top = max(top, bottom + 1)
+    pixels = np.zeros((4 * temperature_rows, 2 * width), dtype=bool)
+    draw_curve(pixels, point_x, (top - temperature) / (top - bottom) * (4 * temperature_rows - 1))
+    codes = braille_codes(pixels)
+    column_escapes = temperature_escapes(
+        np.interp(column_hours, np.arange(n), temperature), escape_table, YELLOW
+    )
+    for row in range(temperature_rows):
+        if row == 0:
+            label = f"{format_val(top)}°C"
+        elif row == temperature_rows - 1:
+            label = f"{format_val(bottom)}°C"
+        else:
+            label = ''
+        lines.append(gutter(label) + ''.join(
+            cell(code, escape) for code, escape in zip(codes[row].tolist(), column_escapes)
+        ))
+
+    # ---- Precipitation: block bars per hour, in eighths of a cell
+    precipitation = np.nan_to_num(forecast.precipitation)
+    precip_scale = max(1.0, float(np.ceil(precipitation.max())))
+    column_precip = precipitation[np.minimum(column_hours.astype(int), n - 1)]
+    eighths = np.round(column_precip / precip_scale * precip_rows * 8).astype(int)
+    for row in range(precip_rows):
+        levels = np.clip(eighths - 8 * (precip_rows - 1 - row), 0, 8)
+        bars = ''.join(blocks[level] for level in levels.tolist())
+        label = f"{format_val(precip_scale)}mm" if row == 0 else ''
+        lines.append(gutter(label) + f"{CYAN}{bars}{RESET}")
+
+    # ---- Wind: braille curve for the mean wind, single dots for the gusts
+    wind_top = float(np.nanmax(np.concatenate([forecast.windspeed, forecast.windgust, [1.0]])))
+    wind_top = float(np.ceil(wind_top))
+    pixels = np.zeros((4 * wind_rows, 2 * width), dtype=bool)
+    to_rows = lambda values: (wind_top - values) / wind_top * (4 * wind_rows - 1)
+    draw_curve(pixels, point_x, to_rows(forecast.windspeed))
+    draw_curve(pixels, point_x, to_rows(forecast.windgust), connect=False)
+    codes = braille_codes(pixels)
+    for row in range(wind_rows):
+        label = f"{format_val(wind_top)}m/s" if row == 0 else ''
+        lines.append(gutter(label) + ''.join(cell(code) for code in codes[row].tolist()))
+
+    # ---- Time axis: tick and label every few hours, as dense as the width allows
+    columns_per_hour = width / (n - 1)
+    step = next((step for step in (1, 2, 3, 6, 12) if step * columns_per_hour >= 4), 24)
+    axis, labels = [H_AXIS] * width, [' '] * (width + 2)
+    for i in range(0, n, step):
+        column = min(int(round(i * (width - 1) / (n - 1))), width - 1)
+        axis[column] = X_TICK
+        for offset, char in enumerate(forecast.labels[i][:2]):
+            labels[column + offset] = char
+    lines.append(' ' * (TERMPLOT_GUTTER - 1) + CORNER + ''.join(axis))
+    lines.append(' ' * TERMPLOT_GUTTER + ''.join(labels).rstrip())
+
+    # ---- Legend
+    curve, bar, dot = ('⠒', blocks[8], '⠂') if unicode else ('*', '#', '*')
+    lines.append("")
+    lines.append(
+        f"  {curve} temperatur (°C)   {CYAN}{bar}{RESET} nedbør (mm/t)   {curve} vind   {dot} vindkast (m/s)"
+    )
+    lines.append("")
+    return "\n".join(lines)
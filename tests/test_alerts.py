@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import alerts
+
+VARIABLES = ['temperature', 'precipitation', 'windspeed', 'windgust']
+START = np.datetime64('2026-01-15T00:00:00', 's')
+HOUR = np.timedelta64(3600, 's')
+TIMES = START + HOUR * np.arange(12)
+UPDATED = np.array([START, START])
+
+
+def gusts(oslo, bergen):
+    """(kommune, hour, variable) values with the given windgust series and calm weather."""
+    values = np.zeros((2, len(TIMES), len(VARIABLES)))
+    values[0, :, VARIABLES.index('windgust')] = oslo
+    values[1, :, VARIABLES.index('windgust')] = bergen
+    return values
+
+
+def run(rules_text, values, state_file, hours_later=0, updated=UPDATED):
+    rules = alerts.parse_rules(rules_text, VARIABLES)
+    return alerts.run_alerts(
+        rules, values, VARIABLES, TIMES, ['oslo', 'bergen'], updated, state_file,
+        now=START + HOUR * hours_later,
+    )
+
+
+def summary(events):
+    return [(event['event'], event['kommune'], event['onset']) for event in events]
+
+
+@pytest.mark.parametrize('rule', ["gust > 20 m/s within 12h", "gust > 20 m/s"])
+def test_alert_clears_when_onset_has_passed_without_new_data(tmp_path, rule):
+    state_file = str(tmp_path / 'alert_state.json')
+    values = gusts([0, 0, 25] + [0] * 9, [0] * 12)  # One gusty hour in Oslo, at 02:00
+
+    assert summary(run(rule, values, state_file)) == [('alert', 'oslo', '2026-01-15T02:00:00Z')]
+    assert run(rule, values, state_file, hours_later=1) == []  # Still ahead
+    # Same cube rows, but the gusty hour is now in the past
+    assert summary(run(rule, values, state_file, hours_later=3)) == [
+        ('cleared', 'oslo', '2026-01-15T02:00:00Z')
+    ]
+    assert run(rule, values, state_file, hours_later=4) == []
+
+
+def test_within_horizon_moving_forward_raises_new_alert(tmp_path):
+    state_file = str(tmp_path / 'alert_state.json')
+    values = gusts([0] * 12, [0] * 8 + [30] + [0] * 3)  # Bergen at 08:00
+
+    assert run("gust > 20 m/s within 6h", values, state_file) == []
+    assert summary(run("gust > 20 m/s within 6h", values, state_file, hours_later=3)) == [
+        ('alert', 'bergen', '2026-01-15T08:00:00Z')
+    ]
+
+
+def test_alert_and_cleared_are_reported_once(tmp_path):
+    state_file = str(tmp_path / 'alert_state.json')
+    rule = "Storm: gust > 20 m/s"
+    windy = gusts([0] * 6 + [22] * 6, [0] * 12)
+
+    events = run(rule, windy, state_file)
+    assert summary(events) == [('alert', 'oslo', '2026-01-15T06:00:00Z')]
+    assert events[0]['rule'] == 'Storm' and events[0]['value'] == 22.0
+    assert run(rule, windy, state_file) == []
+
+    # New data for Oslo that still triggers: no second alert
+    refreshed = UPDATED + np.array([HOUR, 0])
+    stormier = gusts([0] * 6 + [28] * 6, [0] * 12)
+    assert run(rule, stormier, state_file, updated=refreshed) == []
+
+    # New data without the storm: cleared once, then nothing
+    calm_update = UPDATED + np.array([2 * HOUR, 0])
+    calm = gusts([0] * 12, [0] * 12)
+    assert summary(run(rule, calm, state_file, updated=calm_update)) == [
+        ('cleared', 'oslo', '2026-01-15T06:00:00Z')
+    ]
+    assert run(rule, calm, state_file, updated=calm_update) == []
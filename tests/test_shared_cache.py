@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from forecast import Forecast
+from shared_cache import SharedForecastCache
+
+START = np.datetime64('2026-01-15T00:00:00', 's')
+MTIME = 1768435200.0
+
+
+def make_forecast(temperature, hours=6, humidity=None):
+    times = START + np.timedelta64(3600, 's') * np.arange(hours + 1)
+    values = np.full(hours + 1, float(temperature))
+    extra = None if humidity is None else {'humidity': np.full(hours + 1, float(humidity))}
+    return Forecast(times, values, values * 0, values / 2, values, extra=extra)
+
+
+@pytest.fixture
+def arena(tmp_path):
+    return str(tmp_path / 'forecast_arena.npy')
+
+
+def test_get_returns_stored_copy(arena):
+    cache = SharedForecastCache(arena, slots=16)
+    assert cache.put('oslo', MTIME, 6, make_forecast(5, humidity=80))
+
+    forecast = cache.get('oslo', MTIME, 4, fields=('humidity',))
+    np.testing.assert_array_equal(forecast.temperature, np.full(5, 5.0))
+    np.testing.assert_array_equal(forecast['humidity'], np.full(5, 80.0))
+
+    # Rewriting the slot must not change the Forecast already handed out
+    cache.put('oslo', MTIME, 6, make_forecast(-3))
+    np.testing.assert_array_equal(forecast.temperature, np.full(5, 5.0))
+
+
+def test_stale_mtime_longer_forecast_or_missing_field_is_a_miss(arena):
+    cache = SharedForecastCache(arena, slots=16)
+    cache.put('oslo', MTIME, 6, make_forecast(5))
+
+    assert cache.get('oslo', MTIME + 60, 6) is None  # JSON cache file refreshed since
+    assert cache.get('oslo', MTIME, 12) is None
+    assert cache.get('oslo', MTIME, 6, fields=('humidity',)) is None
+    assert cache.get('bergen', MTIME, 6) is None
+
+
+def test_oldest_entry_is_evicted_when_probing_is_full(arena):
+    cache = SharedForecastCache(arena, slots=1)
+    cache.put('oslo', MTIME, 6, make_forecast(5))
+    cache.put('bergen', MTIME, 6, make_forecast(9))
+
+    assert cache.get('oslo', MTIME, 6) is None
+    np.testing.assert_array_equal(cache.get('bergen', MTIME, 6).temperature, np.full(7, 9.0))
+
+
+class _WriterDuringRead:
+    """Arena slots that let another process rewrite the slot when a reader copies the values."""
+
+    def __init__(self, slots, rewrite):
+        self.slots = slots
+        self.rewrite = rewrite
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __getitem__(self, item):
+        if item == 'values' and self.rewrite is not None:
+            rewrite, self.rewrite = self.rewrite, None
+            rewrite()
+        return self.slots[item]
+
+
+def test_rewrite_during_read_is_a_miss(arena):
+    reader = SharedForecastCache(arena, slots=16)
+    writer = SharedForecastCache(arena, slots=16)  # Same file, as another process would map it
+    writer.put('oslo', MTIME, 6, make_forecast(5))
+
+    reader.slots = _WriterDuringRead(
+        reader.slots, lambda: writer.put('oslo', MTIME, 6, make_forecast(-3))
+    )
+    assert reader.get('oslo', MTIME, 6) is None  # Generation changed while copying
+
+    np.testing.assert_array_equal(reader.get('oslo', MTIME, 6).temperature, np.full(7, -3.0))
+
+
+def test_slot_being_written_is_skipped(arena):
+    cache = SharedForecastCache(arena, slots=16)
+    cache.put('oslo', MTIME, 6, make_forecast(5))
+    index = cache._candidates(b'oslo')[0]
+
+    cache.slots['generation'][index] += 1  # Odd: a writer is in the middle of the slot
+    assert cache.get('oslo', MTIME, 6) is None
+    cache.slots['generation'][index] += 1
+    assert cache.get('oslo', MTIME, 6) is not None
@@ -0,0 +1,232 @@
+# ================================================================================================
+# WATCH MODE (--watch): REFRESH TERMINAL AND PLOT IN PLACE
+# ================================================================================================
+#
+# For wall displays: a ForecastRun (forecast_run.py) stays on screen and is reloaded when the
+# cached forecast expires (or every N minutes). Only a changed forecast is written out and
+# redrawn: the terminal block line by line, the plot by changing its artists in place.
+#
+# ================================================================================================
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import metrics
+from forecast import NORWAY_TIMEZONE
+from met_client import MetRequestError, MetUnavailable
+from palette_static import temperature_to_rgba
+from plotting import REALLYWARM, TRULYCOLD, plot_rc
+from terminal import supports_ansi
+from weather_data import CACHE_FRESH_SECONDS, _silent
+
+WATCH_MIN_SECONDS = 60              # --watch: never check more often than this
+
+
+class LiveBlock:
+    """
+    A block of terminal lines that is printed once and then updated in place.
+
+    On a terminal with ANSI support only lines that changed are rewritten, using relative
+    cursor movement (so it still works after the block has scrolled). Elsewhere (pipes, old
+    CMD) a changed block is simply printed again.
+    """
+
+    def __init__(self, ansi=None, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.ansi = supports_ansi() if ansi is None else ansi
+        self.lines = None
+
+    def update(self, text):
+        lines = text.split("\n")
+        if self.lines == lines:
+            return
+        if not self.ansi or self.lines is None or len(lines) != len(self.lines):
+            self.stream.write(text + "\n")
+        else:
+            # Cursor sits on the line below the block; walk to each changed line and back
+            out = []
+            row = len(lines)
+            for i, (old, new) in enumerate(zip(self.lines, lines)):
+                if old == new:
+                    continue
+                out.append(f"\033[{row - i}F" if row > i else "\r")
+                out.append(f"\033[2K{new}")
+                row = i
+            out.append(f"\033[{len(lines) - row}E")
+            self.stream.write("".join(out))
+        self.stream.flush()
+        self.lines = lines
+
+
+def update_plot(artists, forecast, stale_note=None):
+    """
+    Put a new forecast into a figure drawn by draw_forecast(), changing artists in place.
+
+    Lines get set_data, the temperature collection set_segments/set_array, gusts set_offsets,
+    and the x labels and midnight lines follow the new time axis. Axis limits and the aligned
+    grid are kept, so this only applies when the new values fit inside them.
+
+    Returns:
+        True if updated (canvas redraw requested); False if the figure must be redrawn from
+        scratch (values outside the axes, different length, or an old matplotlib).
+    """
+    from matplotlib.ticker import FixedFormatter
+
+    render_start = time.perf_counter()
+    temperature_axes = artists['temperature_axes']
+    multivar_axes = artists['multivar_axes']
+    if len(forecast) != artists['n_hours'] or not hasattr(artists['precip_fill'], 'set_data'):
+        return False
+    if (artists['midnight_lines'] is None) != (
+        not any(label.startswith('00.') for label in forecast.labels)
+    ):
+        return False
+
+    # New values must fit inside the current axes, or the grid alignment would be wrong
+    temperature_low, temperature_high = temperature_axes.get_ylim()
+    multivar_low, multivar_high = multivar_axes.get_ylim()
+    multivar_values = np.concatenate([forecast.precipitation, forecast.windspeed, forecast.windgust])
+    if (
+        np.nanmin(forecast.temperature) < temperature_low
+        or np.nanmax(forecast.temperature) > temperature_high
+        or np.nanmin(multivar_values) < multivar_low
+        or np.nanmax(multivar_values) > multivar_high
+    ):
+        return False
+
+    figure = artists['figure']
+    time_indices = forecast.decimation_indices(int(figure.get_figwidth() * figure.dpi))
+    plot_forecast = forecast.take(time_indices)
+
+    temperature_values = plot_forecast.temperature
+    points_for_segments = np.array([time_indices, temperature_values]).T.reshape(-1, 1, 2)
+    artists['temperature_line'].set_segments(
+        np.concatenate([points_for_segments[:-1], points_for_segments[1:]], axis=1)
+    )
+    artists['temperature_line'].set_array(0.5 * (temperature_values[:-1] + temperature_values[1:]))
+    artists['temperature_legend'].set_color(temperature_to_rgba(
+        np.nanmean(forecast.temperature), artists['dark_mode'], vmin=TRULYCOLD, vmax=REALLYWARM
+    ))
+
+    for line in artists['precip_lines']:
+        line.set_data(time_indices, plot_forecast.precipitation)
+    artists['precip_fill'].set_data(time_indices, plot_forecast.precipitation, 0)
+    for line in artists['wind_lines']:
+        line.set_data(time_indices, plot_forecast.windspeed)
+    gust_offsets = np.column_stack([time_indices, plot_forecast.windgust])
+    for scatter in artists['gust_scatters']:
+        scatter.set_offsets(gust_offsets)
+
+    # Time axis moved on: relabel the existing ticks, move the midnight lines
+    tick_positions = temperature_axes.get_xticks()
+    temperature_axes.xaxis.set_major_formatter(FixedFormatter(
+        [forecast.labels[int(i)] for i in tick_positions]
+    ))
+    if artists['midnight_lines'] is not None:
+        y_min, y_max = temperature_axes.get_ylim()
+        artists['midnight_lines'].set_segments([
+            [(idx, y_min), (idx, y_max)]
+            for idx, label in enumerate(forecast.labels) if label.startswith('00.')
+        ])
+
+    attribution = "Værdata: Meteorologisk Institutt (MET.no)"
+    if stale_note:
+        attribution += f" ({stale_note})"
+    artists['attribution'].set_text(attribution)
+
+    figure.canvas.draw_idle()
+    metrics.RENDER_DURATION.observe(time.perf_counter() - render_start, target='plot')
+    return True
+
+
+def forecast_changed(old, new):
+    """True if times or any value differ (NaN equals NaN)."""
+    if len(old) != len(new) or not np.array_equal(old.times, new.times):
+        return True
+    return not all(
+        np.array_equal(old[name], new[name], equal_nan=True) for name in new.fields
+    )
+
+
+def wait_for_refresh(seconds, figure=None):
+    """
+    Sleep until the next refresh, keeping the plot window responsive.
+
+    Returns:
+        False if the plot window was closed while waiting, otherwise True.
+    """
+    import matplotlib.pyplot as plt
+
+    deadline = time.monotonic() + seconds
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return True
+        if figure is None:
+            time.sleep(remaining)
+        elif not plt.fignum_exists(figure.number):
+            return False
+        else:
+            plt.pause(min(remaining, 1.0))
+
+
+def watch(run, minutes=0, metrics_file=None):
+    """
+    Keep a ForecastRun on screen and refresh it in place, until Ctrl-C or the plot window closes.
+
+    Args:
+        run: ForecastRun after start() and, with a plot window, show_plot(show=False)
+        minutes: Check interval; 0 checks when the cached forecast expires. Never more often
+            than WATCH_MIN_SECONDS.
+        metrics_file: Rewritten after each refresh (--metrics)
+    """
+    live = LiveBlock() if run.show_terminal else None
+    if run.figure is not None:
+        import matplotlib as mpl
+        import matplotlib.pyplot as plt
+
+        with mpl.rc_context(plot_rc(run.dark_mode)):
+            plt.show(block=False)
+
+    try:
+        while True:
+            # Fixed interval, or when the cached forecast expires
+            if minutes > 0:
+                wait_seconds = minutes * 60
+            else:
+                expires_in = run.expires_in()
+                wait_seconds = CACHE_FRESH_SECONDS if expires_in is None else expires_in
+            wait_seconds = max(wait_seconds, WATCH_MIN_SECONDS)
+
+            if live is not None:
+                next_check = datetime.now(NORWAY_TIMEZONE).timestamp() + wait_seconds
+                next_check_label = datetime.fromtimestamp(next_check, NORWAY_TIMEZONE)
+                live.update(
+                    f"{run.table_text}\n  Neste oppdatering kl. {next_check_label:%H:%M} "
+                    "(Ctrl-C avslutter)"
+                )
+            if not wait_for_refresh(wait_seconds, run.figure):
+                break  # Plot window closed
+
+            try:
+                forecast, stale_note = run.load(log=_silent)
+            except (MetUnavailable, MetRequestError):
+                continue  # Nothing cached and MET down or refusing: keep showing what we have
+            if not forecast_changed(run.forecast, forecast) and stale_note == run.stale_note:
+                continue
+
+            run.forecast, run.stale_note = forecast, stale_note
+            run.write_outputs(forecast)
+            if run.show_terminal:
+                with metrics.RENDER_DURATION.time(target='terminal'):
+                    run.table_text = run.terminal_text(forecast, stale_note)
+            if run.figure is not None and not update_plot(run.plot_artists, forecast, stale_note):
+                # New values outside the axes: redraw into the same window
+                run.draw()
+                run.figure.canvas.draw_idle()
+            if metrics_file:
+                metrics.REGISTRY.write_textfile(metrics_file)
+    except KeyboardInterrupt:
+        print()
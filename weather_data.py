@@ -0,0 +1,450 @@
+# ================================================================================================
+# FORECAST DATA: KOMMUNE LOOKUP, MET THROUGH THE CACHE, SAMPLES AND TEST DATA
+# ================================================================================================
+#
+# Everything that turns a place into a Forecast: coordinates from the bundled kommune catalogue,
+# MET JSON through the local cache (fresh window, stale-while-revalidate, the last good copy when
+# MET is down), the shared arena of parsed forecasts (--shared-cache), and the offline sources:
+# the sample files and synthetic test data.
+#
+# ================================================================================================
+import csv
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from forecast import Forecast, NORWAY_TIMEZONE, VARIABLES, parse_fields
+from synthetic_data import (
+    TEST_PRECIP_SCALE, TEST_TEMPERATURE_RANGE, synthetic_arrays, hourly_times
+)
+from phase_timer import TIMER
+import metrics
+from shared_cache import SharedForecastCache
+from met_client import (
+    MetRequestError, MetUnavailable, conditional_headers, fetch_to_cache, spawn_revalidation
+)
+
+# Files: bundled data next to this module, cache relative to the working directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KOMMUNE_CSV = os.path.join(BASE_DIR, "kommuners_koordinater.csv")
+SAMPLE_DATA_DIR = os.path.join(BASE_DIR, "sample_data")
+CACHE_DIR = "temp_data"
+SHARED_CACHE_FILE = os.path.join(CACHE_DIR, "forecast_arena.npy")  # Parsed forecasts, all processes
+
+# Using 'complete' instead of 'compact', only because it includes gust speed.
+MET_URL = "https://api.met.no/weatherapi/locationforecast/2.0/complete"
+
+CACHE_FRESH_SECONDS = 1800          # Cache younger than this is used without asking MET
+SWR_MAX_STALE_SECONDS = 3 * 3600    # --swr: older cache than this is not shown, fetch instead
+
+# ================================================================================================
+# LOOK UP COORDINATES FOR KOMMUNE
+# ================================================================================================
+COORDINATES = {
+    'sample1': (59.9139, 10.7522),
+    'sample2': (69.7444, 18.63)
+}
+
+
+@lru_cache(maxsize=1)
+def _kommune_table():
+    """
+    Parse kommuners_koordinater.csv once per process.
+
+    Returns:
+        (all_entries, numbered_aliases, alias_to_display), where all_entries holds
+        (kommune, fylke, lat, lon) tuples and duplicates get numbered aliases (e.g. 'våler1').
+    """
+    # CSV fallback - skip comment lines starting with #
+    # Coordinate data source: Kartverket (Norwegian Mapping Authority)
+    with open(KOMMUNE_CSV, encoding="utf-8") as f:
+        # Create a generator to filter out comments
+        filtered_lines = (line for line in f if not line.strip().startswith('#'))
+
+        # First pass: collect all entries and identify duplicates
+        all_entries = []
+        duplicate_groups = {}
+
+        for row in csv.DictReader(filtered_lines):
+            csv_kommune = row["kommune"].lower()
+            fylke = row.get("fylke", "").strip()
+            lat, lon = float(row["latitude"]), float(row["longitude"])
+
+            all_entries.append((csv_kommune, fylke, lat, lon))
+
+            # Group duplicates
+            if csv_kommune not in duplicate_groups:
+                duplicate_groups[csv_kommune] = []
+            duplicate_groups[csv_kommune].append((fylke, lat, lon))
+
+        # Create numbered aliases for duplicates (sorted alphabetically by fylke)
+        numbered_aliases = {}
+        alias_to_display = {}  # Map aliases to display names
+        for kommune_key, entries in duplicate_groups.items():
+            if len(entries) > 1:
+                # Sort by fylke alphabetically
+                sorted_entries = sorted(entries, key=lambda x: x[0])
+                for i, (fylke, lat, lon) in enumerate(sorted_entries, 1):
+                    alias = f"{kommune_key}{i}"
+                    numbered_aliases[alias] = (lat, lon)
+                    # Store display name for this alias
+                    alias_to_display[alias] = f"{kommune_key.title()} ({fylke})"
+
+    return all_entries, numbered_aliases, alias_to_display
+
+
+def resolve(kommune_name):
+    """
+    Look up coordinates for a Norwegian kommune.
+
+    Args:
+        kommune_name: Name, 'name (fylke)', numbered alias for duplicates, or a unique word
+
+    Returns:
+        ((latitude, longitude), display_name)
+
+    Raises:
+        ValueError: Kommune not found, or the name is ambiguous (message lists the options).
+    """
+    kommune_name = kommune_name.strip().lower()
+    if kommune_name in COORDINATES:
+        return COORDINATES[kommune_name], kommune_name.title()
+
+    all_entries, numbered_aliases, alias_to_display = _kommune_table()
+
+    # Check numbered aliases
+    if kommune_name in numbered_aliases:
+        coords = numbered_aliases[kommune_name]
+        display_name = alias_to_display[kommune_name]
+        return coords, display_name
+
+    # Collect ALL matches for ambiguity handling
+    exact_matches = []
+
+    for csv_kommune, fylke, lat, lon in all_entries:
+        # Create full name with fylke if present
+        if fylke:
+            full_name = f"{csv_kommune} ({fylke.lower()})"
+        else:
+            full_name = csv_kommune
+
+        # Check for exact matches
+        if kommune_name == csv_kommune:
+            exact_matches.append((csv_kommune, fylke, lat, lon))
+        elif kommune_name == full_name:
+            display_name = f"{csv_kommune.title()} ({fylke})" if fylke else csv_kommune.title()
+            return (lat, lon), display_name
+
+    # Handle exact matches
+    if exact_matches:
+        # If only one match and it has no fylke, it's unique
+        if len(exact_matches) == 1 and not exact_matches[0][1]:
+            match = exact_matches[0]
+            return (match[2], match[3]), match[0].title()
+
+        # If multiple matches, handle ambiguity
+        elif len(exact_matches) > 1:
+            # Create helpful error message with all options
+            match_descriptions = []
+            aliases = []
+            sorted_matches = sorted(exact_matches, key=lambda x: x[1] or "")
+
+            for i, (kommune, fylke, lat, lon) in enumerate(sorted_matches, 1):
+                if fylke:
+                    match_descriptions.append(f"{kommune} ({fylke})")
+                    aliases.append(f"{kommune}{i}")
+                else:
+                    match_descriptions.append(kommune)
+
+            options_text = " or ".join([f"'{desc}'" for desc in match_descriptions])
+            if aliases:
+                aliases_text = " or ".join([f"'{alias}'" for alias in aliases])
+                raise ValueError(
+                    f"Tvetydig kommune-navn '{kommune_name}'. "
+                    f"Flere treff funnet: {', '.join(match_descriptions)}.\n"
+                    f"Bruk enten: {options_text}\n"
+                    f"Eller snarvei: {aliases_text}"
+                )
+            else:
+                raise ValueError(
+                    f"Tvetydig kommune-navn '{kommune_name}'. "
+                    f"Flere treff funnet: {', '.join(match_descriptions)}. "
+                    f"Vennligst spesifiser"
+                )
+
+    # If no exact matches found, try partial matching
+    partial_matches = []
+
+    for csv_kommune, fylke, lat, lon in all_entries:
+        # Skip entries that have fylke (duplicates should use exact matching)
+        if fylke:
+            continue
+
+        csv_words = csv_kommune.replace('-', ' ').split()
+        input_words = kommune_name.replace('-', ' ').split()
+
+        # Check if input matches any word in the CSV entry
+        if (kommune_name in csv_words or
+            any(word in csv_words for word in input_words if len(word) > 2)):
+            partial_matches.append((csv_kommune, fylke, lat, lon))
+
+    # Handle partial matches
+    if len(partial_matches) == 1:
+        match = partial_matches[0]
+        return (match[2], match[3]), match[0].title()
+    elif len(partial_matches) > 1:
+        match_names = [match[0] for match in partial_matches]
+        raise ValueError(
+            f"Tvetydig kommune-navn '{kommune_name}'. "
+            f"Flere treff funnet: {', '.join(match_names)}. "
+            f"Vennligst spesifiser"
+        )
+
+    # If no matches found at all
+    raise ValueError(f"Kommune '{kommune_name}' ikke funnet")
+
+
+def kommune_entries():
+    """Every (kommune, fylke, latitude, longitude) in kommuners_koordinater.csv, names lower case."""
+    return list(_kommune_table()[0])
+
+
+def kommune_entry(kommune_name):
+    """(kommune, fylke, latitude, longitude) for any name resolve() accepts."""
+    (latitude, longitude), display_name = resolve(kommune_name)
+    kommune_name = kommune_name.strip().lower()
+    if kommune_name not in COORDINATES:
+        for entry in _kommune_table()[0]:
+            if entry[2:] == (latitude, longitude):
+                return entry
+    return kommune_name, "", latitude, longitude
+
+
+def kommune_key(kommune, fylke):
+    """Unique key for a kommune: the name, with fylke for duplicate names ('våler (innlandet)')."""
+    return f"{kommune} ({fylke.lower()})" if fylke else kommune
+
+# ================================================================================================
+# COLLECT & DECIPHER WEATHER DATA
+# ================================================================================================
+
+def load_json_timed(filename):
+    """Read and decode a JSON file, timing the read and the decode separately."""
+    with TIMER.phase('cache_read'):
+        with open(filename, 'r', encoding='utf-8') as cache_file:
+            raw_json = cache_file.read()
+    with TIMER.phase('json_decode'), metrics.PARSE_DURATION.time(step='json_decode'):
+        return json.loads(raw_json)
+
+
+def _silent(*args, **kwargs):
+    pass
+
+
+def cache_file(cache_key):
+    """Path of the cached MET JSON for a cache key (kommune name or coordinates)."""
+    return os.path.join(CACHE_DIR, f"weather_cache_{cache_key}.json")
+
+
+def cache_expires_in(cache_key):
+    """Seconds until the cached entry leaves the fresh window (negative if stale, None if absent)."""
+    try:
+        cache_mtime = os.path.getmtime(cache_file(cache_key))
+    except OSError:
+        return None
+    return cache_mtime + CACHE_FRESH_SECONDS - datetime.now().timestamp()
+
+
+def fetch_weather_data(latitude, longitude, cache_key=None, swr=False, log=_silent):
+    """
+    MET locationforecast JSON for a location, through the local cache.
+
+    Cache younger than CACHE_FRESH_SECONDS is used directly. Otherwise MET is asked with
+    If-Modified-Since; with swr=True a cache up to SWR_MAX_STALE_SECONDS old is returned at
+    once while a detached process revalidates it. If MET is unavailable or rejects the request,
+    the last good cache is returned however old.
+
+    Args:
+        latitude, longitude: Location (MET uses at most 4 decimals)
+        cache_key: Cache file name part (default: derived from the coordinates)
+        swr: Stale-while-revalidate
+        log: Called with one status message per call (default: silent); e.g. print
+
+    Returns:
+        (weather_data, stale_note), where stale_note is None for fresh data, otherwise a
+        short Norwegian description of how old the shown data is.
+
+    Raises:
+        MetUnavailable: MET unavailable and no cached copy exists.
+        MetRequestError: MET rejected the request (4xx) and no cached copy exists.
+    """
+    if cache_key is None:
+        cache_key = f"{latitude:.4f}_{longitude:.4f}"
+    url = f"{MET_URL}?lat={latitude}&lon={longitude}"
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cache_dumpfile = cache_file(cache_key)
+
+    # Check whether cache exists + is recent (from last half hour)
+    with TIMER.phase('cache_stat'):
+        cache_exists = os.path.exists(cache_dumpfile)
+        cache_mtime = os.path.getmtime(cache_dumpfile) if cache_exists else None
+    if cache_exists:
+        cache_age_seconds = (datetime.now().timestamp() - cache_mtime)
+        if cache_age_seconds < CACHE_FRESH_SECONDS:
+            weather_data = load_json_timed(cache_dumpfile)
+            log(
+                f"Using cached weather data for {cache_key} "
+                f"(age: {int(cache_age_seconds/60)} min)"
+            )
+            metrics.CACHE_LOOKUPS.inc(result='hit')
+            return weather_data, None
+        if swr and cache_age_seconds < SWR_MAX_STALE_SECONDS:
+            # Stale-while-revalidate: show the old entry now, refresh it for the next call
+            weather_data = load_json_timed(cache_dumpfile)
+            spawn_revalidation(url, cache_dumpfile)
+            log(
+                f"Using stale cached weather data for {cache_key} "
+                f"(age: {int(cache_age_seconds/60)} min), refreshing in background"
+            )
+            metrics.CACHE_LOOKUPS.inc(result='stale')
+            return weather_data, (
+                f"Lagrede data, {int(cache_age_seconds/60)} min gamle - oppdateres i bakgrunnen"
+            )
+
+    # User-Agent identifies the app; If-Modified-Since if cache exists (even if expired).
+    # Timeouts, retries with backoff and circuit breaker live in met_client.py.
+    # Only validated 200 bodies are written to the cache.
+    try:
+        fetch_result, weather_data = fetch_to_cache(
+            url, cache_dumpfile, headers=conditional_headers(cache_dumpfile), timer=TIMER
+        )
+    except (MetUnavailable, MetRequestError) as exc:
+        # Upstream unhealthy, body unusable or request rejected (4xx): serve the last good
+        # cache, however old
+        if not cache_exists:
+            raise
+        rejected = isinstance(exc, MetRequestError)
+        log(
+            f"Weather service {'rejected the request' if rejected else 'unavailable'} ({exc}), "
+            f"using last cached data for {cache_key}"
+        )
+        metrics.CACHE_LOOKUPS.inc(result='stale')
+        cache_age_seconds = datetime.now().timestamp() - cache_mtime
+        return load_json_timed(cache_dumpfile), (
+            f"Lagrede data, {int(cache_age_seconds/60)} min gamle - "
+            f"{'MET avviste forespørselen' if rejected else 'MET utilgjengelig'}"
+        )
+
+    metrics.CACHE_LOOKUPS.inc(result=fetch_result)
+    if fetch_result == 'revalidated':  # 304 Not Modified
+        log(f"Server says data unchanged, using existing cache for {cache_key}")
+        return load_json_timed(cache_dumpfile), None
+    log(f"Fetched and cached new weather data for {cache_key}")
+    return weather_data, None
+
+
+def get_forecast(latitude, longitude, hours=48, cache_key=None, swr=False, fields=()):
+    """
+    Hourly forecast for a location, as a Forecast of hours+1 points (see fetch_weather_data).
+
+    Extra MET variables (see forecast.FIELDS) are extracted in the same pass and available
+    as forecast['humidity'] etc.
+
+    Example:
+        (latitude, longitude), display_name = resolve("bergen")
+        forecast = get_forecast(latitude, longitude, hours=24, fields="humidity,pressure")
+    """
+    forecast, _ = fetch_forecast(
+        latitude, longitude, hours, cache_key=cache_key, swr=swr, fields=fields
+    )
+    return forecast
+
+
+def fetch_forecast(
+    latitude, longitude, hours=48, cache_key=None, swr=False, fields=(), log=_silent
+):
+    """
+    As get_forecast(), but also returns the stale note (see fetch_weather_data).
+
+    Returns:
+        (forecast, stale_note)
+    """
+    if cache_key is None:
+        cache_key = f"{latitude:.4f}_{longitude:.4f}"
+    shared = _shared_cache
+    if shared is not None:
+        # Fresh JSON cache already parsed by any process: use its arrays, skip the decode
+        try:
+            source_mtime = os.path.getmtime(cache_file(cache_key))
+        except OSError:
+            source_mtime = None
+        if source_mtime is not None and datetime.now().timestamp() - source_mtime < CACHE_FRESH_SECONDS:
+            with TIMER.phase('shared_cache'):
+                forecast = shared.get(cache_key, source_mtime, hours, parse_fields(fields))
+            if forecast is not None:
+                log(
+                    f"Using shared parsed forecast for {cache_key} "
+                    f"(age: {int((datetime.now().timestamp() - source_mtime)/60)} min)"
+                )
+                metrics.CACHE_LOOKUPS.inc(result='shared')
+                return forecast, None
+
+    weather_data, stale_note = fetch_weather_data(
+        latitude, longitude, cache_key=cache_key, swr=swr, log=log
+    )
+    with TIMER.phase('extract'), metrics.PARSE_DURATION.time(step='extract'):
+        weather_timeseries = weather_data["properties"]["timeseries"] # Yields a list of dicts.
+        forecast = Forecast.from_timeseries(weather_timeseries, hours, fields=fields)
+
+    if shared is not None:
+        try:
+            shared.put(cache_key, os.path.getmtime(cache_file(cache_key)), hours, forecast)
+        except OSError:
+            pass  # No cache file (nothing to tie the entry to) or arena not writable
+    return forecast, stale_note
+
+
+_shared_cache = None  # SharedForecastCache once enable_shared_cache() is called
+
+
+def enable_shared_cache(filename=SHARED_CACHE_FILE):
+    """
+    Let get_forecast() in this process use the shared forecast arena (see shared_cache.py).
+
+    Call once in every worker process: each forecast is then parsed once and stored in the
+    memory-mapped arena, and other workers copy its arrays from there instead of
+    reading and decoding the same JSON cache file again.
+
+    Returns:
+        The SharedForecastCache.
+    """
+    global _shared_cache
+    _shared_cache = SharedForecastCache(filename)
+    return _shared_cache
+
+
+def load_sample(name):
+    """MET JSON from sample_data/<name>.json ('sample1' or 'sample2'), for offline use."""
+    sample_cache_file = os.path.join(SAMPLE_DATA_DIR, f"{name}.json")
+    if not os.path.exists(sample_cache_file):
+        raise FileNotFoundError(f"Sample data file not found: {sample_cache_file}")
+    metrics.CACHE_LOOKUPS.inc(result='sample')
+    return load_json_timed(sample_cache_file)
+
+
+def synthetic_forecast(hours=48, seed=None):
+    """Test-mode forecast (large temperature variation), starting at local midnight today."""
+    with TIMER.phase('extract'):
+        # Vectorized generator, one synthetic location.
+        test_start = datetime.now(NORWAY_TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+        test_arrays = synthetic_arrays(
+            hours, seed=seed,
+            temperature_range=TEST_TEMPERATURE_RANGE, precip_scale=TEST_PRECIP_SCALE
+        )
+        return Forecast(
+            hourly_times(hours, start=np.datetime64(int(test_start.timestamp()), 's')),
+            *(test_arrays[name][0] for name in VARIABLES)
+        )